@@ -16,6 +16,7 @@ WORKFLOW:
 3. Generate signals and allocate capital
 4. Apply sector diversification filter (max 40% per sector)
 """
+import sys
 import pandas as pd
 from typing import List, Dict, Optional
 from loguru import logger
@@ -25,6 +26,8 @@ from ..core.regime_detector import MarketRegimeDetector
 from ..strategies.momentum_simple import SimpleMomentumStrategy
 from ..strategies.mean_reversion_rsi import MeanReversionRSI
 from ..strategies.breakout_strategy import BreakoutStrategy
+from ..intelligence.risk_manager import RiskManager
+from ..intelligence.indicators import IndicatorCalculator
 from ..utils.config import config
 
 # ETF symbols to exclude from stock analysis (even if in database)
@@ -203,6 +206,10 @@ SECTOR_MAPPING = {
     'MCK': 'Healthcare',        # McKesson - pharma distribution
 }
 
+# Interned keys + bound .get: sector checks run once per (signal, open position) pair
+SECTOR_MAPPING = {sys.intern(k): v for k, v in SECTOR_MAPPING.items()}
+_sector_lookup = SECTOR_MAPPING.get
+
 
 class PortfolioManager:
     """
@@ -227,10 +234,11 @@ class PortfolioManager:
     # NOTE: 5% was tested but filtered too many high-potential stocks, increasing to 8%
     MAX_NATR_PERCENT = 8.0  # Max 8% normalized ATR (allow more volatile but profitable stocks)
     
-    def __init__(self, user_db=None):
+    def __init__(self, user_db=None, db: Optional[MarketDatabase] = None):
         # Single shared MarketDatabase instance for all components
         # (avoids 5 concurrent DuckDB connections to the same file)
-        self.db = MarketDatabase()
+        self.db = db or MarketDatabase()
+        self._owns_db = db is None
         self.regime_detector = MarketRegimeDetector(db=self.db)
 
         # Import qui per evitare circular import
@@ -388,13 +396,14 @@ class PortfolioManager:
                 )
                 # Tag each signal with its source strategy and expiration
                 for sig in signals:
+                    sig['symbol'] = sys.intern(sig['symbol'])
                     sig['strategy'] = strategy_name
                     # Boost score if matches regime's primary strategy
                     sig['regime_boost'] = 1.2 if strategy_name == primary_strategy_name else 1.0
                     
                     # Add signal expiration (per Code Review Issue #9)
                     # Signals valid for 4 hours by default
-                    generated_at = sig.get('signal_date', as_of_date)
+                    generated_at = pd.Timestamp(sig.get('signal_date', as_of_date))
                     sig['generated_at'] = generated_at
                     sig['expires_at'] = generated_at + pd.Timedelta(hours=18)  # Extended for next-morning trading
                 
@@ -694,14 +703,10 @@ class PortfolioManager:
         Uses local mapping first, then tries Polygon API.
         Returns 'Unknown' if sector cannot be determined.
         """
-        # Check local mapping first (fast)
-        if symbol in SECTOR_MAPPING:
-            return SECTOR_MAPPING[symbol]
-        
-        # For symbols not in local mapping, return 'Unknown' to avoid API calls
+        # Local mapping only. For symbols not in it, return 'Unknown' to avoid API calls
         # and unclosed session warnings. The local mapping covers most common stocks.
         # This is a tradeoff: we skip API lookups but avoid resource leaks.
-        return 'Unknown'
+        return _sector_lookup(symbol, 'Unknown')
     
     def check_sector_diversity(self, new_signal: Dict, open_positions: List[Dict]) -> Dict:
         """
@@ -821,18 +826,21 @@ class PortfolioManager:
         signal_sector_counts = {}  # Track sectors in NEW signals only
         simulated_positions = list(open_positions)
         
+        # Sectors already at the symbol cap: every further candidate fails Rule 1,
+        # so skip them before the (more expensive) concentration check
+        saturated_sectors = {
+            sector for sector, count in open_sector_counts.items()
+            if count >= self.MAX_SYMBOLS_PER_SECTOR
+        }
+        
         for sig in signals:
             sector = self._get_sector(sig['symbol'])
             
             # Rule 1: Max symbols per sector (in NEW signals)
-            if sector != 'Unknown':
-                current_in_signals = signal_sector_counts.get(sector, 0)
-                current_in_open = open_sector_counts.get(sector, 0)
-                total_in_sector = current_in_signals + current_in_open
-                
-                if total_in_sector >= self.MAX_SYMBOLS_PER_SECTOR:
-                    logger.info(f"⚠️ {sig['symbol']}: Skipped - Sector {sector} already has {total_in_sector} symbol(s)")
-                    continue
+            if sector in saturated_sectors:
+                total_in_sector = signal_sector_counts.get(sector, 0) + open_sector_counts.get(sector, 0)
+                logger.info(f"⚠️ {sig['symbol']}: Skipped - Sector {sector} already has {total_in_sector} symbol(s)")
+                continue
             
             # Rule 2: Capital concentration check (existing logic)
             if sector != 'Unknown':
@@ -851,6 +859,8 @@ class PortfolioManager:
             
             if sector != 'Unknown':
                 signal_sector_counts[sector] = signal_sector_counts.get(sector, 0) + 1
+                if signal_sector_counts[sector] + open_sector_counts.get(sector, 0) >= self.MAX_SYMBOLS_PER_SECTOR:
+                    saturated_sectors.add(sector)
             
             logger.debug(f"✅ {sig['symbol']}: Sector {sector} - ALLOWED")
         
@@ -878,9 +888,6 @@ class PortfolioManager:
         Returns:
             Signals with potentially improved stop losses
         """
-        from ..intelligence.risk_manager import RiskManager
-        from ..intelligence.indicators import IndicatorCalculator
-        
         enhanced_signals = []
         
         for sig in signals:
@@ -964,11 +971,7 @@ class PortfolioManager:
                 - 'reason': str
                 - 'time_remaining': str|None
         """
-        if check_time is None:
-            check_time = pd.Timestamp.now()
-        
         expires_at = signal.get('expires_at')
-        generated_at = signal.get('generated_at')
         
         if expires_at is None:
             return {
@@ -977,7 +980,11 @@ class PortfolioManager:
                 'time_remaining': None
             }
         
-        # Ensure expires_at is a Timestamp
+        if check_time is None:
+            check_time = pd.Timestamp.now()
+        
+        # Signals built by generate_portfolio_signals already carry a Timestamp;
+        # convert only externally supplied values (e.g. strings from JSON)
         if not isinstance(expires_at, pd.Timestamp):
             expires_at = pd.Timestamp(expires_at)
         
@@ -997,9 +1004,28 @@ class PortfolioManager:
             'time_remaining': f'{hours:.1f}h'
         }
     
+    @staticmethod
+    def is_signals_valid(signals_df: pd.DataFrame, check_time: Optional[pd.Timestamp] = None) -> pd.Series:
+        """
+        Vectorized validity check for many signals at once (e.g. signal replay).
+        
+        Args:
+            signals_df: DataFrame with an 'expires_at' column (NaT = no expiration)
+            check_time: Time to check against (default: now)
+            
+        Returns:
+            Boolean Series aligned to signals_df.index (True = still valid)
+        """
+        if check_time is None:
+            check_time = pd.Timestamp.now()
+        
+        expires_at = pd.to_datetime(signals_df['expires_at'])
+        return expires_at.isna() | (expires_at >= check_time)
+    
     def close(self):
-        """Cleanup"""
-        self.db.close()
+        """Cleanup - components share self.db, so only close it if we own it"""
+        if self._owns_db:
+            self.db.close()
         self.regime_detector.close()
         self.momentum.close()
         self.mean_reversion.close()
@@ -10,15 +10,92 @@ REGIMES:
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Literal
+from typing import Dict, Literal, Optional
 from loguru import logger
 
 from ..database.market_db import MarketDatabase
+from ..intelligence.indicators import IndicatorCalculator
+from ..utils._njit import njit, NUMBA_AVAILABLE
 
 
 RegimeType = Literal['trending', 'choppy', 'breakout', 'strong_trend']
 
 
+@njit(cache=True, error_model='numpy')
+def _tr_dm_at(high, low, close, i):
+    """True Range, +DM and -DM of bar i (bar 0 has no previous close)"""
+    tr = high[i] - low[i]
+    if i == 0:
+        return tr, 0.0, 0.0
+    tr = max(tr, abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    up_move = high[i] - high[i - 1]
+    down_move = low[i - 1] - low[i]
+    plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+    minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+    return tr, plus_dm, minus_dm
+
+
+@njit(cache=True, error_model='numpy')
+def _adx_numba(high, low, close, period):
+    """
+    Single-pass ADX / +DI / -DI with running window sums.
+
+    Same smoothing as the pandas path (rolling means of TR, +DM, -DM and DX),
+    so regime thresholds are unchanged. Values leaving the window are
+    recomputed from the inputs instead of being kept in temporary arrays.
+    """
+    n = high.shape[0]
+    adx = np.full(n, np.nan)
+    plus_di = np.full(n, np.nan)
+    minus_di = np.full(n, np.nan)
+
+    tr_sum = 0.0
+    plus_sum = 0.0
+    minus_sum = 0.0
+    dx_sum = 0.0
+    dx_nan = 0
+
+    for i in range(n):
+        tr, p_dm, m_dm = _tr_dm_at(high, low, close, i)
+        tr_sum += tr
+        plus_sum += p_dm
+        minus_sum += m_dm
+        if i >= period:
+            tr, p_dm, m_dm = _tr_dm_at(high, low, close, i - period)
+            tr_sum -= tr
+            plus_sum -= p_dm
+            minus_sum -= m_dm
+
+        if i < period - 1:
+            continue
+
+        atr = tr_sum / period
+        p_di = 100.0 * (plus_sum / period) / atr
+        m_di = 100.0 * (minus_sum / period) / atr
+        plus_di[i] = p_di
+        minus_di[i] = m_di
+
+        dx = 100.0 * abs(p_di - m_di) / (p_di + m_di)
+        if dx != dx:
+            dx_nan += 1
+        else:
+            dx_sum += dx
+
+        # DX leaving the window (DX exists from index period-1 onwards)
+        j = i - period
+        if j >= period - 1:
+            old_dx = 100.0 * abs(plus_di[j] - minus_di[j]) / (plus_di[j] + minus_di[j])
+            if old_dx != old_dx:
+                dx_nan -= 1
+            else:
+                dx_sum -= old_dx
+
+        if i >= 2 * period - 2 and dx_nan == 0:
+            adx[i] = dx_sum / period
+
+    return adx, plus_di, minus_di
+
+
 class MarketRegimeDetector:
     """
     Detector del regime di mercato per SPY (benchmark)
@@ -37,7 +114,7 @@ class MarketRegimeDetector:
     
     BB_SQUEEZE_THRESHOLD = 0.02  # 2% bandwidth = squeeze
     
-    def __init__(self, db=None):
+    def __init__(self, db: Optional[MarketDatabase] = None):
         self.db = db or MarketDatabase()
         self._owns_db = db is None
     
@@ -70,22 +147,26 @@ class MarketRegimeDetector:
             logger.warning(f"Insufficient data for regime detection ({len(df)} rows)")
             return self._default_regime()
         
-        # Calculate indicators
-        df = self._calculate_adx(df, period=14)
-        df = self._calculate_atr_pct(df, period=14)
-        df = self._calculate_bollinger_bands(df, period=20)
-        
-        latest = df.iloc[-1]
+        # Calculate indicators (helpers return new columns, df is never copied)
+        features = {
+            **self._calculate_adx(df, period=14),
+            **self._calculate_atr_pct(df, period=14),
+            **self._calculate_bollinger_bands(df, period=20)
+        }
+        latest_adx = features['adx'].iloc[-1]
+        latest_atr_pct = features['atr_pct'].iloc[-1]
+        latest_bb_bandwidth = features['bb_bandwidth'].iloc[-1]
         
         # Extract values
-        adx = float(latest['adx']) if not pd.isna(latest['adx']) else 20.0
-        atr_pct = float(latest['atr_pct']) if not pd.isna(latest['atr_pct']) else 1.0
-        bb_bandwidth = float(latest['bb_bandwidth']) if not pd.isna(latest['bb_bandwidth']) else 0.05
+        adx = float(latest_adx) if not pd.isna(latest_adx) else 20.0
+        atr_pct = float(latest_atr_pct) if not pd.isna(latest_atr_pct) else 1.0
+        bb_bandwidth = float(latest_bb_bandwidth) if not pd.isna(latest_bb_bandwidth) else 0.05
         
-        # Trend direction
-        sma_50 = df['close'].rolling(50).mean().iloc[-1]
-        sma_200 = df['close'].rolling(200).mean().iloc[-1] if len(df) >= 200 else sma_50
-        price = float(latest['close'])
+        # Trend direction (only the latest SMA values are needed: mean of the tail)
+        closes = df['close'].to_numpy()
+        sma_50 = closes[-50:].mean()
+        sma_200 = closes[-200:].mean() if len(closes) >= 200 else sma_50
+        price = float(closes[-1])
         
         if price > sma_50 and price > sma_200:
             trend_direction = 'up'
@@ -157,22 +238,33 @@ class MarketRegimeDetector:
         confidence = 50.0
         return 'choppy', confidence  # Default to mean reversion
     
-    def _calculate_adx(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    def _calculate_adx(self, df: pd.DataFrame, period: int = 14) -> Dict[str, pd.Series]:
         """
         Calculate ADX (Average Directional Index)
         Misura la forza del trend (0-100, >25 = strong trend)
+
+        Returns:
+            {'adx', 'plus_di', 'minus_di'} aligned to df.index
         """
-        df = df.copy()
+        if NUMBA_AVAILABLE:
+            adx, plus_di, minus_di = _adx_numba(
+                df['high'].to_numpy(dtype=np.float64),
+                df['low'].to_numpy(dtype=np.float64),
+                df['close'].to_numpy(dtype=np.float64),
+                period
+            )
+            return {
+                'adx': pd.Series(adx, index=df.index),
+                'plus_di': pd.Series(plus_di, index=df.index),
+                'minus_di': pd.Series(minus_di, index=df.index)
+            }
         
         high = df['high']
         low = df['low']
         close = df['close']
         
-        # True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        # True Range (row-wise max on ndarrays, no 3-column DataFrame)
+        tr = IndicatorCalculator._true_range(high, low, close)
         
         # Directional Movement
         up_move = high - high.shift()
@@ -191,40 +283,28 @@ class MarketRegimeDetector:
         dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
         adx = dx.rolling(window=period).mean()
         
-        df['adx'] = adx
-        df['plus_di'] = plus_di
-        df['minus_di'] = minus_di
-        
-        return df
+        return {
+            'adx': adx,
+            'plus_di': plus_di,
+            'minus_di': minus_di
+        }
     
-    def _calculate_atr_pct(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    def _calculate_atr_pct(self, df: pd.DataFrame, period: int = 14) -> Dict[str, pd.Series]:
         """
         ATR as percentage of price (volatility measure)
         """
-        df = df.copy()
-        
-        high = df['high']
-        low = df['low']
         close = df['close']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        tr = IndicatorCalculator._true_range(df['high'], df['low'], close)
         
         atr = tr.rolling(window=period).mean()
         atr_pct = (atr / close) * 100
         
-        df['atr_pct'] = atr_pct
-        
-        return df
+        return {'atr_pct': atr_pct}
     
-    def _calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20) -> pd.DataFrame:
+    def _calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20) -> Dict[str, pd.Series]:
         """
         Bollinger Bands per rilevare consolidation (squeeze)
         """
-        df = df.copy()
-        
         sma = df['close'].rolling(window=period).mean()
         std = df['close'].rolling(window=period).std()
         
@@ -234,12 +314,12 @@ class MarketRegimeDetector:
         # Bandwidth (distanza tra bande come % del prezzo)
         bandwidth = (upper - lower) / sma
         
-        df['bb_upper'] = upper
-        df['bb_lower'] = lower
-        df['bb_middle'] = sma
-        df['bb_bandwidth'] = bandwidth
-        
-        return df
+        return {
+            'bb_upper': upper,
+            'bb_lower': lower,
+            'bb_middle': sma,
+            'bb_bandwidth': bandwidth
+        }
     
     def _default_regime(self) -> Dict:
         """Regime di default se mancano dati"""
@@ -3,7 +3,7 @@ import duckdb
 import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 import pandas as pd
 from loguru import logger
 
@@ -82,9 +82,29 @@ class MarketDatabase:
         if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
             df['timestamp'] = pd.to_datetime(df['timestamp'])
         
+        self._upsert(df)
+    
+    def insert_arrow(self, table):
+        """
+        Insert or update data from a pyarrow.Table (upsert)
+        
+        DuckDB scans Arrow buffers directly, so bars built as Arrow never go
+        through pandas. Expects the same columns as insert_data.
+        """
+        if table.num_rows == 0:
+            return
+        
+        required_cols = {'timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume'}
+        if not required_cols.issubset(table.column_names):
+            raise ValueError(f"Missing required columns. Got: {table.column_names}")
+        
+        self._upsert(table)
+    
+    def _upsert(self, data):
+        """Upsert a registered DataFrame / Arrow table in one transaction"""
         # DuckDB upsert: Delete existing records first, then insert
         # Wrapped in transaction to prevent data loss on interruption
-        self.conn.register('temp_data', df)
+        self.conn.register('temp_data', data)
         
         try:
             self.conn.execute("BEGIN TRANSACTION")
@@ -144,6 +164,17 @@ class MarketDatabase:
             return result[0]
         return None
     
+    def get_last_timestamps(self, symbols: List[str]) -> Dict[str, datetime]:
+        """Last timestamp per symbol in one query (symbols without data are absent)"""
+        if not symbols:
+            return {}
+        placeholders = ','.join(['?' for _ in symbols])
+        rows = self.conn.execute(
+            f"SELECT symbol, MAX(timestamp) FROM market_data WHERE symbol IN ({placeholders}) GROUP BY symbol",
+            list(symbols)
+        ).fetchall()
+        return {symbol: last_ts for symbol, last_ts in rows if last_ts is not None}
+    
     def get_latest_bars(self, symbols: List[str], lookback_days: int = 252) -> pd.DataFrame:
         """Get latest N days of data for multiple symbols"""
         placeholders = ','.join(['?' for _ in symbols])
@@ -193,6 +224,38 @@ class MarketDatabase:
         result = self.conn.execute("SELECT DISTINCT symbol FROM market_data").fetchall()
         return [row[0] for row in result]
     
+    def optimize_storage(self):
+        """
+        Rewrite market_data physically sorted by (symbol, timestamp).
+
+        DuckDB prunes row groups with min/max zonemaps: once rows are clustered
+        by symbol, `WHERE symbol = ?` (get_data, get_last_timestamp,
+        get_latest_bars) only scans the row groups of that symbol instead of
+        the whole table. Incremental updates append in arrival order, so run
+        this periodically (e.g. after a full data update).
+        Table schema, primary key and indexes are preserved.
+        """
+        try:
+            self.conn.execute("BEGIN TRANSACTION")
+            self.conn.execute("""
+                CREATE TEMP TABLE market_data_sorted AS
+                SELECT * FROM market_data ORDER BY symbol, timestamp
+            """)
+            self.conn.execute("DELETE FROM market_data")
+            self.conn.execute("""
+                INSERT INTO market_data
+                SELECT * FROM market_data_sorted ORDER BY symbol, timestamp
+            """)
+            self.conn.execute("DROP TABLE market_data_sorted")
+            self.conn.execute("COMMIT")
+        except Exception as e:
+            self.conn.execute("ROLLBACK")
+            raise e
+
+        # Reclaim the space of the deleted row groups
+        self.conn.execute("CHECKPOINT")
+        logger.info("Market data reorganized by (symbol, timestamp)")
+
     def close(self):
         """Close database connection and remove from pool"""
         if self.conn:
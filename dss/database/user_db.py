@@ -1,9 +1,10 @@
 """SQLite user data database"""
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
-import pandas as pd
+from typing import Iterable, List, Dict, Optional, Set, Tuple
 from loguru import logger
 
 from ..utils.config import config
@@ -12,126 +13,234 @@ from ..utils.config import config
 class UserDatabase:
     """SQLite database for user data (OLTP)"""
     
+    # Bump when tables/indexes/migrations change (stored in PRAGMA user_version)
+    SCHEMA_VERSION = 2
+    
+    # journal_mode=WAL is persistent in the db file: switch it once per path
+    _pragmas_applied: set = set()
+    
+    # Db files already initialized in this process, see _schema_key()
+    _initialized_paths: set = set()
+    
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = Path(db_path or config.get_env("SQLITE_PATH", "./data/user_data.db"))
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Connection pool: one writer (SQLite allows a single writer) + one reader per thread
+        self._lock = threading.RLock()
+        self._rw_conn: Optional[sqlite3.Connection] = None
+        self._readers: Dict[int, sqlite3.Connection] = {}
+        
+        # In-memory mirror of telegram_alert_sent, reloaded when another connection commits
+        self._alert_sent: Set[Tuple[str, str]] = set()
+        self._alert_version: Optional[int] = None
+        
         self._initialize_schema()
+        self._get_alerts_sent()
+    
+    def _open_connection(self, **kwargs) -> sqlite3.Connection:
+        """Open a connection with WAL and tuned per-connection PRAGMAs"""
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, cached_statements=128, **kwargs)
+        
+        if self.db_path not in UserDatabase._pragmas_applied:
+            conn.execute("PRAGMA journal_mode=WAL")
+            UserDatabase._pragmas_applied.add(self.db_path)
+        
+        # Per-connection settings (not persisted in the db file)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+        conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection"""
-        conn = sqlite3.connect(str(self.db_path))
+    def _get_read_connection(self) -> sqlite3.Connection:
+        """Read connection: rows as sqlite3.Row (dict(row) in callers)"""
+        conn = self._open_connection()
         conn.row_factory = sqlite3.Row
         return conn
     
-    def _initialize_schema(self):
-        """Initialize database schema"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Watchlist table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS watchlist (
-                symbol VARCHAR PRIMARY KEY,
-                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT
-            )
-        """)
-        
-        # Trading journal
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS trading_journal (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol VARCHAR NOT NULL,
-                entry_date TIMESTAMP NOT NULL,
-                entry_price DOUBLE NOT NULL,
-                exit_date TIMESTAMP,
-                exit_price DOUBLE,
-                quantity INTEGER NOT NULL,
-                stop_loss DOUBLE,
-                target_price DOUBLE,
-                current_stop_loss DOUBLE,  -- Current trailing stop (updated over time)
-                status VARCHAR DEFAULT 'open',  -- open, closed, stopped, target_reached
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Executed orders
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS executed_orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol VARCHAR NOT NULL,
-                order_type VARCHAR NOT NULL,  -- buy, sell
-                price DOUBLE NOT NULL,
-                quantity INTEGER NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                broker_order_id VARCHAR,
-                notes TEXT
-            )
-        """)
-        
-        # Signal history
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS signal_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol VARCHAR NOT NULL,
-                signal_date TIMESTAMP NOT NULL,
-                score DOUBLE NOT NULL,
-                entry_price DOUBLE,
-                stop_loss DOUBLE,
-                position_size INTEGER,
-                status VARCHAR DEFAULT 'generated',  -- generated, executed, expired
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # User settings (capital, telegram config, etc.)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_settings (
-                key VARCHAR PRIMARY KEY,
-                value TEXT NOT NULL,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Telegram: invio alert prezzo solo una volta per livello/simbolo (evita ripetizioni ogni 5 min)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS telegram_alert_sent (
-                symbol VARCHAR NOT NULL,
-                level_type VARCHAR NOT NULL,
-                sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (symbol, level_type)
-            )
-        """)
-        
-        conn.commit()
+    def _get_write_connection(self) -> sqlite3.Connection:
+        """Write connection: plain tuples, autocommit mode with explicit BEGIN in _conn()"""
+        return self._open_connection(isolation_level=None)
+    
+    def _get_writer(self) -> sqlite3.Connection:
+        """Pooled write connection (call with self._lock held)"""
+        if self._rw_conn is None:
+            self._rw_conn = self._get_write_connection()
+        return self._rw_conn
+    
+    def _get_reader(self) -> sqlite3.Connection:
+        """Pooled read connection for the calling thread"""
+        ident = threading.get_ident()
+        conn = self._readers.get(ident)
+        if conn is None:
+            with self._lock:
+                # Drop readers of finished threads (e.g. Streamlit reruns)
+                alive = {t.ident for t in threading.enumerate()}
+                for dead in [k for k in self._readers if k not in alive]:
+                    self._readers.pop(dead).close()
+                conn = self._readers[ident] = self._get_read_connection()
+        return conn
+    
+    @contextmanager
+    def _conn(self, write: bool = False):
+        """
+        Yield a pooled connection. Writes are serialized and committed on success,
+        rolled back on error. Connections are never closed here (see close()).
+        """
+        if not write:
+            yield self._get_reader()
+            return
         
-        # Migrate existing tables to add new columns if needed
-        self._migrate_schema(conn)
+        with self._lock:
+            conn = self._get_writer()
+            conn.execute("BEGIN")
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._alert_version = None  # In-memory alert set may be ahead of the db
+                raise
+    
+    def _schema_key(self) -> Optional[Tuple[str, int, int]]:
+        """
+        Identity of the db file: (path, device, inode), stable across writes.
+        A file recreated at the same path normally gets a new inode; otherwise
+        _create_schema's user_version check is the safety net on the next process.
+        """
+        try:
+            st = self.db_path.stat()
+        except FileNotFoundError:
+            return None
+        return (str(self.db_path.resolve()), st.st_dev, st.st_ino)
+    
+    def _initialize_schema(self):
+        """Initialize database schema once per db file per process"""
+        if self._schema_key() in UserDatabase._initialized_paths:
+            return
+        self._create_schema()
+        UserDatabase._initialized_paths.add(self._schema_key())
+    
+    def _create_schema(self):
+        """Create tables/indexes and migrate (skipped when user_version is current)"""
+        with self._conn(write=True) as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+                return
+            
+            # Watchlist table
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    symbol VARCHAR PRIMARY KEY,
+                    added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    notes TEXT
+                )
+            """)
+            
+            # Trading journal
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS trading_journal (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol VARCHAR NOT NULL,
+                    entry_date TIMESTAMP NOT NULL,
+                    entry_price DOUBLE NOT NULL,
+                    exit_date TIMESTAMP,
+                    exit_price DOUBLE,
+                    quantity INTEGER NOT NULL,
+                    stop_loss DOUBLE,
+                    target_price DOUBLE,
+                    current_stop_loss DOUBLE,  -- Current trailing stop (updated over time)
+                    status VARCHAR DEFAULT 'open',  -- open, closed, stopped, target_reached
+                    notes TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # Executed orders
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS executed_orders (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol VARCHAR NOT NULL,
+                    order_type VARCHAR NOT NULL,  -- buy, sell
+                    price DOUBLE NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    broker_order_id VARCHAR,
+                    notes TEXT
+                )
+            """)
+            
+            # Signal history
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS signal_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol VARCHAR NOT NULL,
+                    signal_date TIMESTAMP NOT NULL,
+                    score DOUBLE NOT NULL,
+                    entry_price DOUBLE,
+                    stop_loss DOUBLE,
+                    position_size INTEGER,
+                    status VARCHAR DEFAULT 'generated',  -- generated, executed, expired
+                    notes TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # User settings (capital, telegram config, etc.)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_settings (
+                    key VARCHAR PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # Telegram: invio alert prezzo solo una volta per livello/simbolo (evita ripetizioni ogni 5 min)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS telegram_alert_sent (
+                    symbol VARCHAR NOT NULL,
+                    level_type VARCHAR NOT NULL,
+                    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (symbol, level_type)
+                )
+            """)
+            
+            # Indexes for the hot predicates (telegram_alert_sent lookups by symbol
+            # are already served by its (symbol, level_type) primary key)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tj_status ON trading_journal(status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tj_symbol_status ON trading_journal(symbol, status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tj_exit_date ON trading_journal(exit_date DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sig_date ON signal_history(signal_date DESC)")
+            
+            # Migrate existing tables to add new columns if needed
+            self._migrate_schema(conn)
+            
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
         
-        conn.close()
         logger.info("User database schema initialized")
     
+    @staticmethod
+    def _table_columns(conn: sqlite3.Connection, table: str) -> set:
+        """Column names of a table (PRAGMA table_info)"""
+        return {row[1] for row in conn.execute("PRAGMA table_info({})".format(table))}
+    
     def _migrate_schema(self, conn: sqlite3.Connection):
         """Migrate existing schema to add new columns if they don't exist"""
-        cursor = conn.cursor()
-        
         # Check if trading_journal table exists and get its columns
-        cursor.execute("""
+        table_exists = conn.execute("""
             SELECT name FROM sqlite_master 
             WHERE type='table' AND name='trading_journal'
-        """)
-        if cursor.fetchone():
+        """).fetchone()
+        if table_exists:
             # Get existing columns
-            cursor.execute("PRAGMA table_info(trading_journal)")
-            existing_columns = {row[1] for row in cursor.fetchall()}
+            existing_columns = self._table_columns(conn, 'trading_journal')
             
             # Add current_stop_loss if missing
             if 'current_stop_loss' not in existing_columns:
                 try:
-                    cursor.execute("ALTER TABLE trading_journal ADD COLUMN current_stop_loss DOUBLE")
+                    conn.execute("ALTER TABLE trading_journal ADD COLUMN current_stop_loss DOUBLE")
                     logger.info("Added column 'current_stop_loss' to trading_journal")
                 except sqlite3.OperationalError as e:
                     logger.warning(f"Could not add column 'current_stop_loss': {e}")
@@ -140,59 +249,42 @@ class UserDatabase:
             if 'updated_at' not in existing_columns:
                 try:
                     # Add column without default first
-                    cursor.execute("ALTER TABLE trading_journal ADD COLUMN updated_at TIMESTAMP")
-                    # Update existing records with current timestamp
-                    cursor.execute("""
+                    conn.execute("ALTER TABLE trading_journal ADD COLUMN updated_at TIMESTAMP")
+                    # Update existing records (CURRENT_TIMESTAMP when created_at is NULL)
+                    conn.execute("""
                         UPDATE trading_journal 
                         SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)
                         WHERE updated_at IS NULL
                     """)
-                    # If created_at doesn't exist, use CURRENT_TIMESTAMP
-                    cursor.execute("""
-                        UPDATE trading_journal 
-                        SET updated_at = CURRENT_TIMESTAMP
-                        WHERE updated_at IS NULL
-                    """)
                     logger.info("Added column 'updated_at' to trading_journal")
                 except sqlite3.OperationalError as e:
                     logger.warning(f"Could not add column 'updated_at': {e}")
             
             # Initialize current_stop_loss for existing open positions that don't have it set
-            cursor.execute("""
+            conn.execute("""
                 UPDATE trading_journal 
                 SET current_stop_loss = stop_loss 
                 WHERE status = 'open' AND current_stop_loss IS NULL AND stop_loss IS NOT NULL
             """)
-        
-        conn.commit()
     
     # Watchlist methods
     def add_to_watchlist(self, symbol: str, notes: str = ""):
         """Add symbol to watchlist"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT OR REPLACE INTO watchlist (symbol, notes) VALUES (?, ?)",
-            (symbol.upper(), notes)
-        )
-        conn.commit()
-        conn.close()
+        with self._conn(write=True) as conn:
+            conn.execute("""
+                INSERT INTO watchlist (symbol, notes) VALUES (?, ?)
+                ON CONFLICT(symbol) DO UPDATE SET notes = excluded.notes
+            """, (symbol.upper(), notes))
     
     def remove_from_watchlist(self, symbol: str):
         """Remove symbol from watchlist"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM watchlist WHERE symbol = ?", (symbol.upper(),))
-        conn.commit()
-        conn.close()
+        with self._conn(write=True) as conn:
+            conn.execute("DELETE FROM watchlist WHERE symbol = ?", (symbol.upper(),))
     
     def get_watchlist(self) -> List[Dict]:
         """Get all watchlist symbols"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM watchlist ORDER BY symbol")
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            rows = conn.execute("SELECT * FROM watchlist ORDER BY symbol").fetchall()
         return [dict(row) for row in rows]
     
     # Trading journal methods
@@ -200,154 +292,157 @@ class UserDatabase:
                   stop_loss: Optional[float] = None, target_price: Optional[float] = None,
                   notes: str = ""):
         """Add trade to journal"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO trading_journal 
-            (symbol, entry_date, entry_price, quantity, stop_loss, target_price, current_stop_loss, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (symbol.upper(), datetime.now(), entry_price, quantity, stop_loss, target_price, stop_loss, notes))
-        conn.commit()
-        conn.close()
+        self.add_trades_bulk([{
+            'symbol': symbol,
+            'entry_price': entry_price,
+            'quantity': quantity,
+            'stop_loss': stop_loss,
+            'target_price': target_price,
+            'notes': notes
+        }])
+    
+    def add_trades_bulk(self, rows: Iterable[Dict]) -> int:
+        """
+        Add many trades in a single transaction (e.g. importing a backtest)
+        
+        Args:
+            rows: Dicts with add_trade() fields; optional 'entry_date' (default: now, set by SQLite)
+            
+        Returns:
+            Number of trades inserted
+        """
+        params = [
+            (r['symbol'].upper(), r.get('entry_date'), r['entry_price'], r['quantity'],
+             r.get('stop_loss'), r.get('target_price'), r.get('stop_loss'), r.get('notes', ""))
+            for r in rows
+        ]
+        with self._conn(write=True) as conn:
+            conn.executemany("""
+                INSERT INTO trading_journal 
+                (symbol, entry_date, entry_price, quantity, stop_loss, target_price, current_stop_loss, notes)
+                VALUES (?, COALESCE(?, datetime('now', 'localtime')), ?, ?, ?, ?, ?, ?)
+            """, params)
+        return len(params)
     
     def update_trade(self, trade_id: int, exit_price: Optional[float] = None,
                      status: Optional[str] = None, notes: str = ""):
         """Update trade in journal"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        updates = []
-        params = []
-        
-        if exit_price is not None:
-            updates.append("exit_price = ?")
-            params.append(exit_price)
-            updates.append("exit_date = ?")
-            params.append(datetime.now())
-        
-        if status:
-            updates.append("status = ?")
-            params.append(status)
-        
-        if notes:
-            updates.append("notes = ?")
-            params.append(notes)
-        
-        if updates:
-            params.append(trade_id)
-            query = f"UPDATE trading_journal SET {', '.join(updates)} WHERE id = ?"
-            cursor.execute(query, params)
-            conn.commit()
-        
-        conn.close()
+        with self._conn(write=True) as conn:
+            updates = []
+            params = []
+            
+            if exit_price is not None:
+                updates.append("exit_price = ?")
+                params.append(exit_price)
+                updates.append("exit_date = datetime('now', 'localtime')")
+            
+            if status:
+                updates.append("status = ?")
+                params.append(status)
+            
+            if notes:
+                updates.append("notes = ?")
+                params.append(notes)
+            
+            if updates:
+                params.append(trade_id)
+                query = f"UPDATE trading_journal SET {', '.join(updates)} WHERE id = ?"
+                conn.execute(query, params)
     
     def get_open_trades(self) -> List[Dict]:
         """Get all open trades"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM trading_journal WHERE status = 'open' ORDER BY entry_date")
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            rows = conn.execute("SELECT * FROM trading_journal WHERE status = 'open' ORDER BY entry_date, id").fetchall()
         return [dict(row) for row in rows]
     
     def get_closed_trades(self, limit: Optional[int] = None) -> List[Dict]:
         """Get all closed trades"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        query = "SELECT * FROM trading_journal WHERE status != 'open' ORDER BY exit_date DESC"
-        if limit:
-            query += f" LIMIT {limit}"
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            # LIMIT -1 = no limit: one statement (and cached plan) for every call
+            rows = conn.execute(
+                "SELECT * FROM trading_journal WHERE status != 'open' ORDER BY exit_date DESC LIMIT ?",
+                (limit if limit else -1,)
+            ).fetchall()
         return [dict(row) for row in rows]
     
-    def get_trade_statistics(self) -> Dict:
-        """Calculate trading statistics"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Get all closed trades with all columns
-        cursor.execute("""
-            SELECT symbol, entry_price, exit_price, quantity, status, entry_date, exit_date
-            FROM trading_journal 
-            WHERE status != 'open' AND exit_price IS NOT NULL
-        """)
-        closed_trades = cursor.fetchall()
-        
-        if not closed_trades:
-            return {
-                'total_trades': 0,
-                'winning_trades': 0,
-                'losing_trades': 0,
-                'win_rate': 0.0,
-                'total_pnl': 0.0,
-                'avg_pnl': 0.0,
-                'best_trade': None,
-                'worst_trade': None,
-                'avg_win': 0.0,
-                'avg_loss': 0.0
-            }
-        
-        # Calculate statistics
-        total_trades = len(closed_trades)
-        winning_trades = 0
-        losing_trades = 0
-        total_pnl = 0.0
-        pnl_list = []
-        best_trade = None
-        worst_trade = None
-        wins = []
-        losses = []
+    def get_closed_trades_df(self, limit: Optional[int] = None):
+        """
+        Closed trades as a DataFrame (bulk column fetch, no per-row dicts)
         
-        for trade in closed_trades:
-            symbol = trade[0]
-            entry_price = trade[1]
-            exit_price = trade[2]
-            quantity = trade[3]
-            status = trade[4]
-            entry_date = trade[5]
-            exit_date = trade[6]
+        Args:
+            limit: Max number of most recent trades (None = all)
             
-            pnl = (exit_price - entry_price) * quantity
-            pnl_list.append(pnl)
-            total_pnl += pnl
+        Returns:
+            pd.DataFrame with trading_journal columns, entry/exit dates parsed
+        """
+        import pandas as pd  # Lazy: only analytics/reporting paths need pandas
+        
+        date_format = {'format': 'ISO8601'}
+        with self._conn() as conn:
+            return pd.read_sql_query(
+                "SELECT * FROM trading_journal WHERE status != 'open' ORDER BY exit_date DESC LIMIT ?",
+                conn,
+                params=(limit if limit else -1,),
+                parse_dates={'entry_date': date_format, 'exit_date': date_format}
+            )
+    
+    def get_trade_statistics(self) -> Dict:
+        """Calculate trading statistics (aggregated in SQL)"""
+        pnl = "(exit_price - entry_price) * quantity"
+        closed = "status != 'open' AND exit_price IS NOT NULL"
+        extreme_sql = f"""
+            SELECT symbol, {pnl} AS pnl, entry_price, exit_price, quantity,
+                   entry_date, exit_date, status
+            FROM trading_journal
+            WHERE {closed} AND {{cond}}
+            ORDER BY pnl {{order}}, id
+            LIMIT 1
+        """
+        
+        with self._conn() as conn:
+            agg = conn.execute(f"""
+                SELECT COUNT(*) AS total_trades,
+                       SUM(CASE WHEN {pnl} > 0 THEN 1 ELSE 0 END) AS winning_trades,
+                       SUM({pnl}) AS total_pnl,
+                       AVG(CASE WHEN {pnl} > 0 THEN {pnl} END) AS avg_win,
+                       AVG(CASE WHEN {pnl} <= 0 THEN {pnl} END) AS avg_loss
+                FROM trading_journal
+                WHERE {closed}
+            """).fetchone()
             
-            trade_info = {
-                'symbol': symbol,
-                'pnl': pnl,
-                'entry_price': entry_price,
-                'exit_price': exit_price,
-                'quantity': quantity,
-                'entry_date': entry_date,
-                'exit_date': exit_date,
-                'status': status
-            }
+            total_trades = agg['total_trades']
+            if not total_trades:
+                return {
+                    'total_trades': 0,
+                    'winning_trades': 0,
+                    'losing_trades': 0,
+                    'win_rate': 0.0,
+                    'total_pnl': 0.0,
+                    'avg_pnl': 0.0,
+                    'best_trade': None,
+                    'worst_trade': None,
+                    'avg_win': 0.0,
+                    'avg_loss': 0.0
+                }
             
-            if pnl > 0:
-                winning_trades += 1
-                wins.append(pnl)
-                if best_trade is None or pnl > best_trade['pnl']:
-                    best_trade = trade_info.copy()
-            else:
-                losing_trades += 1
-                losses.append(pnl)
-                if worst_trade is None or pnl < worst_trade['pnl']:
-                    worst_trade = trade_info.copy()
+            # Best winner / worst loser (first inserted wins ties)
+            best_row = conn.execute(extreme_sql.format(cond=f"{pnl} > 0", order="DESC")).fetchone()
+            worst_row = conn.execute(extreme_sql.format(cond=f"{pnl} <= 0", order="ASC")).fetchone()
         
-        conn.close()
+        winning_trades = agg['winning_trades']
+        total_pnl = agg['total_pnl']
         
         return {
             'total_trades': total_trades,
             'winning_trades': winning_trades,
-            'losing_trades': losing_trades,
-            'win_rate': (winning_trades / total_trades * 100) if total_trades > 0 else 0.0,
+            'losing_trades': total_trades - winning_trades,
+            'win_rate': winning_trades / total_trades * 100,
             'total_pnl': total_pnl,
-            'avg_pnl': total_pnl / total_trades if total_trades > 0 else 0.0,
-            'best_trade': best_trade,
-            'worst_trade': worst_trade,
-            'avg_win': sum(wins) / len(wins) if wins else 0.0,
-            'avg_loss': sum(losses) / len(losses) if losses else 0.0
+            'avg_pnl': total_pnl / total_trades,
+            'best_trade': dict(best_row) if best_row else None,
+            'worst_trade': dict(worst_row) if worst_row else None,
+            'avg_win': agg['avg_win'] or 0.0,
+            'avg_loss': agg['avg_loss'] or 0.0
         }
     
     # Signal history methods
@@ -355,27 +450,46 @@ class UserDatabase:
                     stop_loss: Optional[float] = None, position_size: Optional[int] = None,
                     notes: str = ""):
         """Save generated signal"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO signal_history 
-            (symbol, signal_date, score, entry_price, stop_loss, position_size, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (symbol.upper(), datetime.now(), score, entry_price, stop_loss, position_size, notes))
-        conn.commit()
-        conn.close()
+        self.save_signals_bulk([{
+            'symbol': symbol,
+            'score': score,
+            'entry_price': entry_price,
+            'stop_loss': stop_loss,
+            'position_size': position_size,
+            'notes': notes
+        }])
+    
+    def save_signals_bulk(self, rows: Iterable[Dict]) -> int:
+        """
+        Save many signals in a single transaction (e.g. backtest signal history)
+        
+        Args:
+            rows: Dicts with save_signal() fields; optional 'signal_date' (default: now, set by SQLite)
+            
+        Returns:
+            Number of signals saved
+        """
+        params = [
+            (r['symbol'].upper(), r.get('signal_date'), r['score'], r.get('entry_price'),
+             r.get('stop_loss'), r.get('position_size'), r.get('notes', ""))
+            for r in rows
+        ]
+        with self._conn(write=True) as conn:
+            conn.executemany("""
+                INSERT INTO signal_history 
+                (symbol, signal_date, score, entry_price, stop_loss, position_size, notes)
+                VALUES (?, COALESCE(?, datetime('now', 'localtime')), ?, ?, ?, ?, ?)
+            """, params)
+        return len(params)
     
     def get_recent_signals(self, days: int = 7) -> List[Dict]:
         """Get recent signals"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM signal_history 
-            WHERE signal_date >= datetime('now', '-' || ? || ' days')
-            ORDER BY signal_date DESC
-        """, (days,))
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            rows = conn.execute("""
+                SELECT * FROM signal_history 
+                WHERE signal_date >= datetime('now', '-' || ? || ' days')
+                ORDER BY signal_date DESC
+            """, (days,)).fetchall()
         return [dict(row) for row in rows]
     
     # Position monitoring methods
@@ -385,87 +499,28 @@ class UserDatabase:
     
     def get_position_stop(self, symbol: str) -> Optional[float]:
         """Get current stop loss for a position"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT stop_loss FROM trading_journal 
-            WHERE symbol = ? AND status = 'open'
-            ORDER BY entry_date DESC LIMIT 1
-        """, (symbol.upper(),))
-        row = cursor.fetchone()
-        conn.close()
+        with self._conn() as conn:
+            row = conn.execute("""
+                SELECT stop_loss FROM trading_journal 
+                WHERE symbol = ? AND status = 'open'
+                ORDER BY entry_date DESC, id DESC LIMIT 1
+            """, (symbol.upper(),)).fetchone()
         return row['stop_loss'] if row else None
     
-    def _ensure_column_exists(self, conn: sqlite3.Connection, table: str, column: str, column_type: str):
-        """Ensure a column exists in a table, add it if missing"""
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info({})".format(table))
-        existing_columns = {row[1] for row in cursor.fetchall()}
-        
-        if column not in existing_columns:
-            try:
-                cursor.execute("ALTER TABLE {} ADD COLUMN {} {}".format(table, column, column_type))
-                
-                # If adding updated_at, initialize existing records
-                if column == "updated_at" and table == "trading_journal":
-                    # Try to use created_at if it exists, otherwise use CURRENT_TIMESTAMP
-                    cursor.execute("""
-                        UPDATE trading_journal 
-                        SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)
-                        WHERE updated_at IS NULL
-                    """)
-                    # Fallback for records without created_at
-                    cursor.execute("""
-                        UPDATE trading_journal 
-                        SET updated_at = CURRENT_TIMESTAMP
-                        WHERE updated_at IS NULL
-                    """)
-                
-                conn.commit()
-                logger.info(f"Added column '{column}' to {table}")
-            except sqlite3.OperationalError as e:
-                logger.warning(f"Could not add column '{column}' to {table}: {e}")
-    
     def update_position_stop(self, symbol: str, new_stop: float, reason: str = ""):
         """Update stop loss for an active position"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Ensure columns exist
-        self._ensure_column_exists(conn, "trading_journal", "current_stop_loss", "DOUBLE")
-        self._ensure_column_exists(conn, "trading_journal", "updated_at", "TIMESTAMP")
-        
-        # Build update query - check if updated_at column exists
-        cursor.execute("PRAGMA table_info(trading_journal)")
-        columns = {row[1] for row in cursor.fetchall()}
-        
-        if 'updated_at' in columns:
-            cursor.execute("""
+        # current_stop_loss/updated_at are guaranteed by the startup migration
+        with self._conn(write=True) as conn:
+            conn.execute("""
                 UPDATE trading_journal 
                 SET current_stop_loss = ?, stop_loss = ?, 
-                    notes = COALESCE(notes || '\n' || ?, ?),
+                    notes = IFNULL(notes || char(10), '') || ?,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE symbol = ? AND status = 'open'
-            """, (new_stop, new_stop, f"Stop updated: {reason}", reason, symbol.upper()))
-        else:
-            cursor.execute("""
-                UPDATE trading_journal 
-                SET current_stop_loss = ?, stop_loss = ?, 
-                    notes = COALESCE(notes || '\n' || ?, ?)
-                WHERE symbol = ? AND status = 'open'
-            """, (new_stop, new_stop, f"Stop updated: {reason}", reason, symbol.upper()))
-        
-        conn.commit()
-        conn.close()
+            """, (new_stop, new_stop, f"Stop updated: {reason}", symbol.upper()))
     
     def close_position(self, symbol: str, exit_price: float, reason: str = ""):
         """Close a position"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Ensure columns exist
-        self._ensure_column_exists(conn, "trading_journal", "updated_at", "TIMESTAMP")
-        
         # Determine status based on reason
         if "target" in reason.lower() or "profit" in reason.lower():
             status = "target_reached"
@@ -474,126 +529,119 @@ class UserDatabase:
         else:
             status = "closed"
         
-        # Check if updated_at column exists
-        cursor.execute("PRAGMA table_info(trading_journal)")
-        columns = {row[1] for row in cursor.fetchall()}
-        
-        if 'updated_at' in columns:
-            cursor.execute("""
+        with self._conn(write=True) as conn:
+            conn.execute("""
                 UPDATE trading_journal 
-                SET exit_price = ?, exit_date = ?, status = ?,
-                    notes = COALESCE(notes || '\n' || ?, ?),
+                SET exit_price = ?, exit_date = datetime('now', 'localtime'), status = ?,
+                    notes = IFNULL(notes || char(10), '') || ?,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE symbol = ? AND status = 'open'
-            """, (exit_price, datetime.now(), status, f"Closed: {reason}", reason, symbol.upper()))
-        else:
-            cursor.execute("""
-                UPDATE trading_journal 
-                SET exit_price = ?, exit_date = ?, status = ?,
-                    notes = COALESCE(notes || '\n' || ?, ?)
-                WHERE symbol = ? AND status = 'open'
-            """, (exit_price, datetime.now(), status, f"Closed: {reason}", reason, symbol.upper()))
+            """, (exit_price, status, f"Closed: {reason}", symbol.upper()))
+            
+            self._clear_alerts_for_symbols(conn, {symbol.upper()})
+    
+    def _get_alerts_sent(self) -> Set[Tuple[str, str]]:
+        """
+        Sent alerts as a set of (symbol, level_type).
         
-        conn.commit()
-        conn.close()
-        self.clear_alerts_for_symbol(symbol)
+        PRAGMA data_version on the writer connection only changes when another
+        connection (dashboard, other process) commits, so the table is re-read
+        only then; our own writes update the set directly.
+        """
+        with self._lock:
+            conn = self._get_writer()
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._alert_version:
+                self._alert_sent = {
+                    (row[0], row[1])
+                    for row in conn.execute("SELECT symbol, level_type FROM telegram_alert_sent")
+                }
+                self._alert_version = version
+            return self._alert_sent
     
     def was_price_alert_sent(self, symbol: str, level_type: str) -> bool:
         """Check if we already sent this price alert for this symbol (evita ripetizioni)."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT 1 FROM telegram_alert_sent WHERE symbol = ? AND level_type = ?",
-            (symbol.upper(), level_type)
-        )
-        row = cursor.fetchone()
-        conn.close()
-        return row is not None
+        return (symbol.upper(), level_type) in self._get_alerts_sent()
     
     def set_price_alert_sent(self, symbol: str, level_type: str):
         """Mark that we sent this price alert for this symbol."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT OR REPLACE INTO telegram_alert_sent (symbol, level_type, sent_at) VALUES (?, ?, ?)",
-            (symbol.upper(), level_type, datetime.now())
-        )
-        conn.commit()
-        conn.close()
+        with self._conn(write=True) as conn:
+            conn.execute("""
+                INSERT INTO telegram_alert_sent (symbol, level_type, sent_at)
+                VALUES (?, ?, datetime('now', 'localtime'))
+                ON CONFLICT(symbol, level_type) DO UPDATE SET sent_at = excluded.sent_at
+            """, (symbol.upper(), level_type))
+        with self._lock:
+            self._alert_sent.add((symbol.upper(), level_type))
     
     def clear_alerts_for_symbol(self, symbol: str):
         """Clear sent alerts for symbol (e.g. when position is closed)."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM telegram_alert_sent WHERE symbol = ?", (symbol.upper(),))
-        conn.commit()
-        conn.close()
+        with self._conn(write=True) as conn:
+            self._clear_alerts_for_symbols(conn, {symbol.upper()})
+    
+    def _clear_alerts_for_symbols(self, conn: sqlite3.Connection, symbols: Set[str]):
+        """
+        Clear sent alerts for many symbols with one DELETE.
+        
+        Runs inside the caller's write transaction (lock held), so trade and
+        alert deletions are committed together.
+        """
+        if not symbols:
+            return
+        placeholders = ','.join('?' * len(symbols))
+        conn.execute(f"DELETE FROM telegram_alert_sent WHERE symbol IN ({placeholders})", tuple(symbols))
+        self._alert_sent = {key for key in self._alert_sent if key[0] not in symbols}
     
     def delete_trade(self, trade_id: int) -> bool:
         """Delete a single trade by ID (for cleaning test data)."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT symbol FROM trading_journal WHERE id = ?", (trade_id,))
-        row = cursor.fetchone()
-        if not row:
-            conn.close()
-            return False
-        cursor.execute("DELETE FROM trading_journal WHERE id = ?", (trade_id,))
-        conn.commit()
-        conn.close()
-        self.clear_alerts_for_symbol(row['symbol'])
+        with self._conn(write=True) as conn:
+            row = conn.execute(
+                "DELETE FROM trading_journal WHERE id = ? RETURNING symbol", (trade_id,)
+            ).fetchone()
+            if not row:
+                return False
+            self._clear_alerts_for_symbols(conn, {row[0]})
         return True
     
     def delete_all_closed_trades(self) -> int:
         """Delete all closed trades (for cleaning test/prova data). Returns count deleted."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT symbol FROM trading_journal WHERE status != 'open'")
-        symbols = {row['symbol'] for row in cursor.fetchall()}
-        cursor.execute("DELETE FROM trading_journal WHERE status != 'open'")
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
-        for sym in symbols:
-            self.clear_alerts_for_symbol(sym)
-        return deleted
+        with self._conn(write=True) as conn:
+            rows = conn.execute("DELETE FROM trading_journal WHERE status != 'open' RETURNING symbol").fetchall()
+            self._clear_alerts_for_symbols(conn, {row[0] for row in rows})
+        return len(rows)
     
     def reset_all_trades(self) -> int:
         """Delete ALL trades (open and closed) for a complete reset. Returns count deleted."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT symbol FROM trading_journal")
-        symbols = {row['symbol'] for row in cursor.fetchall()}
-        cursor.execute("DELETE FROM trading_journal")
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
-        # Clear all alerts
-        for sym in symbols:
-            self.clear_alerts_for_symbol(sym)
+        with self._conn(write=True) as conn:
+            rows = conn.execute("DELETE FROM trading_journal RETURNING symbol").fetchall()
+            # Clear all alerts
+            self._clear_alerts_for_symbols(conn, {row[0] for row in rows})
+        deleted = len(rows)
         logger.info(f"Reset all trades: {deleted} trades deleted")
         return deleted
     
     # User settings methods
     def get_setting(self, key: str, default: str = None) -> Optional[str]:
         """Get user setting"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM user_settings WHERE key = ?", (key,))
-        row = cursor.fetchone()
-        conn.close()
+        with self._conn() as conn:
+            row = conn.execute("SELECT value FROM user_settings WHERE key = ?", (key,)).fetchone()
         return row['value'] if row else default
     
     def set_setting(self, key: str, value: str):
         """Set user setting"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO user_settings (key, value, updated_at)
-            VALUES (?, ?, ?)
-        """, (key, value, datetime.now()))
-        conn.commit()
-        conn.close()
+        with self._conn(write=True) as conn:
+            conn.execute("""
+                INSERT INTO user_settings (key, value, updated_at)
+                VALUES (?, ?, datetime('now', 'localtime'))
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            """, (key, value))
+    
+    @staticmethod
+    def _parse_timestamp(value) -> datetime:
+        """Parse a stored TIMESTAMP ('YYYY-MM-DD HH:MM:SS[.ffffff]') without pandas"""
+        if isinstance(value, datetime):
+            return value
+        return datetime.fromisoformat(str(value).replace(' ', 'T').split('.')[0])
     
     def analyze_trade_performance(self, trade_id: int) -> Dict:
         """
@@ -602,15 +650,11 @@ class UserDatabase:
         Returns:
             Dict with analysis results
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Get trade details
-        cursor.execute("SELECT * FROM trading_journal WHERE id = ?", (trade_id,))
-        trade = cursor.fetchone()
+        with self._conn() as conn:
+            # Get trade details
+            trade = conn.execute("SELECT * FROM trading_journal WHERE id = ?", (trade_id,)).fetchone()
         
         if not trade:
-            conn.close()
             return {'error': 'Trade not found'}
         
         trade_dict = dict(trade)
@@ -654,20 +698,25 @@ class UserDatabase:
             
             # Calculate days held
             if trade_dict.get('entry_date') and trade_dict.get('exit_date'):
-                entry_date = pd.to_datetime(trade_dict['entry_date'])
-                exit_date = pd.to_datetime(trade_dict['exit_date'])
+                entry_date = self._parse_timestamp(trade_dict['entry_date'])
+                exit_date = self._parse_timestamp(trade_dict['exit_date'])
                 days_held = (exit_date - entry_date).days
                 analysis['days_held'] = days_held
             
-            conn.close()
             return analysis
         else:
-            conn.close()
             return {'error': 'Trade not closed yet'}
     
     def close(self):
-        """Close database connection (no-op for SQLite, connections are auto-closed)"""
-        pass
+        """Close pooled connections"""
+        with self._lock:
+            if self._rw_conn is not None:
+                self._rw_conn.close()
+                self._rw_conn = None
+                self._alert_version = None
+            for conn in self._readers.values():
+                conn.close()
+            self._readers.clear()
     
     def __enter__(self):
         """Context manager entry"""
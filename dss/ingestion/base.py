@@ -1,16 +1,21 @@
 """Abstract base class for data providers"""
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
 from datetime import datetime
 import pandas as pd
+from loguru import logger
 
 
 class DataProvider(ABC):
     """Abstract base class for market data providers"""
     
+    _REQUIRED_COLS = frozenset({'timestamp', 'open', 'high', 'low', 'close', 'volume'})
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
         self.rate_limit_delay = 0.1  # Default delay between requests
+        self.max_concurrency = 8  # Parallel requests in the default get_multiple_symbols
     
     @abstractmethod
     async def get_historical_data(
@@ -39,7 +44,6 @@ class DataProvider(ABC):
         """Get the latest bar for a symbol"""
         pass
     
-    @abstractmethod
     async def get_multiple_symbols(
         self,
         symbols: List[str],
@@ -47,12 +51,30 @@ class DataProvider(ABC):
         end_date: datetime,
         timeframe: str = "1D"
     ) -> Dict[str, pd.DataFrame]:
-        """Fetch data for multiple symbols efficiently"""
-        pass
+        """
+        Fetch data for multiple symbols concurrently
+        
+        Default implementation: at most max_concurrency get_historical_data calls
+        in flight. Override only when the provider has a real batch endpoint.
+        Failed symbols map to an empty DataFrame.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def fetch_one(symbol: str) -> pd.DataFrame:
+            async with semaphore:
+                return await self.get_historical_data(symbol, start_date, end_date, timeframe)
+        
+        fetched = await asyncio.gather(*(fetch_one(s) for s in symbols), return_exceptions=True)
+        
+        results = {}
+        for symbol, result in zip(symbols, fetched):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching {symbol}: {result}")
+                results[symbol] = pd.DataFrame()
+            else:
+                results[symbol] = result
+        return results
     
     def validate_data(self, df: pd.DataFrame) -> bool:
         """Validate data quality"""
-        if df.empty:
-            return False
-        required_cols = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-        return all(col in df.columns for col in required_cols)
+        return not df.empty and self._REQUIRED_COLS.issubset(df.columns)
@@ -1,9 +1,13 @@
 """Polygon.io data provider implementation"""
 import aiohttp
 import asyncio
+import json
 import time
+from array import array
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from pathlib import Path
+from typing import Callable, List, Dict, Mapping, Optional, Tuple
+import numpy as np
 import pandas as pd
 from loguru import logger
 
@@ -11,12 +15,104 @@ from .base import DataProvider
 from .rate_limiter import TokenBucket
 from ..utils.config import config
 
+# Optional: orjson decodes large aggregate payloads several times faster than json
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    _json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _json_loads = json.loads
+
+# Optional: ijson streams very large aggregate bodies without building row dicts
+IJSON_AVAILABLE = False
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+# Optional: pyarrow lets bars go from the HTTP body to DuckDB without pandas
+PYARROW_AVAILABLE = False
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pass
+
+# Optional: httpx + h2 multiplex all requests over one HTTP/2 connection
+HTTPX_AVAILABLE = False
+try:
+    import httpx
+    import h2  # noqa: F401 - required by httpx for http2=True
+    HTTPX_AVAILABLE = True
+except ImportError:
+    pass
+
+# Transport failures worth retrying (the next attempt may succeed)
+_NETWORK_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+if HTTPX_AVAILABLE:
+    _NETWORK_ERRORS += (httpx.TransportError,)
+
+# Per-plan defaults: requests per minute and requests in flight
+_PLAN_RPM = {"free": 5, "starter": 200, "developer": 1000, "advanced": 2000}
+_PLAN_CONCURRENCY = {"free": 1, "starter": 10, "developer": 50, "advanced": 50}
+
+# Polygon aggregate field -> column name
+_AGG_FIELDS = (("t", "timestamp"), ("o", "open"), ("h", "high"), ("l", "low"), ("c", "close"), ("v", "volume"))
+
+# Arrow schema of ingested bars (naive timestamps, like the market_data table)
+if PYARROW_AVAILABLE:
+    _ARROW_SCHEMA = pa.schema([
+        ("timestamp", pa.timestamp("ms")),
+        ("symbol", pa.string()),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.float64())
+    ])
+
+# Timeframe -> Polygon aggregate timespan
+_TIMESPANS = {
+    "1W": "week",  # Weekly data
+    "1D": "day",
+    "1H": "hour",
+    "15min": "minute",
+    "5min": "minute",
+    "1min": "minute"
+}
+
+
+def _parse_timeframe(timeframe: str) -> str:
+    """Convert timeframe to Polygon format"""
+    return _TIMESPANS.get(timeframe, "day")
+
+
+class PolygonAPIError(Exception):
+    """Retriable Polygon HTTP error (429 or 5xx)"""
+    
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Polygon API error {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+        self.retriable = status == 429 or status >= 500
+
 
 class PolygonProvider(DataProvider):
     """Polygon.io API implementation"""
 
     BASE_URL = "https://api.polygon.io"
 
+    # Snapshot price sources in priority order: (ticker key, price field)
+    _PRICE_PATHS = (("lastTrade", "p"), ("min", "c"), ("day", "c"), ("prevDay", "c"))
+    
+    # Bodies above this size (~40k daily bars) are stream-parsed when ijson is installed
+    _STREAM_MIN_BYTES = 4 * 1024 * 1024
+    
+    # Ticker details cache lifetime (seconds)
+    TICKER_DETAILS_TTL = 86400
+
     def __init__(self, api_key: Optional[str] = None):
         super().__init__(api_key or config.get_env("POLYGON_API_KEY"))
         if not self.api_key:
@@ -24,20 +120,9 @@ class PolygonProvider(DataProvider):
 
         # Rate limiting via TokenBucket (safe for concurrent requests)
         plan = config.get("data_provider.plan", "free").lower()
+        self.plan = plan
         requests_per_minute = config.get("data_provider.requests_per_minute", None)
-
-        if requests_per_minute:
-            rpm = int(requests_per_minute)
-        elif plan == "free":
-            rpm = 5
-        elif plan == "starter":
-            rpm = 200
-        elif plan == "developer":
-            rpm = 1000
-        elif plan == "advanced":
-            rpm = 2000
-        else:
-            rpm = 5
+        rpm = int(requests_per_minute) if requests_per_minute else _PLAN_RPM.get(plan, 5)
 
         # TokenBucket: capacity = burst size (10% of RPM, min 1), refill = tokens/sec
         burst = max(1, rpm // 10)
@@ -45,30 +130,95 @@ class PolygonProvider(DataProvider):
         self._rate_limiter = TokenBucket(capacity=burst, refill_rate=refill_rate)
 
         logger.info(f"Polygon provider initialized - Plan: {plan}, {rpm} req/min (burst: {burst})")
+        
+        # Requests in flight for get_multiple_symbols (paced by the token bucket)
+        self.max_concurrency = _PLAN_CONCURRENCY.get(plan, 1)
+        
+        # Keep-alive sockets to api.polygon.io: 2x the requests in flight
+        self._connections_per_host = self.max_concurrency * 2
+        self._timeout = aiohttp.ClientTimeout(total=30, connect=5, sock_read=20)
+        
+        # Query params are identical for every request (aiohttp does not mutate them)
+        self._key_params = {"apiKey": self.api_key}
+        self._base_params = {
+            "adjusted": "true",
+            "sort": "asc",
+            "limit": 50000,
+            "apiKey": self.api_key
+        }
         self._session: Optional[aiohttp.ClientSession] = None
+        
+        # HTTP/2 client (opt-in via data_provider.http2, needs httpx + h2)
+        self._http2 = bool(config.get("data_provider.http2", False))
+        if self._http2 and not HTTPX_AVAILABLE:
+            logger.warning("data_provider.http2 requires httpx and h2; falling back to aiohttp")
+            self._http2 = False
+        self._client = None
+        
+        # Ticker details change rarely: cached for a day, persisted between runs
+        self._details_path = Path(config.get_env("TICKER_DETAILS_CACHE", "./data/ticker_details.json"))
+        self._details_cache = self._load_details_cache()
+        self._details_dirty = False
+    
+    async def _get_client(self):
+        """Get or create the shared httpx HTTP/2 client"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(30.0, connect=5.0, read=20.0),
+                limits=httpx.Limits(
+                    max_connections=self._connections_per_host,
+                    keepalive_expiry=75
+                )
+            )
+        return self._client
+    
+    async def _get(self, url: str, params: Dict) -> Tuple[int, bytes, Mapping[str, str]]:
+        """GET on the shared connection pool; returns (status, body, headers)"""
+        if self._http2:
+            client = await self._get_client()
+            response = await client.get(url, params=params)
+            return response.status_code, response.content, response.headers
+        
+        session = await self._get_session()
+        async with session.get(url, params=params) as response:
+            return response.status, await response.read(), response.headers
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session"""
+        """Get or create aiohttp session (pooled keep-alive connections, DNS cache)"""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            # Connector is created with the session: it is bound to the running loop
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=self._connections_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
         return self._session
     
     async def close(self):
-        """Close aiohttp session"""
+        """Close HTTP session/client and persist the ticker details cache"""
+        if self._details_dirty:
+            self._save_details_cache()
         if self._session and not self._session.closed:
             await self._session.close()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
     
-    def _parse_timeframe(self, timeframe: str) -> str:
-        """Convert timeframe to Polygon format"""
-        mapping = {
-            "1W": "week",  # Weekly data
-            "1D": "day",
-            "1H": "hour",
-            "15min": "minute",
-            "5min": "minute",
-            "1min": "minute"
-        }
-        return mapping.get(timeframe, "day")
+    async def __aenter__(self):
+        """Async context manager: one session for the whole run"""
+        if self._http2:
+            await self._get_client()
+        else:
+            await self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.close()
+        return False
     
     async def get_historical_data(
         self,
@@ -78,8 +228,33 @@ class PolygonProvider(DataProvider):
         timeframe: str = "1D"
     ) -> pd.DataFrame:
         """Fetch historical OHLCV data from Polygon"""
-        session = await self._get_session()
+        dates = self._clamp_range(start_date, end_date, timeframe)
+        if dates is None:
+            return pd.DataFrame()
+        df = await self._fetch_range(symbol, *dates, _parse_timeframe(timeframe), self._build_frame)
+        return pd.DataFrame() if df is None else df
+    
+    async def get_historical_table(
+        self,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        timeframe: str = "1D"
+    ):
+        """
+        Fetch historical OHLCV data as a pyarrow.Table (None if no data)
         
+        Same request as get_historical_data, but the typed columns go straight
+        into Arrow buffers without a pandas frame. Requires pyarrow.
+        """
+        dates = self._clamp_range(start_date, end_date, timeframe)
+        if dates is None:
+            return None
+        return await self._fetch_range(symbol, *dates, _parse_timeframe(timeframe), self._build_table)
+    
+    @staticmethod
+    def _clamp_range(start_date: datetime, end_date: datetime, timeframe: str) -> Optional[Tuple[str, str]]:
+        """Cap end_date to data Polygon can have; returns ('YYYY-MM-DD', 'YYYY-MM-DD') or None"""
         # For daily data: allow today after US market close (22:00 CET), else cap to yesterday
         if timeframe == "1D":
             now = datetime.now()
@@ -93,117 +268,200 @@ class PolygonProvider(DataProvider):
         # Ensure end_date is not before start_date
         if end_date < start_date:
             logger.warning(f"End date {end_date.date()} is before start date {start_date.date()}")
-            return pd.DataFrame()
+            return None
         
-        tf = self._parse_timeframe(timeframe)
-        url = f"{self.BASE_URL}/v2/aggs/ticker/{symbol}/range/1/{tf}/{start_date.strftime('%Y-%m-%d')}/{end_date.strftime('%Y-%m-%d')}"
+        return f"{start_date:%Y-%m-%d}", f"{end_date:%Y-%m-%d}"
+    
+    async def _fetch_range(self, symbol: str, start_str: str, end_str: str, tf: str, build: Callable):
+        """
+        Request aggregates for pre-formatted dates and Polygon timespan.
         
-        params = {
-            "adjusted": "true",
-            "sort": "asc",
-            "limit": 50000,
-            "apiKey": self.api_key
-        }
+        Returns build(symbol, columns), or None if there is no data.
+        """
+        url = f"{self.BASE_URL}/v2/aggs/ticker/{symbol}/range/1/{tf}/{start_str}/{end_str}"
+        params = self._base_params
         
         try:
-            # TokenBucket rate limiting: safe for concurrent requests
-            await self._rate_limiter.wait_for_token()
+            # Up to two requests: a 429 is retried once after the wait Polygon asks for
+            for attempt in range(2):
+                # TokenBucket rate limiting: safe for concurrent requests
+                await self._rate_limiter.wait_for_token()
+                status, raw, headers = await self._get(url, params)
+                if status != 429 or attempt == 1:
+                    break
+                wait = self._retry_after(headers)
+                logger.warning(f"Rate limit exceeded for {symbol}. Waiting {wait:.0f} seconds before retry...")
+                await asyncio.sleep(wait)
             
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("status") == "OK" and data.get("resultsCount", 0) > 0:
-                        df = pd.DataFrame(data["results"])
-                        df = self._normalize_dataframe(df, symbol)
-                        return df
-                    else:
-                        # Log more details for debugging
-                        status_msg = data.get("status", "UNKNOWN")
-                        results_count = data.get("resultsCount", 0)
-                        logger.warning(f"No data for {symbol} from {start_date.date()} to {end_date.date()}. Status: {status_msg}, Results: {results_count}")
-                        if "statusMessage" in data:
-                            logger.debug(f"Polygon message: {data['statusMessage']}")
-                        return pd.DataFrame()
-                elif response.status == 429:
-                    # Rate limit exceeded - wait longer and retry
-                    error_text = await response.text()
-                    logger.warning(f"Rate limit exceeded for {symbol}. Waiting 60 seconds before retry...")
-                    await asyncio.sleep(60)  # Wait 1 minute
-                    # Retry once
-                    await self._rate_limiter.wait_for_token()
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            if data.get("status") == "OK" and data.get("resultsCount", 0) > 0:
-                                df = pd.DataFrame(data["results"])
-                                df = self._normalize_dataframe(df, symbol)
-                                return df
-                    logger.error(f"Retry failed for {symbol} after rate limit")
-                    return pd.DataFrame()
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Polygon API error {response.status} for {symbol}: {error_text[:200]}")
-                    return pd.DataFrame()
+            if status == 200:
+                # Decode + build run in a worker thread, off the event loop
+                data, bars = await asyncio.to_thread(self._decode_aggs, raw, symbol, build)
+                if bars is None:
+                    # Log more details for debugging
+                    status_msg = data.get("status", "UNKNOWN")
+                    results_count = data.get("resultsCount", 0)
+                    logger.warning(f"No data for {symbol} from {start_str} to {end_str}. Status: {status_msg}, Results: {results_count}")
+                    if "statusMessage" in data:
+                        logger.debug(f"Polygon message: {data['statusMessage']}")
+                return bars
+            
+            error_text = raw[:200].decode(errors="replace")
+            if status == 429 or status >= 500:
+                raise PolygonAPIError(status, error_text, self._retry_after(headers, None))
+            logger.error(f"Polygon API error {status} for {symbol}: {error_text}")
+            return None
+        except (PolygonAPIError, *_NETWORK_ERRORS):
+            raise  # Retriable: the caller decides whether to try again
         except Exception as e:
             logger.error(f"Error fetching data for {symbol}: {e}")
-            return pd.DataFrame()
+            return None
     
-    def _normalize_dataframe(self, df: pd.DataFrame, symbol: str) -> pd.DataFrame:
-        """Normalize Polygon response to standard format"""
-        if df.empty:
-            return df
+    @staticmethod
+    def _retry_after(headers, default: Optional[float] = 60.0) -> Optional[float]:
+        """Seconds from a Retry-After header (delta-seconds form), else default"""
+        try:
+            return max(0.0, float(headers.get("Retry-After")))
+        except (TypeError, ValueError):
+            return default
+    
+    @classmethod
+    def _decode_aggs(cls, raw: bytes, symbol: str, build: Callable) -> Tuple[Dict, object]:
+        """Parse a body and build the result; (payload, None) when there are no bars"""
+        data, columns = cls._parse_aggs(raw)
+        return data, None if columns is None else build(symbol, columns)
+    
+    @classmethod
+    def _parse_aggs(cls, raw: bytes) -> Tuple[Dict, Optional[Dict[str, np.ndarray]]]:
+        """
+        Decode an aggregates response body into (payload without rows, columns).
+        
+        Columns is None when Polygon reports no results.
+        """
+        if IJSON_AVAILABLE and len(raw) >= cls._STREAM_MIN_BYTES:
+            parsed = cls._stream_aggs(raw)
+            if parsed is not None:
+                return parsed
+        
+        data = _json_loads(raw)
+        rows = data.pop("results", None)
+        if data.get("status") == "OK" and data.get("resultsCount", 0) > 0 and rows:
+            return data, cls._rows_to_columns(rows)
+        return data, None
+    
+    @classmethod
+    def _stream_aggs(cls, raw: bytes) -> Optional[Tuple[Dict, Optional[Dict[str, np.ndarray]]]]:
+        """
+        Streaming variant of _parse_aggs for very large bodies.
+        
+        Bar fields are appended to typed arrays as the parser emits them, so the
+        list of row dicts is never materialized. Returns None if some bar lacks
+        a field (columns would not line up); the caller then decodes normally.
+        """
+        data = {}
+        columns = {key: array("d") for key in "tohlcv"}
+        sinks = {f"results.item.{key}": col.append for key, col in columns.items()}
+        for prefix, _event, value in ijson.parse(raw, use_float=True):
+            sink = sinks.get(prefix)
+            if sink is not None:
+                sink(value)
+            elif prefix in ("status", "resultsCount"):
+                data[prefix] = value
         
-        # Polygon returns: t (timestamp ms), o, h, l, c, v
-        df = df.rename(columns={
-            "t": "timestamp",
-            "o": "open",
-            "h": "high",
-            "l": "low",
-            "c": "close",
-            "v": "volume"
-        })
+        if len({len(col) for col in columns.values()}) != 1:
+            return None
+        if data.get("status") != "OK" or data.get("resultsCount", 0) <= 0 or not columns["t"]:
+            return data, None
         
-        # Convert timestamp from milliseconds to datetime
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-        df["symbol"] = symbol
+        # float64 holds epoch milliseconds exactly
+        arrays = {key: np.frombuffer(col, dtype=np.float64) for key, col in columns.items()}
+        arrays["t"] = arrays["t"].astype(np.int64)
+        return data, cls._sorted({name: arrays[key] for key, name in _AGG_FIELDS})
+    
+    @classmethod
+    def _rows_to_columns(cls, rows: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Pull Polygon aggregate rows into typed column arrays.
         
-        # Ensure proper column order
-        df = df[["timestamp", "symbol", "open", "high", "low", "close", "volume"]]
-        df = df.sort_values("timestamp")
+        Polygon returns a list of dicts (t = timestamp ms, o, h, l, c, v); each
+        field is read into a NumPy array instead of letting pandas infer a
+        frame from the dicts and then rename/reorder it. A price/volume field
+        missing or null in a row reads as NaN (as the DataFrame constructor
+        gave); the timestamp is required.
+        """
+        columns = {"timestamp": np.fromiter((r["t"] for r in rows), dtype="i8", count=len(rows))}
+        for key, name in _AGG_FIELDS[1:]:
+            # np.array maps None to NaN for float dtypes
+            columns[name] = np.array([r.get(key) for r in rows], dtype="f8")
+        return cls._sorted(columns)
+    
+    @staticmethod
+    def _sorted(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Requested with sort=asc; only reorder if Polygon ever returns otherwise"""
+        ts = columns["timestamp"]
+        if (ts[1:] >= ts[:-1]).all():
+            return columns
+        order = np.argsort(ts, kind="stable")
+        return {name: col[order] for name, col in columns.items()}
+    
+    @staticmethod
+    def _build_frame(symbol: str, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Assemble the standard OHLCV frame from typed columns (timestamp in ms)
         
+        The frame is valid by construction (required columns, typed arrays,
+        timestamps sorted by _sorted), so it is flagged with attrs['validated']
+        and callers can skip validate_data.
+        """
+        df = pd.DataFrame({
+            # int64 ms -> datetime64[ms] is a single cast, no per-value parsing
+            "timestamp": np.asarray(columns["timestamp"], dtype="datetime64[ms]"),
+            "symbol": np.full(len(columns["timestamp"]), symbol, dtype=object),
+            "open": columns["open"],
+            "high": columns["high"],
+            "low": columns["low"],
+            "close": columns["close"],
+            "volume": columns["volume"]
+        }, copy=False)
+        df.attrs["validated"] = True
         return df
     
+    @staticmethod
+    def _build_table(symbol: str, columns: Dict[str, np.ndarray]):
+        """Assemble the standard OHLCV pyarrow.Table from typed columns (no copies for floats)"""
+        ts = columns["timestamp"]
+        return pa.Table.from_arrays([
+            pa.array(ts, type=pa.timestamp("ms")),
+            pa.repeat(symbol, len(ts)),
+            *(pa.array(columns[name]) for name in ("open", "high", "low", "close", "volume"))
+        ], schema=_ARROW_SCHEMA)
+    
     async def get_latest_snapshot(self, symbol: str) -> Optional[Dict]:
         """
         Get latest snapshot for symbol (~15 min delayed on Starter/Developer).
         Use this for 'current price' instead of last daily bar.
         Returns: {"last_price": float, "updated_utc": int} or None.
         """
-        session = await self._get_session()
         url = f"{self.BASE_URL}/v2/snapshot/locale/us/markets/stocks/tickers/{symbol.upper()}"
-        params = {"apiKey": self.api_key}
+        params = self._key_params
         try:
             await self._rate_limiter.wait_for_token()
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    return None
-                data = await response.json()
-                if data.get("status") != "OK":
-                    return None
-                ticker = data.get("ticker") or {}
-                last_price = None
-                if ticker.get("lastTrade") and "p" in ticker["lastTrade"]:
-                    last_price = float(ticker["lastTrade"]["p"])
-                elif ticker.get("min") and "c" in ticker["min"]:
-                    last_price = float(ticker["min"]["c"])
-                elif ticker.get("day") and "c" in ticker["day"]:
-                    last_price = float(ticker["day"]["c"])
-                elif ticker.get("prevDay") and "c" in ticker["prevDay"]:
-                    last_price = float(ticker["prevDay"]["c"])
-                if last_price is None:
-                    return None
-                updated = ticker.get("updated") or (ticker.get("lastTrade") or {}).get("t") or 0
-                return {"last_price": last_price, "updated_utc": updated}
+            status, raw, _ = await self._get(url, params)
+            if status != 200:
+                return None
+            data = _json_loads(raw)
+            if data.get("status") != "OK":
+                return None
+            ticker = data.get("ticker") or {}
+            last_price = None
+            for key, field in self._PRICE_PATHS:
+                sub = ticker.get(key)
+                if sub and field in sub:
+                    last_price = float(sub[field])
+                    break
+            if last_price is None:
+                return None
+            updated = ticker.get("updated") or (ticker.get("lastTrade") or {}).get("t") or 0
+            return {"last_price": last_price, "updated_utc": updated}
         except Exception as e:
             logger.debug(f"Snapshot for {symbol}: {e}")
             return None
@@ -214,68 +472,6 @@ class PolygonProvider(DataProvider):
         start_date = end_date - timedelta(days=5)  # Get last 5 days to ensure we get latest
         return await self.get_historical_data(symbol, start_date, end_date, "1D")
     
-    async def get_multiple_symbols(
-        self,
-        symbols: List[str],
-        start_date: datetime,
-        end_date: datetime,
-        timeframe: str = "1D"
-    ) -> Dict[str, pd.DataFrame]:
-        """Fetch data for multiple symbols with optimized rate limiting"""
-        results = {}
-        
-        # Determine batch size based on rate limit
-        plan = config.get("data_provider.plan", "free").lower()
-        if plan == "free":
-            # Free tier: sequential processing
-            batch_size = 1
-            concurrent = False
-        elif plan == "starter":
-            # Starter: small batches
-            batch_size = 10
-            concurrent = True
-        elif plan in ["developer", "advanced"]:
-            # Higher tiers: larger batches with concurrency
-            batch_size = 50
-            concurrent = True
-        else:
-            batch_size = 1
-            concurrent = False
-        
-        if concurrent and batch_size > 1:
-            # Process in batches with concurrency
-            total_batches = (len(symbols) + batch_size - 1) // batch_size
-            for i in range(0, len(symbols), batch_size):
-                batch = symbols[i:i + batch_size]
-                batch_num = i // batch_size + 1
-                logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} symbols)")
-                
-                tasks = [
-                    self.get_historical_data(sym, start_date, end_date, timeframe)
-                    for sym in batch
-                ]
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                success_count = 0
-                for symbol, result in zip(batch, batch_results):
-                    if isinstance(result, Exception):
-                        logger.error(f"Error fetching {symbol}: {result}")
-                        results[symbol] = pd.DataFrame()
-                    else:
-                        results[symbol] = result
-                        if not result.empty:
-                            success_count += 1
-                
-                logger.info(f"Batch {batch_num} complete: {success_count}/{len(batch)} symbols fetched successfully")
-        else:
-            # Sequential processing (free tier)
-            for i, symbol in enumerate(symbols, 1):
-                logger.info(f"Fetching {symbol} ({i}/{len(symbols)})")
-                result = await self.get_historical_data(symbol, start_date, end_date, timeframe)
-                results[symbol] = result
-        
-        return results
-    
     async def get_ticker_details(self, symbol: str) -> Optional[Dict]:
         """
         Get ticker details from Polygon Reference API.
@@ -290,61 +486,100 @@ class PolygonProvider(DataProvider):
             Dict with keys: market_cap, primary_exchange, type, name, locale, currency
             or None if not found
         """
-        session = await self._get_session()
-        url = f"{self.BASE_URL}/v3/reference/tickers/{symbol.upper()}"
-        params = {"apiKey": self.api_key}
+        key = symbol.upper()
+        cached = self._cached_details(key)
+        if cached is not None:
+            return cached
+        
+        await self._rate_limiter.wait_for_token()
+        return await self._fetch_ticker_details(symbol)
+    
+    async def _fetch_ticker_details(self, symbol: str) -> Optional[Dict]:
+        """Request ticker details; the caller has already paid the rate-limit token"""
+        key = symbol.upper()
+        url = f"{self.BASE_URL}/v3/reference/tickers/{key}"
+        params = self._key_params
         
         try:
-            await self._rate_limiter.wait_for_token()
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    logger.debug(f"Ticker details not found for {symbol}: {response.status}")
-                    return None
-                
-                data = await response.json()
-                if data.get("status") != "OK" or not data.get("results"):
-                    return None
-                
-                results = data["results"]
-                return {
-                    'symbol': results.get('ticker'),
-                    'name': results.get('name'),
-                    'market_cap': results.get('market_cap'),  # Can be None
-                    'primary_exchange': results.get('primary_exchange'),
-                    'type': results.get('type'),  # CS=Common Stock, ETF, ADR, etc.
-                    'locale': results.get('locale'),
-                    'currency': results.get('currency_name'),
-                    'sic_code': results.get('sic_code'),
-                    'sic_description': results.get('sic_description'),
-                    'share_class_shares_outstanding': results.get('share_class_shares_outstanding'),
-                    'weighted_shares_outstanding': results.get('weighted_shares_outstanding')
-                }
+            status, raw, _ = await self._get(url, params)
+            if status != 200:
+                logger.debug(f"Ticker details not found for {symbol}: {status}")
+                return None
+            
+            data = _json_loads(raw)
+            if data.get("status") != "OK" or not data.get("results"):
+                return None
+            
+            results = data["results"]
+            details = {
+                'symbol': results.get('ticker'),
+                'name': results.get('name'),
+                'market_cap': results.get('market_cap'),  # Can be None
+                'primary_exchange': results.get('primary_exchange'),
+                'type': results.get('type'),  # CS=Common Stock, ETF, ADR, etc.
+                'locale': results.get('locale'),
+                'currency': results.get('currency_name'),
+                'sic_code': results.get('sic_code'),
+                'sic_description': results.get('sic_description'),
+                'share_class_shares_outstanding': results.get('share_class_shares_outstanding'),
+                'weighted_shares_outstanding': results.get('weighted_shares_outstanding')
+            }
+            self._details_cache[key] = (time.time() + self.TICKER_DETAILS_TTL, details)
+            self._details_dirty = True
+            return details
         except Exception as e:
             logger.debug(f"Error fetching ticker details for {symbol}: {e}")
             return None
     
+    def _cached_details(self, key: str) -> Optional[Dict]:
+        """Unexpired cached details for an uppercased symbol, else None"""
+        hit = self._details_cache.get(key)
+        if hit is not None and hit[0] > time.time():
+            return hit[1]
+        return None
+    
+    def _load_details_cache(self) -> Dict[str, Tuple[float, Dict]]:
+        """Load persisted ticker details, dropping expired entries"""
+        try:
+            stored = _json_loads(self._details_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        now = time.time()
+        return {key: (expires, details) for key, (expires, details) in stored.items() if expires > now}
+    
+    def _save_details_cache(self):
+        """Persist unexpired ticker details for the next run"""
+        now = time.time()
+        live = {key: hit for key, hit in self._details_cache.items() if hit[0] > now}
+        try:
+            self._details_path.parent.mkdir(parents=True, exist_ok=True)
+            self._details_path.write_text(json.dumps(live))
+            self._details_dirty = False
+        except OSError as e:
+            logger.warning(f"Could not save ticker details cache: {e}")
+    
     async def get_multiple_ticker_details(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
         """
         Fetch ticker details for multiple symbols.
-        Uses batching and rate limiting.
+        Uses the details cache, batching and rate limiting.
         
         Returns:
             Dict mapping symbol -> ticker details (or None if not found)
         """
-        results = {}
+        # Cached symbols cost no API calls; only the rest are fetched
+        results = {symbol: self._cached_details(symbol.upper()) for symbol in symbols}
+        missing = [symbol for symbol, details in results.items() if details is None]
         
-        # Process in batches
-        plan = config.get("data_provider.plan", "free").lower()
-        if plan in ["starter", "developer", "advanced"]:
-            batch_size = 10
-        else:
-            batch_size = 1
+        # Process in batches (paid plans only); a batch never exceeds the
+        # bucket capacity, so its tokens can always be acquired in one call
+        batch_size = min(10, self._rate_limiter.capacity) if self.max_concurrency > 1 else 1
         
-        for i in range(0, len(symbols), batch_size):
-            batch = symbols[i:i + batch_size]
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
             
             if batch_size > 1:
-                tasks = [self.get_ticker_details(sym) for sym in batch]
+                await self._rate_limiter.wait_for_token(len(batch))
+                tasks = [self._fetch_ticker_details(sym) for sym in batch]
                 batch_results = await asyncio.gather(*tasks, return_exceptions=True)
                 
                 for symbol, result in zip(batch, batch_results):
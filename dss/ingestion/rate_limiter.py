@@ -5,7 +5,12 @@ from typing import Optional
 
 
 class TokenBucket:
-    """Token bucket algorithm for rate limiting"""
+    """
+    Token bucket algorithm for rate limiting.
+    
+    Refill and decrement never await, so they are atomic within the event
+    loop: callers only take the lock when they actually have to sleep.
+    """
     
     def __init__(self, capacity: int, refill_rate: float):
         """
@@ -16,32 +21,40 @@ class TokenBucket:
         self.capacity = capacity
         self.refill_rate = refill_rate
         self.tokens = capacity
-        self.last_refill = time.time()
+        self.last_refill = time.monotonic()
         self._lock = asyncio.Lock()
     
     async def acquire(self, tokens: int = 1) -> bool:
-        """Acquire tokens, waiting if necessary"""
-        async with self._lock:
-            await self._refill()
-            if self.tokens >= tokens:
-                self.tokens -= tokens
-                return True
-            return False
+        """Acquire tokens without waiting; returns False if not enough are available"""
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
     
     async def wait_for_token(self, tokens: int = 1):
-        """Wait until tokens are available"""
+        """Wait until tokens are available (all at once, for a whole batch)"""
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}")
+        
+        # Fast path: tokens available and nobody queued ahead of us
+        if not self._lock.locked():
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+        
+        # Slow path: waiters sleep one at a time, re-checking after each wake
         async with self._lock:
-            await self._refill()
-            if self.tokens < tokens:
-                wait_time = (tokens - self.tokens) / self.refill_rate
-                await asyncio.sleep(wait_time)
-                await self._refill()
-            self.tokens -= tokens
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.refill_rate)
     
-    async def _refill(self):
-        """Refill tokens based on elapsed time"""
-        now = time.time()
-        elapsed = now - self.last_refill
-        new_tokens = elapsed * self.refill_rate
-        self.tokens = min(self.capacity, self.tokens + new_tokens)
+    def _refill(self):
+        """Refill tokens based on elapsed (monotonic) time"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
         self.last_refill = now
@@ -1,15 +1,27 @@
 """Main data ingestion orchestrator with retry logic and rate limiting"""
 import asyncio
+import random
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 import pandas as pd
 from loguru import logger
 
-from .polygon_provider import PolygonProvider
+from .polygon_provider import PolygonProvider, PYARROW_AVAILABLE
 from ..database.market_db import MarketDatabase
 from ..utils.config import config
 
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+
+# Optional: uvloop speeds up the I/O fan-out of a full update
+UVLOOP_AVAILABLE = False
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    pass
+
 MAX_RETRIES = 4
 BACKOFF_BASE = 2  # seconds
 
@@ -26,6 +38,9 @@ class DataUpdater:
 
         self.db = MarketDatabase()
         self.watchlist_path = Path(config.get("data_provider.symbols_file", "config/watchlist.txt"))
+        self.historical_years = config.get("data_provider.historical_years", 5)
+        # Arrow ingest: bars go from the HTTP body to DuckDB without pandas
+        self.use_arrow = PYARROW_AVAILABLE
 
     def load_watchlist(self) -> List[str]:
         """Load symbols from watchlist file"""
@@ -33,92 +48,143 @@ class DataUpdater:
             logger.warning(f"Watchlist file not found: {self.watchlist_path}")
             return []
 
-        symbols = []
-        with open(self.watchlist_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    symbols.append(line.upper())
+        lines = (line.strip() for line in self.watchlist_path.read_text().splitlines())
+        return [line.upper() for line in lines if line and not line.startswith('#')]
 
-        return symbols
+    async def _fetch_with_retry(self, symbol: str, start_date, end_date):
+        """
+        Fetch bars with jittered exponential backoff on retriable failures.
 
-    async def _fetch_with_retry(self, symbol: str, start_date, end_date) -> pd.DataFrame:
-        """Fetch data with exponential backoff retry on failure"""
+        Returns a pyarrow.Table when use_arrow is set, else a DataFrame; None or
+        an empty result when there is no data. The provider raises only for
+        failures worth retrying (network errors, 429, 5xx); a server-supplied
+        Retry-After overrides the backoff.
+        """
+        fetch = self.provider.get_historical_table if self.use_arrow else self.provider.get_historical_data
         last_error = None
         for attempt in range(MAX_RETRIES):
             try:
-                # Respect rate limiter before each API call
-                await self.provider._rate_limiter.wait_for_token()
-                df = await self.provider.get_historical_data(
-                    symbol, start_date, end_date, "1D"
-                )
-                return df
+                # The provider takes its own rate-limit token per request
+                return await fetch(symbol, start_date, end_date, "1D")
             except Exception as e:
                 last_error = e
-                wait_time = BACKOFF_BASE ** (attempt + 1)
+                if not getattr(e, "retriable", True) or attempt == MAX_RETRIES - 1:
+                    break
+                # Jitter de-synchronizes symbols that failed together
+                wait_time = getattr(e, "retry_after", None)
+                if wait_time is None:
+                    wait_time = min(60, BACKOFF_BASE ** (attempt + 1)) * random.uniform(0.5, 1.5)
                 logger.warning(
                     f"{symbol}: Fetch attempt {attempt + 1}/{MAX_RETRIES} failed: {e}. "
-                    f"Retrying in {wait_time}s..."
+                    f"Retrying in {wait_time:.1f}s..."
                 )
                 await asyncio.sleep(wait_time)
 
-        logger.error(f"{symbol}: All {MAX_RETRIES} fetch attempts failed: {last_error}")
-        return pd.DataFrame()
-
-    async def update_symbol(self, symbol: str, force_full: bool = False) -> bool:
-        """Update data for a single symbol with retry logic"""
+        logger.error(f"{symbol}: Fetch failed after {attempt + 1} attempt(s): {last_error}")
+        return None
+
+    @staticmethod
+    def _update_end_date() -> datetime:
+        """Last complete session to fetch: dopo chiusura US (22:00 CET) includi oggi"""
+        now = datetime.now()
+        if now.hour >= 22:
+            return now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    async def _fetch_and_validate(self, symbol: str, force_full: bool = False,
+                                  end_date: Optional[datetime] = None,
+                                  last_timestamps: Optional[Dict[str, datetime]] = None):
+        """
+        Fetch new bars for a symbol with retry logic, without writing them.
+
+        end_date and last_timestamps are loaded once per run by _run_updates
+        (without them, each symbol computes/queries its own). Returns the
+        validated bars (DataFrame or pyarrow.Table, empty if already up to
+        date) or None on failure.
+        """
         try:
-            # Determine date range: dopo chiusura US (22:00 CET) includi oggi
-            now = datetime.now()
-            if now.hour >= 22:
-                end_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            else:
-                end_date = (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            if end_date is None:
+                end_date = self._update_end_date()
 
             if force_full:
-                historical_years = config.get("data_provider.historical_years", 5)
-                historical_days = historical_years * 365
-                start_date = end_date - timedelta(days=historical_days)
-                logger.info(f"{symbol}: FORCED full historical download ({historical_years} years) from {start_date.date()}")
+                start_date = end_date - timedelta(days=self.historical_years * 365)
+                logger.info(f"{symbol}: FORCED full historical download ({self.historical_years} years) from {start_date.date()}")
             else:
-                last_timestamp = self.db.get_last_timestamp(symbol)
+                if last_timestamps is None:
+                    last_timestamp = self.db.get_last_timestamp(symbol)
+                else:
+                    last_timestamp = last_timestamps.get(symbol)
 
                 if last_timestamp:
                     start_date = last_timestamp + timedelta(days=1)
                     logger.info(f"{symbol}: Incremental update from {start_date.date()}")
                 else:
-                    historical_years = config.get("data_provider.historical_years", 5)
-                    historical_days = historical_years * 365
-                    start_date = end_date - timedelta(days=historical_days)
-                    logger.info(f"{symbol}: Full historical download ({historical_years} years) from {start_date.date()}")
+                    start_date = end_date - timedelta(days=self.historical_years * 365)
+                    logger.info(f"{symbol}: Full historical download ({self.historical_years} years) from {start_date.date()}")
 
             # Skip if start_date is today or future
             if start_date.date() > end_date.date():
                 logger.info(f"{symbol}: Already up to date")
-                return True
+                return pd.DataFrame()
 
             # Fetch data with retry
-            df = await self._fetch_with_retry(symbol, start_date, end_date)
+            bars = await self._fetch_with_retry(symbol, start_date, end_date)
 
-            if df.empty:
+            if bars is None or len(bars) == 0:
                 logger.warning(f"{symbol}: No new data available")
-                return False
+                return None
 
-            # Validate data
-            if not self.provider.validate_data(df):
+            # Validate data (Arrow tables and provider-built frames are valid by construction)
+            validated = self.use_arrow or bars.attrs.get("validated", False)
+            if not validated and not self.provider.validate_data(bars):
                 logger.error(f"{symbol}: Invalid data format")
-                return False
+                return None
 
-            # Write to database
-            self.db.insert_data(df)
-            logger.info(f"{symbol}: Inserted {len(df)} bars")
+            return bars
 
+        except Exception as e:
+            logger.error(f"Error updating {symbol}: {e}")
+            return None
+
+    async def update_symbol(self, symbol: str, force_full: bool = False) -> bool:
+        """Update data for a single symbol with retry logic"""
+        bars = await self._fetch_and_validate(symbol, force_full)
+        if bars is None:
+            return False
+        if len(bars) == 0:
             return True
 
+        try:
+            self._write(bars)
         except Exception as e:
             logger.error(f"Error updating {symbol}: {e}")
             return False
 
+        logger.info(f"{symbol}: Inserted {len(bars)} bars")
+        return True
+
+    def _write(self, bars):
+        """Upsert bars (pyarrow.Table when use_arrow, else DataFrame)"""
+        if self.use_arrow:
+            self.db.insert_arrow(bars)
+        else:
+            self.db.insert_data(bars)
+
+    def _insert_batch(self, frames: List) -> int:
+        """Write several symbols' bars in one transaction; returns symbols written"""
+        if self.use_arrow:
+            batch = pa.concat_tables(frames)
+        else:
+            batch = pd.concat(frames, ignore_index=True)
+        try:
+            self._write(batch)
+        except Exception as e:
+            logger.error(f"Error inserting batch of {len(frames)} symbols: {e}")
+            return 0
+
+        logger.info(f"Inserted {len(batch)} bars for {len(frames)} symbols")
+        return len(frames)
+
     async def update_all(self, symbols: List[str] = None, force_full: bool = False):
         """Update all symbols in watchlist"""
         if symbols is None:
@@ -126,51 +192,69 @@ class DataUpdater:
 
         logger.info(f"Starting data update for {len(symbols)} symbols")
 
-        # Determine batch processing based on plan
-        plan = config.get("data_provider.plan", "free").lower()
-        if plan == "free":
-            batch_size = 1
-            concurrent = False
-        elif plan == "starter":
-            batch_size = 10
-            concurrent = True
-        elif plan in ["developer", "advanced"]:
-            batch_size = 50
-            concurrent = True
-        else:
-            batch_size = 1
-            concurrent = False
+        # Concurrency comes from the plan (the provider's token bucket enforces the API rate)
+        concurrency = self.provider.max_concurrency
 
-        success_count = 0
+        # Keep one HTTP session (keep-alive connections) open for the whole run
+        async with self.provider:
+            success_count = await self._run_updates(symbols, force_full, concurrency)
 
-        if concurrent and batch_size > 1:
-            total_batches = (len(symbols) + batch_size - 1) // batch_size
-            logger.info(f"Using batch processing: {batch_size} symbols per batch, {total_batches} batches")
+        logger.info(f"Update complete: {success_count}/{len(symbols)} symbols updated")
 
-            for i in range(0, len(symbols), batch_size):
-                batch = symbols[i:i + batch_size]
-                batch_num = i // batch_size + 1
-                logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} symbols)")
+    async def _run_updates(self, symbols: List[str], force_full: bool, concurrency: int) -> int:
+        """
+        Update symbols with at most `concurrency` requests in flight.
+
+        All symbols are queued at once and drained as they complete, so a slow
+        symbol never holds back the rest. Fetched frames are written in batches
+        (one transaction per batch instead of one per symbol). Returns the
+        success count.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        end_date = self._update_end_date()
+
+        # One query for every symbol's last bar; up-to-date symbols never become tasks
+        last_timestamps = None
+        up_to_date = 0
+        if not force_full:
+            last_timestamps = self.db.get_last_timestamps(symbols)
+            stale = [s for s in symbols if not self._is_current(last_timestamps.get(s), end_date)]
+            up_to_date = len(symbols) - len(stale)
+            if up_to_date:
+                logger.info(f"{up_to_date} symbols already up to date")
+            symbols = stale
+
+        async def fetch_one(symbol: str):
+            async with semaphore:
+                return symbol, await self._fetch_and_validate(symbol, force_full, end_date, last_timestamps)
+
+        total = len(symbols)
+        batch_size = max(concurrency, 10)
+        pending = []
+        success_count = up_to_date
+        for done, future in enumerate(asyncio.as_completed([fetch_one(s) for s in symbols]), 1):
+            symbol, bars = await future
+            if bars is not None:
+                if len(bars) == 0:
+                    success_count += 1  # Already up to date
+                else:
+                    pending.append(bars)
 
-                tasks = [self.update_symbol(sym, force_full) for sym in batch]
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+            if len(pending) >= batch_size:
+                success_count += self._insert_batch(pending)
+                pending = []
+            if done % batch_size == 0 or done == total:
+                logger.info(f"Progress: {done}/{total} symbols processed")
 
-                batch_success = 0
-                for symbol, result in zip(batch, batch_results):
-                    if isinstance(result, Exception):
-                        logger.error(f"Error updating {symbol}: {result}")
-                    elif result:
-                        batch_success += 1
-                        success_count += 1
+        if pending:
+            success_count += self._insert_batch(pending)
 
-                logger.info(f"Batch {batch_num} complete: {batch_success}/{len(batch)} symbols updated")
-        else:
-            for i, symbol in enumerate(symbols, 1):
-                logger.info(f"Processing {symbol} ({i}/{len(symbols)})")
-                if await self.update_symbol(symbol, force_full):
-                    success_count += 1
+        return success_count
 
-        logger.info(f"Update complete: {success_count}/{len(symbols)} symbols updated")
+    @staticmethod
+    def _is_current(last_timestamp: Optional[datetime], end_date: datetime) -> bool:
+        """True when the next bar to fetch would start after end_date"""
+        return last_timestamp is not None and (last_timestamp + timedelta(days=1)).date() > end_date.date()
 
     async def close(self):
         """Cleanup resources"""
@@ -187,5 +271,13 @@ async def main(force_full: bool = False):
         await updater.close()
 
 
+def run_event_loop(coro):
+    """asyncio.run on uvloop when installed (cheaper sockets/timers), else the default loop"""
+    if UVLOOP_AVAILABLE:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    return asyncio.run(coro)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_event_loop(main())
@@ -1,149 +1,555 @@
 """Technical indicators calculation - Full 22+ indicator suite per Trading System Specification v1.0"""
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Hashable, Optional, Tuple
 from loguru import logger
 
+from ..utils._njit import njit, NUMBA_AVAILABLE
+
+# Optional: SciPy runs the EMA recursion as a C-level linear filter
+SCIPY_AVAILABLE = False
+try:
+    from scipy.signal import lfilter
+    SCIPY_AVAILABLE = True
+except ImportError:
+    pass
+
+# Kernel input arrays in the explicit Numba signatures below: read-only C-contiguous
+# (pandas' copy-on-write to_numpy views are read-only; writable arrays match too)
+_F64_IN = "Array(float64, 1, 'C', readonly=True)"
+_I64_IN = "Array(int64, 1, 'C', readonly=True)"
+
+# Rolling high/low windows shared by Ichimoku, Stochastic, Williams %R and Donchian
+EXTREMA_WINDOWS = (9, 14, 20, 26, 52)
+
+# Columns added by calculate_all, in order (shared by the Polars and incremental frontends)
+INDICATOR_COLUMNS = [
+    'sma_20', 'sma_50', 'sma_200', 'ema_9', 'ema_21', 'ema_50',
+    'macd', 'macd_signal', 'macd_hist', 'adx', 'plus_di', 'minus_di',
+    'ichimoku_tenkan', 'ichimoku_kijun', 'ichimoku_senkou_a', 'ichimoku_senkou_b', 'ichimoku_chikou',
+    'parabolic_sar', 'supertrend', 'supertrend_direction',
+    'rsi', 'stoch_k', 'stoch_d', 'williams_r', 'cci', 'roc', 'mfi',
+    'atr', 'natr', 'bb_upper', 'bb_middle', 'bb_lower', 'bb_width', 'bb_percent',
+    'keltner_upper', 'keltner_middle', 'keltner_lower',
+    'donchian_upper', 'donchian_lower', 'donchian_middle', 'squeeze',
+    'vwap', 'volume_sma', 'volume_ratio', 'obv', 'ad_line', 'cmf', 'dollar_volume',
+]
+
+# Cumulative / volume-weighted columns kept in float64 when calculate_all downcasts
+FLOAT64_COLUMNS = frozenset({'vwap', 'obv', 'ad_line'})
+
+
+@njit("Tuple((float64, float64, float64, int64))"
+      "(float64, float64, float64, int64, float64, float64, float64, float64, float64, float64, float64, float64)",
+      cache=True, nogil=True, error_model='numpy')
+def _psar_step(prev_sar, ep, af, trend, high, low, prev_high, prev2_high, prev_low, prev2_low,
+               af_start, af_max):
+    """
+    One Parabolic SAR bar: returns (sar, ep, af, trend) for this bar.
+
+    prev2_* is the bar two back (the previous bar again on the second bar).
+    Shared by the batch kernel and IncrementalIndicatorCalculator.
+    """
+    value = prev_sar + af * (ep - prev_sar)
+    if trend == 1:  # Uptrend
+        value = min(value, prev_low, prev2_low)
+        if high > ep:
+            ep = high
+            af = min(af + af_start, af_max)
+        if low < value:  # Trend reversal
+            trend = -1
+            value = ep
+            ep = low
+            af = af_start
+    else:  # Downtrend
+        value = max(value, prev_high, prev2_high)
+        if low < ep:
+            ep = low
+            af = min(af + af_start, af_max)
+        if high > value:  # Trend reversal
+            trend = 1
+            value = ep
+            ep = high
+            af = af_start
+    return value, ep, af, trend
+
+
+@njit(f"float64[::1]({_F64_IN}, {_F64_IN}, float64, float64)", cache=True, nogil=True, error_model='numpy')
+def _psar_numba(high, low, af_start, af_max):
+    """
+    Parabolic SAR over float64 arrays (same rules as the original iloc loop).
+
+    Without Numba this runs as plain Python, which is still far cheaper than
+    per-element pandas indexing.
+    """
+    n = high.shape[0]
+    sar = np.empty(n)
+    if n == 0:
+        return sar
+
+    af = af_start
+    trend = 1  # 1 = uptrend, -1 = downtrend
+    sar[0] = low[0]
+    ep = high[0]  # Extreme point
+
+    for i in range(1, n):
+        prev2 = i - 2 if i > 1 else i - 1
+        sar[i], ep, af, trend = _psar_step(
+            sar[i - 1], ep, af, trend, high[i], low[i],
+            high[i - 1], high[prev2], low[i - 1], low[prev2], af_start, af_max
+        )
+
+    return sar
+
+
+@njit("Tuple((float64, int64))(float64, float64, int64, float64, float64)",
+      cache=True, nogil=True, error_model='numpy')
+def _supertrend_step(close, prev_supertrend, prev_direction, upper_band, lower_band):
+    """One SuperTrend bar: returns (supertrend, direction) for this bar"""
+    if close > prev_supertrend:
+        return lower_band, 1
+    if close < prev_supertrend:
+        return upper_band, -1
+
+    supertrend = prev_supertrend
+    if prev_direction == 1 and lower_band > supertrend:
+        supertrend = lower_band
+    elif prev_direction == -1 and upper_band < supertrend:
+        supertrend = upper_band
+    return supertrend, prev_direction
+
+
+@njit(f"Tuple((float64[::1], int8[::1]))({_F64_IN}, {_F64_IN}, {_F64_IN})",
+      cache=True, nogil=True, error_model='numpy')
+def _supertrend_loop(close, upper_band, lower_band):
+    """SuperTrend band flips over float64 arrays (same branches as the original iloc loop)"""
+    n = close.shape[0]
+    supertrend = np.empty(n)
+    direction = np.empty(n, dtype=np.int8)
+    if n == 0:
+        return supertrend, direction
+
+    supertrend[0] = upper_band[0]
+    direction[0] = -1
+
+    for i in range(1, n):
+        supertrend[i], direction[i] = _supertrend_step(
+            close[i], supertrend[i - 1], direction[i - 1], upper_band[i], lower_band[i]
+        )
+
+    return supertrend, direction
+
+
+@njit(f"float64[:, ::1]({_F64_IN}, {_I64_IN})", cache=True, nogil=True, error_model='numpy')
+def _rolling_max_multi(values, windows):
+    """
+    Rolling max for several windows in one pass (monotonic deque per window).
+
+    Column j of the result matches values.rolling(windows[j]).max(): NaN until
+    the window is full and whenever it contains a NaN. Rolling min is
+    -_rolling_max_multi(-values, windows).
+    """
+    n = values.shape[0]
+    k = windows.shape[0]
+    out = np.full((n, k), np.nan)
+    queue = np.empty((k, n), dtype=np.int64)  # indices, head..tail holds decreasing values
+    head = np.zeros(k, dtype=np.int64)
+    tail = np.zeros(k, dtype=np.int64)
+    last_nan = -n - 1
+
+    for i in range(n):
+        v = values[i]
+        is_nan = v != v
+        if is_nan:
+            last_nan = i
+        for j in range(k):
+            w = windows[j]
+            if not is_nan:
+                while tail[j] > head[j] and values[queue[j, tail[j] - 1]] <= v:
+                    tail[j] -= 1
+                queue[j, tail[j]] = i
+                tail[j] += 1
+            while tail[j] > head[j] and queue[j, head[j]] <= i - w:
+                head[j] += 1
+            if i >= w - 1 and i - last_nan >= w:
+                out[i, j] = values[queue[j, head[j]]]
+
+    return out
+
+
+@njit(f"float64[::1]({_F64_IN}, {_F64_IN})", cache=True, nogil=True, error_model='numpy')
+def _obv_kernel(close, volume):
+    """On-Balance Volume in one pass: signed volume summed without temporaries"""
+    n = close.shape[0]
+    out = np.empty(n)
+    acc = 0.0
+    for i in range(n):
+        sign = 0.0
+        if i > 0:
+            if close[i] > close[i - 1]:
+                sign = 1.0
+            elif close[i] < close[i - 1]:
+                sign = -1.0
+        step = volume[i] * sign
+        if step != step:  # NaN volume: NaN at this bar, running sum unchanged (as cumsum)
+            out[i] = np.nan
+        else:
+            acc += step
+            out[i] = acc
+    return out
+
+
+@njit("UniTuple(float64, 2)(float64, float64, float64)", cache=True, nogil=True, error_model='numpy')
+def _neumaier_add(total, compensation, x):
+    """Compensated (Neumaier) summation step: returns the new (total, compensation)"""
+    t = total + x
+    if abs(total) >= abs(x):
+        compensation += (total - t) + x
+    else:
+        compensation += (x - t) + total
+    return t, compensation
+
+
+@njit(f"float64[::1]({_F64_IN}, {_F64_IN}, {_I64_IN})", cache=True, nogil=True, error_model='numpy')
+def _session_vwap_kernel(tp, volume, session_ids):
+    """
+    Cumulative VWAP restarted whenever session_ids changes.
+
+    Both running sums are compensated, so long sessions do not drift. A NaN
+    price*volume gives NaN at that bar and is skipped, as cumsum does.
+    """
+    n = tp.shape[0]
+    out = np.empty(n)
+    pv = pv_c = vol = vol_c = 0.0
+
+    for i in range(n):
+        if i > 0 and session_ids[i] != session_ids[i - 1]:
+            pv = pv_c = vol = vol_c = 0.0
+        x = tp[i] * volume[i]
+        if x != x:
+            out[i] = np.nan
+            continue
+        pv, pv_c = _neumaier_add(pv, pv_c, x)
+        vol, vol_c = _neumaier_add(vol, vol_c, volume[i])
+        total_volume = vol + vol_c
+        out[i] = (pv + pv_c) / total_volume if total_volume > 0 else np.nan
+
+    return out
+
+
+def _contiguous(values) -> np.ndarray:
+    """C-contiguous float64 array for the kernels (no copy when it already is one)"""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _lag_values(x: np.ndarray, periods: int) -> np.ndarray:
+    """x shifted forward by `periods` bars (NaN-filled), like Series.shift without the Series"""
+    periods = min(periods, len(x))  # Shorter than the lag: all NaN
+    out = np.empty_like(x, dtype=np.float64)
+    out[:periods] = np.nan
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+def _ewm_values(x: np.ndarray, alpha: float) -> np.ndarray:
+    """ewm(alpha, adjust=False) of a NaN-free array as an lfilter (needs SciPy)"""
+    zi = np.array([(1.0 - alpha) * x[0]])  # steady state for x[0] (= lfilter_zi * x[0]), so y[0] = x[0]
+    y, _ = lfilter([alpha], [1.0, alpha - 1.0], x, zi=zi)
+    return y
+
+
+def _wilder_values(x: np.ndarray, length: int) -> np.ndarray:
+    """
+    Wilder's smoothing, ewm(alpha=1/length, adjust=False, min_periods=length)
+
+    Starts at the first non-NaN value (a leading NaN block is another
+    indicator's warm-up); lfilter when SciPy is available and no NaN follows.
+    """
+    out = np.full(len(x), np.nan)
+    valid = ~np.isnan(x)
+    if not valid.any():
+        return out
+    start = int(valid.argmax())
+    if SCIPY_AVAILABLE and valid[start:].all():
+        out[start:] = _ewm_values(x[start:], 1.0 / length)
+    else:
+        out[start:] = pd.Series(x[start:]).ewm(alpha=1.0 / length, adjust=False).mean().to_numpy()
+    out[start:start + length - 1] = np.nan
+    return out
+
+
+def _rolling_sum_values(x: np.ndarray, length: int) -> np.ndarray:
+    """Rolling sum of a NaN-free array as a cumulative-sum difference (NaN during warm-up)"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= length:
+        csum = np.concatenate(([0.0], np.cumsum(x)))
+        out[length - 1:] = csum[length:] - csum[:-length]
+    return out
+
+
+def _rolling_mean_values(x: np.ndarray, length: int) -> Optional[np.ndarray]:
+    """
+    Rolling mean via cumulative sums, same NaN warm-up as rolling().mean()
+
+    Leading NaNs (another indicator's warm-up) are skipped; returns None when
+    a NaN appears later, where the cumulative sum would poison every window.
+    """
+    nan = np.isnan(x)
+    start = int(nan.argmin()) if nan.any() else 0
+    if nan[start:].any():
+        return None
+    out = np.full(len(x), np.nan)
+    out[start:] = _rolling_sum_values(x[start:], length) / length
+    return out
+
+
+def _cci_values(tp: np.ndarray, length: int) -> np.ndarray:
+    """CCI of a typical-price array (NaN during warm-up)"""
+    cci = np.full(len(tp), np.nan)
+    if len(tp) >= length:
+        # All windows at once: mean and mean absolute deviation in one vectorized pass
+        win = sliding_window_view(tp, length)
+        sma_tp = win.mean(axis=1)
+        mean_deviation = np.abs(win - sma_tp[:, None]).mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):  # flat window -> inf/NaN, as in pandas
+            cci[length - 1:] = (tp[length - 1:] - sma_tp) / (0.015 * mean_deviation)
+    return cci
+
 
 class IndicatorCalculator:
     """Calculate technical indicators - Full suite for signal scoring"""
     
     @staticmethod
-    def calculate_all(df: pd.DataFrame) -> pd.DataFrame:
+    def calculate_all(df: pd.DataFrame, dtype=np.float64) -> pd.DataFrame:
         """
         Calculate all 22+ indicators across 4 categories:
         - Trend (7): SMA 20/50/200, EMA 9/21/50, MACD, ADX, Ichimoku, Parabolic SAR, SuperTrend
         - Momentum (6): RSI, Stochastic, Williams %R, CCI, ROC, MFI
         - Volatility (4): ATR, Bollinger Bands, Keltner Channels, Donchian Channels
         - Volume (5): VWAP, Volume SMA, OBV, A/D Line, CMF
+        
+        dtype=np.float32 stores the float indicator columns (except the
+        cumulative FLOAT64_COLUMNS) in single precision, halving their memory
+        for scoring that only needs a few significant digits. The computation
+        itself always runs in float64.
         """
         if df.empty:
             return df
         
-        df = df.copy()
+        # Columns are collected here and attached in one concat at the end,
+        # instead of one block-manager insertion per indicator
+        out = {}
+        
+        # Every rolling high/low window in one pass, shared by the helpers below
+        extrema = IndicatorCalculator._rolling_extrema(df['high'], df['low'])
+        # True Range once for ATR, ADX, SuperTrend and Keltner
+        tr = IndicatorCalculator._true_range(df['high'], df['low'], df['close'])
+        # Windows used by more than one indicator, computed once
+        ema_20 = IndicatorCalculator._ema(df['close'], length=20)  # Keltner middle
+        volume_sma = IndicatorCalculator._sma(df['volume'], length=20)  # Volume SMA, VWAP
         
         # ==================== TREND INDICATORS ====================
         # Simple Moving Averages
-        df['sma_20'] = IndicatorCalculator._sma(df['close'], length=20)
-        df['sma_50'] = IndicatorCalculator._sma(df['close'], length=50)
-        df['sma_200'] = IndicatorCalculator._sma(df['close'], length=200)
+        out['sma_20'] = IndicatorCalculator._sma(df['close'], length=20)
+        out['sma_50'] = IndicatorCalculator._sma(df['close'], length=50)
+        out['sma_200'] = IndicatorCalculator._sma(df['close'], length=200)
         
         # Exponential Moving Averages
-        df['ema_9'] = IndicatorCalculator._ema(df['close'], length=9)
-        df['ema_20'] = IndicatorCalculator._ema(df['close'], length=20)  # Keep for backward compat
-        df['ema_21'] = IndicatorCalculator._ema(df['close'], length=21)
-        df['ema_50'] = IndicatorCalculator._ema(df['close'], length=50)
+        out['ema_9'] = IndicatorCalculator._ema(df['close'], length=9)
+        out['ema_21'] = IndicatorCalculator._ema(df['close'], length=21)
+        out['ema_50'] = IndicatorCalculator._ema(df['close'], length=50)
         
         # MACD (12, 26, 9)
         macd_data = IndicatorCalculator._macd(df['close'])
-        df['macd'] = macd_data['macd']
-        df['macd_signal'] = macd_data['signal']
-        df['macd_hist'] = macd_data['hist']
+        out['macd'] = macd_data['macd']
+        out['macd_signal'] = macd_data['signal']
+        out['macd_hist'] = macd_data['hist']
         
         # ADX - Average Directional Index (trend strength)
-        adx_data = IndicatorCalculator._adx(df['high'], df['low'], df['close'], length=14)
-        df['adx'] = adx_data['adx']
-        df['plus_di'] = adx_data['plus_di']
-        df['minus_di'] = adx_data['minus_di']
+        adx_data = IndicatorCalculator._adx(df['high'], df['low'], df['close'], length=14, tr=tr)
+        out['adx'] = adx_data['adx']
+        out['plus_di'] = adx_data['plus_di']
+        out['minus_di'] = adx_data['minus_di']
         
         # Ichimoku Cloud (9, 26, 52)
-        ichimoku_data = IndicatorCalculator._ichimoku(df['high'], df['low'], df['close'])
-        df['ichimoku_tenkan'] = ichimoku_data['tenkan']
-        df['ichimoku_kijun'] = ichimoku_data['kijun']
-        df['ichimoku_senkou_a'] = ichimoku_data['senkou_a']
-        df['ichimoku_senkou_b'] = ichimoku_data['senkou_b']
-        df['ichimoku_chikou'] = ichimoku_data['chikou']
+        ichimoku_data = IndicatorCalculator._ichimoku(df['high'], df['low'], df['close'], extrema=extrema)
+        out['ichimoku_tenkan'] = ichimoku_data['tenkan']
+        out['ichimoku_kijun'] = ichimoku_data['kijun']
+        out['ichimoku_senkou_a'] = ichimoku_data['senkou_a']
+        out['ichimoku_senkou_b'] = ichimoku_data['senkou_b']
+        out['ichimoku_chikou'] = ichimoku_data['chikou']
         
         # Parabolic SAR (0.02, 0.2)
-        df['parabolic_sar'] = IndicatorCalculator._parabolic_sar(df['high'], df['low'], df['close'])
+        out['parabolic_sar'] = IndicatorCalculator._parabolic_sar(df['high'], df['low'], df['close'])
         
         # SuperTrend (10, 3)
-        supertrend_data = IndicatorCalculator._supertrend(df['high'], df['low'], df['close'], length=10, multiplier=3)
-        df['supertrend'] = supertrend_data['supertrend']
-        df['supertrend_direction'] = supertrend_data['direction']
+        supertrend_data = IndicatorCalculator._supertrend(df['high'], df['low'], df['close'], length=10, multiplier=3, tr=tr)
+        out['supertrend'] = supertrend_data['supertrend']
+        out['supertrend_direction'] = supertrend_data['direction']
         
         # ==================== MOMENTUM INDICATORS ====================
         # RSI (14)
-        df['rsi'] = IndicatorCalculator._rsi(df['close'], length=14)
+        out['rsi'] = IndicatorCalculator._rsi(df['close'], length=14)
         
         # Stochastic Oscillator (14, 3, 3)
-        stoch_data = IndicatorCalculator._stochastic(df['high'], df['low'], df['close'])
-        df['stoch_k'] = stoch_data['k']
-        df['stoch_d'] = stoch_data['d']
+        stoch_data = IndicatorCalculator._stochastic(df['high'], df['low'], df['close'], extrema=extrema)
+        out['stoch_k'] = stoch_data['k']
+        out['stoch_d'] = stoch_data['d']
         
         # Williams %R (14)
-        df['williams_r'] = IndicatorCalculator._williams_r(df['high'], df['low'], df['close'], length=14)
+        out['williams_r'] = IndicatorCalculator._williams_r(df['high'], df['low'], df['close'], length=14, extrema=extrema)
         
         # CCI - Commodity Channel Index (20)
-        df['cci'] = IndicatorCalculator._cci(df['high'], df['low'], df['close'], length=20)
+        out['cci'] = IndicatorCalculator._cci(df['high'], df['low'], df['close'], length=20)
         
         # ROC - Rate of Change (12)
-        df['roc'] = IndicatorCalculator._roc(df['close'], length=12)
+        out['roc'] = IndicatorCalculator._roc(df['close'], length=12)
         
         # MFI - Money Flow Index (14) - volume-weighted RSI
-        df['mfi'] = IndicatorCalculator._mfi(df['high'], df['low'], df['close'], df['volume'], length=14)
+        out['mfi'] = IndicatorCalculator._mfi(df['high'], df['low'], df['close'], df['volume'], length=14)
         
         # ==================== VOLATILITY INDICATORS ====================
         # ATR - Average True Range (14)
-        df['atr'] = IndicatorCalculator._atr(df['high'], df['low'], df['close'], length=14)
-        df['natr'] = (df['atr'] / df['close']) * 100  # Normalized ATR (percentage)
+        out['atr'] = IndicatorCalculator._atr(df['high'], df['low'], df['close'], length=14, tr=tr)
+        out['natr'] = (out['atr'] / df['close']) * 100  # Normalized ATR (percentage)
         
         # Bollinger Bands (20, 2)
-        bb_data = IndicatorCalculator._bollinger_bands(df['close'], length=20, std_dev=2)
-        df['bb_upper'] = bb_data['upper']
-        df['bb_middle'] = bb_data['middle']
-        df['bb_lower'] = bb_data['lower']
-        df['bb_width'] = bb_data['width']
-        df['bb_percent'] = bb_data['percent_b']
+        bb_data = IndicatorCalculator._bollinger_bands(df['close'], length=20, std_dev=2, middle=out['sma_20'])
+        out['bb_upper'] = bb_data['upper']
+        out['bb_middle'] = bb_data['middle']
+        out['bb_lower'] = bb_data['lower']
+        out['bb_width'] = bb_data['width']
+        out['bb_percent'] = bb_data['percent_b']
         
         # Keltner Channels (20, 1.5)
-        keltner_data = IndicatorCalculator._keltner_channels(df['high'], df['low'], df['close'], length=20, multiplier=1.5)
-        df['keltner_upper'] = keltner_data['upper']
-        df['keltner_middle'] = keltner_data['middle']
-        df['keltner_lower'] = keltner_data['lower']
+        keltner_data = IndicatorCalculator._keltner_channels(df['high'], df['low'], df['close'], length=20, multiplier=1.5,
+                                                             tr=tr, middle=ema_20)
+        out['keltner_upper'] = keltner_data['upper']
+        out['keltner_middle'] = keltner_data['middle']
+        out['keltner_lower'] = keltner_data['lower']
         
         # Donchian Channels (20)
-        donchian_data = IndicatorCalculator._donchian_channels(df['high'], df['low'], length=20)
-        df['donchian_upper'] = donchian_data['upper']
-        df['donchian_lower'] = donchian_data['lower']
-        df['donchian_middle'] = donchian_data['middle']
+        donchian_data = IndicatorCalculator._donchian_channels(df['high'], df['low'], length=20, extrema=extrema)
+        out['donchian_upper'] = donchian_data['upper']
+        out['donchian_lower'] = donchian_data['lower']
+        out['donchian_middle'] = donchian_data['middle']
         
         # Squeeze detection (BB inside Keltner)
-        df['squeeze'] = (df['bb_lower'] > df['keltner_lower']) & (df['bb_upper'] < df['keltner_upper'])
+        out['squeeze'] = (out['bb_lower'] > out['keltner_lower']) & (out['bb_upper'] < out['keltner_upper'])
         
         # ==================== VOLUME INDICATORS ====================
         # VWAP
-        df['vwap'] = IndicatorCalculator._calculate_vwap(df)
+        out['vwap'] = IndicatorCalculator._calculate_vwap(df, volume_mean=volume_sma)
         
         # Volume SMA (20)
-        df['volume_sma'] = IndicatorCalculator._sma(df['volume'], length=20)
-        df['volume_ratio'] = df['volume'] / df['volume_sma']  # Current vs average
+        out['volume_sma'] = volume_sma
+        out['volume_ratio'] = df['volume'] / out['volume_sma']  # Current vs average
         
         # OBV - On-Balance Volume
-        df['obv'] = IndicatorCalculator._obv(df['close'], df['volume'])
+        out['obv'] = IndicatorCalculator._obv(df['close'], df['volume'])
         
-        # A/D Line - Accumulation/Distribution
-        df['ad_line'] = IndicatorCalculator._ad_line(df['high'], df['low'], df['close'], df['volume'])
+        # A/D Line - Accumulation/Distribution (CLV * volume shared with CMF)
+        mfv = IndicatorCalculator._money_flow_volume(df['high'], df['low'], df['close'], df['volume'])
+        out['ad_line'] = IndicatorCalculator._ad_line(df['high'], df['low'], df['close'], df['volume'], mfv=mfv)
         
         # CMF - Chaikin Money Flow (20)
-        df['cmf'] = IndicatorCalculator._cmf(df['high'], df['low'], df['close'], df['volume'], length=20)
+        out['cmf'] = IndicatorCalculator._cmf(df['high'], df['low'], df['close'], df['volume'], length=20, mfv=mfv)
         
         # Dollar volume (for liquidity filtering)
-        df['dollar_volume'] = df['close'] * df['volume']
+        out['dollar_volume'] = df['close'] * df['volume']
+        
+        existing = df.columns.intersection(list(out))
+        if len(existing):
+            df = df.drop(columns=existing)  # Recomputing: replace old indicator columns
+        dtype = np.dtype(dtype)
+        columns = {}
+        for name, values in out.items():
+            values = np.asarray(values)
+            if values.dtype.kind == 'f' and name not in FLOAT64_COLUMNS:
+                values = values.astype(dtype, copy=False)
+            columns[name] = values
+        indicators = pd.DataFrame(columns, index=df.index)
+        return pd.concat([df, indicators], axis=1)
+    
+    @staticmethod
+    def ensure_columns(df: pd.DataFrame, columns) -> pd.DataFrame:
+        """
+        df with the given indicator columns, computing only the missing ones.
         
-        return df
+        Values match calculate_all (same helpers, float64). Columns without a
+        standalone builder (see _COLUMN_BUILDERS) fall back to calculate_all.
+        Present columns are left untouched; a new frame is returned when
+        anything was added.
+        """
+        missing = [name for name in columns if name not in df.columns]
+        if not missing or df.empty:
+            return df
+        if not all(name in _COLUMN_BUILDERS for name in missing):
+            return IndicatorCalculator.calculate_all(df)
+        
+        # True Range once for ATR / NATR / ADX
+        tr = None
+        if any(name in _TR_COLUMNS for name in missing):
+            tr = IndicatorCalculator._true_range(df['high'], df['low'], df['close'])
+        
+        out = {}
+        for name in missing:
+            if name not in out:  # Builders may return several columns (ADX + DI)
+                out.update(_COLUMN_BUILDERS[name](df, tr))
+        indicators = pd.DataFrame({name: np.asarray(out[name]) for name in missing}, index=df.index)
+        return pd.concat([df, indicators], axis=1)
+    
+    @staticmethod
+    def calculate_all_batch(frames: Dict[Hashable, pd.DataFrame], max_workers: Optional[int] = None,
+                            dtype=np.float64) -> Dict[Hashable, pd.DataFrame]:
+        """
+        calculate_all for many symbols at once ({symbol: df} -> {symbol: df})
+        
+        Symbols are independent, so they run on a thread pool: the Numba kernels
+        are compiled with nogil=True, and the NumPy/SciPy/pandas window work
+        releases the GIL as well. max_workers=1 runs serially.
+        """
+        calculate = partial(IndicatorCalculator.calculate_all, dtype=dtype)
+        if max_workers == 1 or len(frames) <= 1:
+            return {symbol: calculate(df) for symbol, df in frames.items()}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(calculate, frames.values())
+            return dict(zip(frames.keys(), results))
     
     # ==================== BASIC INDICATORS ====================
     
+    @staticmethod
+    def _rolling_mean(series: pd.Series, length: int) -> pd.Series:
+        """rolling(window=length).mean() as a cumulative-sum difference (pandas if NaN gaps)"""
+        values = _rolling_mean_values(series.to_numpy(dtype=np.float64), length)
+        if values is None:
+            return series.rolling(window=length, min_periods=length).mean()
+        return pd.Series(values, index=series.index, name=series.name)
+    
     @staticmethod
     def _sma(series: pd.Series, length: int) -> pd.Series:
         """Simple Moving Average"""
-        return series.rolling(window=length, min_periods=length).mean()
+        return IndicatorCalculator._rolling_mean(series, length)
     
     @staticmethod
     def _ema(series: pd.Series, length: int) -> pd.Series:
-        """Exponential Moving Average"""
-        return series.ewm(span=length, adjust=False).mean()
+        """Exponential Moving Average
+
+        Same recursion as ewm(span=length, adjust=False): y[0] = x[0],
+        y[t] = alpha * x[t] + (1 - alpha) * y[t-1]. With SciPy it runs as an
+        lfilter whose initial state makes y[0] = x[0]; NaN inputs keep pandas'
+        NaN-skipping path.
+        """
+        x = series.to_numpy(dtype=np.float64)
+        if not SCIPY_AVAILABLE or len(x) == 0 or np.isnan(x).any():
+            return series.ewm(span=length, adjust=False).mean()
+        
+        return pd.Series(_ewm_values(x, 2.0 / (length + 1)), index=series.index, name=series.name)
     
     @staticmethod
     def _rsi(series: pd.Series, length: int = 14) -> pd.Series:
@@ -151,7 +557,19 @@ class IndicatorCalculator:
 
         Uses exponential moving average (alpha=1/length) as per Wilder's
         original definition, which reacts faster than SMA-based RSI.
+        Gains/losses are split without masked Series; with SciPy the
+        smoothing runs as an lfilter (gains/losses are never NaN).
         """
+        if SCIPY_AVAILABLE and len(series) > 0:
+            delta = np.diff(series.to_numpy(dtype=np.float64), prepend=np.nan)
+            alpha = 1.0 / length
+            with np.errstate(invalid='ignore', divide='ignore'):
+                avg_gain = _ewm_values(np.where(delta > 0, delta, 0.0), alpha)
+                avg_loss = _ewm_values(np.where(delta < 0, -delta, 0.0), alpha)
+                rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+            rsi[:length - 1] = np.nan  # min_periods=length
+            return pd.Series(rsi, index=series.index)
+        
         delta = series.diff()
         gain = delta.where(delta > 0, 0.0)
         loss = -delta.where(delta < 0, 0.0)
@@ -177,87 +595,149 @@ class IndicatorCalculator:
         }
     
     @staticmethod
-    def _atr(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14) -> pd.Series:
-        """Average True Range"""
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=length).mean()
+    def _true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+        """
+        True Range, computed once and shared by ATR, ADX, SuperTrend and Keltner
+        
+        fmax skips NaN like pd.concat(...).max(axis=1): bar 0 (no previous
+        close) is high - low.
+        """
+        h = high.to_numpy(dtype=np.float64)
+        l = low.to_numpy(dtype=np.float64)
+        prev_close = _lag_values(close.to_numpy(dtype=np.float64), 1)
+        tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+        return pd.Series(tr, index=close.index)
+    
+    @staticmethod
+    def _atr(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14,
+             tr: Optional[pd.Series] = None) -> pd.Series:
+        """Average True Range (pass tr to reuse a precomputed True Range)"""
+        if tr is None:
+            tr = IndicatorCalculator._true_range(high, low, close)
+        atr = IndicatorCalculator._rolling_mean(tr, length)
         return atr
     
     @staticmethod
-    def _calculate_vwap(df: pd.DataFrame, window: int = 20) -> pd.Series:
+    def _rolling_extrema(high: pd.Series, low: pd.Series,
+                         windows: Tuple[int, ...] = EXTREMA_WINDOWS) -> Dict[int, Tuple[pd.Series, pd.Series]]:
+        """
+        Rolling highest high / lowest low for several windows at once
+        
+        Returns:
+            {window: (highest_high, lowest_low)} aligned to high.index
+        """
+        if not NUMBA_AVAILABLE:
+            return {w: (high.rolling(window=w).max(), low.rolling(window=w).min()) for w in windows}
+        
+        w_arr = np.ascontiguousarray(windows, dtype=np.int64)
+        highs = _rolling_max_multi(_contiguous(high), w_arr)
+        lows = -_rolling_max_multi(-_contiguous(low), w_arr)
+        return {
+            w: (pd.Series(highs[:, j], index=high.index, name=high.name),
+                pd.Series(lows[:, j], index=low.index, name=low.name))
+            for j, w in enumerate(windows)
+        }
+    
+    @staticmethod
+    def _highest_lowest(high: pd.Series, low: pd.Series, window: int,
+                        extrema: Optional[Dict[int, Tuple[pd.Series, pd.Series]]] = None) -> Tuple[pd.Series, pd.Series]:
+        """Highest high / lowest low over window, reusing precomputed extrema when available"""
+        if extrema is not None and window in extrema:
+            return extrema[window]
+        return high.rolling(window=window).max(), low.rolling(window=window).min()
+    
+    @staticmethod
+    def _calculate_vwap(df: pd.DataFrame, window: int = 20, session_ids=None,
+                        volume_mean: Optional[pd.Series] = None) -> pd.Series:
         """Calculate rolling VWAP (Volume Weighted Average Price)
 
         Uses a rolling window (default 20 days) instead of cumulative,
         which is more meaningful for daily swing trading data.
+
+        For intraday bars pass session_ids (one label per row, e.g. the
+        trading date; sessions must be contiguous) to get the cumulative
+        VWAP that restarts at every session instead. volume_mean reuses a
+        precomputed `window`-bar volume SMA for the rolling form.
         """
         typical_price = (df['high'] + df['low'] + df['close']) / 3
+        if session_ids is not None:
+            sessions, _ = pd.factorize(np.asarray(session_ids))
+            if NUMBA_AVAILABLE:
+                vwap = _session_vwap_kernel(_contiguous(typical_price), _contiguous(df['volume']),
+                                            np.ascontiguousarray(sessions, dtype=np.int64))
+                return pd.Series(vwap, index=df.index)
+            tp_vol = typical_price * df['volume']
+            return tp_vol.groupby(sessions).cumsum() / df['volume'].groupby(sessions).cumsum()
+        
         tp_vol = typical_price * df['volume']
-        vwap = tp_vol.rolling(window=window, min_periods=window).sum() / df['volume'].rolling(window=window, min_periods=window).sum()
+        # Ratio of window sums == ratio of window means
+        if volume_mean is None:
+            volume_mean = IndicatorCalculator._rolling_mean(df['volume'], window)
+        vwap = IndicatorCalculator._rolling_mean(tp_vol, window) / volume_mean
         return vwap
     
     # ==================== TREND INDICATORS ====================
     
     @staticmethod
-    def _adx(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14) -> Dict[str, pd.Series]:
+    def _adx(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14,
+             tr: Optional[pd.Series] = None) -> Dict[str, pd.Series]:
         """
         Average Directional Index - measures trend strength
         ADX > 25 = trending, ADX < 20 = ranging
+        
+        TR, +DM, -DM and DX use Wilder's smoothing (alpha = 1/length), the
+        canonical ADX definition; all on ndarrays until the final Series.
         """
         # True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        if tr is None:
+            tr = IndicatorCalculator._true_range(high, low, close)
         
-        # Directional Movement
-        up_move = high - high.shift()
-        down_move = low.shift() - low
+        # Directional Movement (on ndarrays: no shifted Series)
+        h = high.to_numpy(dtype=np.float64)
+        l = low.to_numpy(dtype=np.float64)
+        up_move = h - _lag_values(h, 1)
+        down_move = _lag_values(l, 1) - l
         
-        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
-
-        # Smoothed averages
-        # NOTE: pd.Series must use the original index to avoid NaN from index mismatch
-        atr = tr.rolling(window=length).mean()
-        plus_di = 100 * pd.Series(plus_dm, index=close.index).rolling(window=length).mean() / atr
-        minus_di = 100 * pd.Series(minus_dm, index=close.index).rolling(window=length).mean() / atr
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
         
-        # ADX
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.rolling(window=length).mean()
+        # Smoothed averages
+        with np.errstate(invalid='ignore', divide='ignore'):
+            atr = _wilder_values(tr.to_numpy(dtype=np.float64), length)
+            plus_di = 100 * _wilder_values(plus_dm, length) / atr
+            minus_di = 100 * _wilder_values(minus_dm, length) / atr
+            
+            # ADX
+            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+            adx = _wilder_values(dx, length)
         
         return {
-            'adx': adx,
-            'plus_di': plus_di,
-            'minus_di': minus_di
+            'adx': pd.Series(adx, index=close.index),
+            'plus_di': pd.Series(plus_di, index=close.index),
+            'minus_di': pd.Series(minus_di, index=close.index)
         }
     
     @staticmethod
     def _ichimoku(high: pd.Series, low: pd.Series, close: pd.Series,
-                  tenkan: int = 9, kijun: int = 26, senkou_b: int = 52) -> Dict[str, pd.Series]:
+                  tenkan: int = 9, kijun: int = 26, senkou_b: int = 52,
+                  extrema: Optional[Dict[int, Tuple[pd.Series, pd.Series]]] = None) -> Dict[str, pd.Series]:
         """
         Ichimoku Cloud indicator
         Price above cloud = bullish, Tenkan/Kijun cross = entry signal
         """
         # Tenkan-sen (Conversion Line)
-        tenkan_high = high.rolling(window=tenkan).max()
-        tenkan_low = low.rolling(window=tenkan).min()
+        tenkan_high, tenkan_low = IndicatorCalculator._highest_lowest(high, low, tenkan, extrema)
         tenkan_sen = (tenkan_high + tenkan_low) / 2
         
         # Kijun-sen (Base Line)
-        kijun_high = high.rolling(window=kijun).max()
-        kijun_low = low.rolling(window=kijun).min()
+        kijun_high, kijun_low = IndicatorCalculator._highest_lowest(high, low, kijun, extrema)
         kijun_sen = (kijun_high + kijun_low) / 2
         
         # Senkou Span A (Leading Span A)
         senkou_span_a = ((tenkan_sen + kijun_sen) / 2).shift(kijun)
         
         # Senkou Span B (Leading Span B)
-        senkou_b_high = high.rolling(window=senkou_b).max()
-        senkou_b_low = low.rolling(window=senkou_b).min()
+        senkou_b_high, senkou_b_low = IndicatorCalculator._highest_lowest(high, low, senkou_b, extrema)
         senkou_span_b = ((senkou_b_high + senkou_b_low) / 2).shift(kijun)
         
         # Chikou Span (Lagging Span)
@@ -278,79 +758,26 @@ class IndicatorCalculator:
         Parabolic SAR - trend following indicator
         Dots below price = uptrend, dots above = downtrend
         """
-        length = len(close)
-        sar = pd.Series(index=close.index, dtype=float)
-        af = af_start
-        trend = 1  # 1 = uptrend, -1 = downtrend
-        
-        # Initialize
-        sar.iloc[0] = low.iloc[0]
-        ep = high.iloc[0]  # Extreme point
-        
-        for i in range(1, length):
-            if trend == 1:  # Uptrend
-                sar.iloc[i] = sar.iloc[i-1] + af * (ep - sar.iloc[i-1])
-                sar.iloc[i] = min(sar.iloc[i], low.iloc[i-1], low.iloc[i-2] if i > 1 else low.iloc[i-1])
-                
-                if high.iloc[i] > ep:
-                    ep = high.iloc[i]
-                    af = min(af + af_start, af_max)
-                
-                if low.iloc[i] < sar.iloc[i]:  # Trend reversal
-                    trend = -1
-                    sar.iloc[i] = ep
-                    ep = low.iloc[i]
-                    af = af_start
-            else:  # Downtrend
-                sar.iloc[i] = sar.iloc[i-1] + af * (ep - sar.iloc[i-1])
-                sar.iloc[i] = max(sar.iloc[i], high.iloc[i-1], high.iloc[i-2] if i > 1 else high.iloc[i-1])
-                
-                if low.iloc[i] < ep:
-                    ep = low.iloc[i]
-                    af = min(af + af_start, af_max)
-                
-                if high.iloc[i] > sar.iloc[i]:  # Trend reversal
-                    trend = 1
-                    sar.iloc[i] = ep
-                    ep = high.iloc[i]
-                    af = af_start
-        
-        return sar
+        sar = _psar_numba(_contiguous(high), _contiguous(low), af_start, af_max)
+        return pd.Series(sar, index=close.index)
     
     @staticmethod
     def _supertrend(high: pd.Series, low: pd.Series, close: pd.Series,
-                    length: int = 10, multiplier: float = 3) -> Dict[str, pd.Series]:
+                    length: int = 10, multiplier: float = 3,
+                    tr: Optional[pd.Series] = None) -> Dict[str, pd.Series]:
         """
         SuperTrend indicator
         Price above band = bullish, below = bearish
         """
-        atr = IndicatorCalculator._atr(high, low, close, length)
+        atr = IndicatorCalculator._atr(high, low, close, length, tr=tr)
         hl2 = (high + low) / 2
         
         upper_band = hl2 + (multiplier * atr)
         lower_band = hl2 - (multiplier * atr)
         
-        supertrend = pd.Series(index=close.index, dtype=float)
-        direction = pd.Series(index=close.index, dtype=int)
-        
-        supertrend.iloc[0] = upper_band.iloc[0]
-        direction.iloc[0] = -1
-        
-        for i in range(1, len(close)):
-            if close.iloc[i] > supertrend.iloc[i-1]:
-                supertrend.iloc[i] = lower_band.iloc[i]
-                direction.iloc[i] = 1
-            elif close.iloc[i] < supertrend.iloc[i-1]:
-                supertrend.iloc[i] = upper_band.iloc[i]
-                direction.iloc[i] = -1
-            else:
-                supertrend.iloc[i] = supertrend.iloc[i-1]
-                direction.iloc[i] = direction.iloc[i-1]
-                
-                if direction.iloc[i] == 1 and lower_band.iloc[i] > supertrend.iloc[i]:
-                    supertrend.iloc[i] = lower_band.iloc[i]
-                elif direction.iloc[i] == -1 and upper_band.iloc[i] < supertrend.iloc[i]:
-                    supertrend.iloc[i] = upper_band.iloc[i]
+        st, direction = _supertrend_loop(_contiguous(close), _contiguous(upper_band), _contiguous(lower_band))
+        supertrend = pd.Series(st, index=close.index)
+        direction = pd.Series(direction, index=close.index)
         
         return {
             'supertrend': supertrend,
@@ -361,17 +788,17 @@ class IndicatorCalculator:
     
     @staticmethod
     def _stochastic(high: pd.Series, low: pd.Series, close: pd.Series,
-                    k_period: int = 14, d_period: int = 3, smooth_k: int = 3) -> Dict[str, pd.Series]:
+                    k_period: int = 14, d_period: int = 3, smooth_k: int = 3,
+                    extrema: Optional[Dict[int, Tuple[pd.Series, pd.Series]]] = None) -> Dict[str, pd.Series]:
         """
         Stochastic Oscillator
         %K/%D crossover in extreme zones (< 20 or > 80) = entry signal
         """
-        lowest_low = low.rolling(window=k_period).min()
-        highest_high = high.rolling(window=k_period).max()
+        highest_high, lowest_low = IndicatorCalculator._highest_lowest(high, low, k_period, extrema)
         
         stoch_k = 100 * (close - lowest_low) / (highest_high - lowest_low)
-        stoch_k = stoch_k.rolling(window=smooth_k).mean()  # Smooth %K
-        stoch_d = stoch_k.rolling(window=d_period).mean()
+        stoch_k = IndicatorCalculator._rolling_mean(stoch_k, smooth_k)  # Smooth %K
+        stoch_d = IndicatorCalculator._rolling_mean(stoch_k, d_period)
         
         return {
             'k': stoch_k,
@@ -379,13 +806,13 @@ class IndicatorCalculator:
         }
     
     @staticmethod
-    def _williams_r(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14) -> pd.Series:
+    def _williams_r(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14,
+                    extrema: Optional[Dict[int, Tuple[pd.Series, pd.Series]]] = None) -> pd.Series:
         """
         Williams %R
         < -80 = oversold, > -20 = overbought
         """
-        highest_high = high.rolling(window=length).max()
-        lowest_low = low.rolling(window=length).min()
+        highest_high, lowest_low = IndicatorCalculator._highest_lowest(high, low, length, extrema)
         
         wr = -100 * (highest_high - close) / (highest_high - lowest_low)
         return wr
@@ -396,12 +823,8 @@ class IndicatorCalculator:
         Commodity Channel Index
         > +100 = overbought, < -100 = oversold
         """
-        typical_price = (high + low + close) / 3
-        sma_tp = typical_price.rolling(window=length).mean()
-        mean_deviation = typical_price.rolling(window=length).apply(lambda x: np.abs(x - x.mean()).mean())
-        
-        cci = (typical_price - sma_tp) / (0.015 * mean_deviation)
-        return cci
+        tp = ((high + low + close) / 3).to_numpy(dtype=np.float64)
+        return pd.Series(_cci_values(tp, length), index=close.index)
     
     @staticmethod
     def _roc(series: pd.Series, length: int = 12) -> pd.Series:
@@ -409,8 +832,11 @@ class IndicatorCalculator:
         Rate of Change
         Positive = bullish momentum, zero-line cross = signal
         """
-        roc = ((series - series.shift(length)) / series.shift(length)) * 100
-        return roc
+        values = series.to_numpy(dtype=np.float64)
+        prev = _lag_values(values, length)  # One lagged array instead of two shifted Series
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roc = ((values - prev) / prev) * 100
+        return pd.Series(roc, index=series.index)
     
     @staticmethod
     def _mfi(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, length: int = 14) -> pd.Series:
@@ -421,7 +847,18 @@ class IndicatorCalculator:
         typical_price = (high + low + close) / 3
         raw_money_flow = typical_price * volume
         
-        # Positive and negative money flow
+        tp = typical_price.to_numpy(dtype=np.float64)
+        rmf = raw_money_flow.to_numpy(dtype=np.float64)
+        if not np.isnan(rmf).any():
+            # Split flows branch-free and roll both sums as cumulative-sum differences
+            delta = np.diff(tp, prepend=np.nan)
+            positive_flow = _rolling_sum_values(rmf * (delta > 0), length)
+            negative_flow = _rolling_sum_values(rmf * (delta < 0), length)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mfi = 100 - (100 / (1 + positive_flow / negative_flow))
+            return pd.Series(mfi, index=close.index)
+        
+        # Positive and negative money flow (NaN-aware rolling sums)
         delta = typical_price.diff()
         positive_flow = raw_money_flow.where(delta > 0, 0).rolling(window=length).sum()
         negative_flow = raw_money_flow.where(delta < 0, 0).rolling(window=length).sum()
@@ -433,12 +870,14 @@ class IndicatorCalculator:
     # ==================== VOLATILITY INDICATORS ====================
     
     @staticmethod
-    def _bollinger_bands(series: pd.Series, length: int = 20, std_dev: float = 2) -> Dict[str, pd.Series]:
+    def _bollinger_bands(series: pd.Series, length: int = 20, std_dev: float = 2,
+                         middle: Optional[pd.Series] = None) -> Dict[str, pd.Series]:
         """
-        Bollinger Bands
+        Bollinger Bands (pass middle to reuse a precomputed SMA of the same length)
         Price at lower band + RSI < 30 = potential buy signal
         """
-        middle = series.rolling(window=length).mean()
+        if middle is None:
+            middle = IndicatorCalculator._rolling_mean(series, length)
         std = series.rolling(window=length).std()
         
         upper = middle + (std_dev * std)
@@ -460,13 +899,16 @@ class IndicatorCalculator:
     
     @staticmethod
     def _keltner_channels(high: pd.Series, low: pd.Series, close: pd.Series,
-                          length: int = 20, multiplier: float = 1.5) -> Dict[str, pd.Series]:
+                          length: int = 20, multiplier: float = 1.5,
+                          tr: Optional[pd.Series] = None,
+                          middle: Optional[pd.Series] = None) -> Dict[str, pd.Series]:
         """
-        Keltner Channels
+        Keltner Channels (pass middle to reuse a precomputed EMA of the same length)
         Used with Bollinger Bands for squeeze detection
         """
-        middle = IndicatorCalculator._ema(close, length)
-        atr = IndicatorCalculator._atr(high, low, close, length)
+        if middle is None:
+            middle = IndicatorCalculator._ema(close, length)
+        atr = IndicatorCalculator._atr(high, low, close, length, tr=tr)
         
         upper = middle + (multiplier * atr)
         lower = middle - (multiplier * atr)
@@ -478,13 +920,13 @@ class IndicatorCalculator:
         }
     
     @staticmethod
-    def _donchian_channels(high: pd.Series, low: pd.Series, length: int = 20) -> Dict[str, pd.Series]:
+    def _donchian_channels(high: pd.Series, low: pd.Series, length: int = 20,
+                           extrema: Optional[Dict[int, Tuple[pd.Series, pd.Series]]] = None) -> Dict[str, pd.Series]:
         """
         Donchian Channels
         Breakout above upper = long entry signal
         """
-        upper = high.rolling(window=length).max()
-        lower = low.rolling(window=length).min()
+        upper, lower = IndicatorCalculator._highest_lowest(high, low, length, extrema)
         middle = (upper + lower) / 2
         
         return {
@@ -501,32 +943,52 @@ class IndicatorCalculator:
         On-Balance Volume
         Rising OBV + rising price = confirmed trend
         """
-        direction = np.where(close > close.shift(), 1, np.where(close < close.shift(), -1, 0))
-        obv = (volume * direction).cumsum()
+        obv = _obv_kernel(_contiguous(close), _contiguous(volume))
         return pd.Series(obv, index=close.index)
     
     @staticmethod
-    def _ad_line(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series) -> pd.Series:
+    def _money_flow_volume(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series) -> pd.Series:
+        """
+        CLV * volume, computed once and shared by the A/D Line and CMF
+        """
+        h = high.to_numpy(dtype=np.float64)
+        l = low.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            clv = ((c - l) - (h - c)) / (h - l)
+        clv[np.isnan(clv)] = 0.0  # Handle division by zero
+        return pd.Series(clv * volume.to_numpy(dtype=np.float64), index=close.index)
+    
+    @staticmethod
+    def _ad_line(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series,
+                 mfv: Optional[pd.Series] = None) -> pd.Series:
         """
         Accumulation/Distribution Line
         Divergence from price = potential reversal
         """
-        clv = ((close - low) - (high - close)) / (high - low)
-        clv = clv.fillna(0)  # Handle division by zero
-        ad = (clv * volume).cumsum()
+        if mfv is None:
+            mfv = IndicatorCalculator._money_flow_volume(high, low, close, volume)
+        ad = mfv.cumsum()
         return ad
     
     @staticmethod
-    def _cmf(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, length: int = 20) -> pd.Series:
+    def _cmf(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, length: int = 20,
+             mfv: Optional[pd.Series] = None) -> pd.Series:
         """
         Chaikin Money Flow
         > 0 = buying pressure, < 0 = selling pressure
         """
-        clv = ((close - low) - (high - close)) / (high - low)
-        clv = clv.fillna(0)
+        if mfv is None:
+            mfv = IndicatorCalculator._money_flow_volume(high, low, close, volume)
+        
+        flow = mfv.to_numpy(dtype=np.float64)
+        vol = volume.to_numpy(dtype=np.float64)
+        if np.isnan(flow).any() or np.isnan(vol).any():
+            return mfv.rolling(window=length).sum() / volume.rolling(window=length).sum()
         
-        cmf = (clv * volume).rolling(window=length).sum() / volume.rolling(window=length).sum()
-        return cmf
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cmf = _rolling_sum_values(flow, length) / _rolling_sum_values(vol, length)
+        return pd.Series(cmf, index=close.index)
     
     # ==================== UTILITY METHODS ====================
     
@@ -541,37 +1003,35 @@ class IndicatorCalculator:
         if df.empty:
             return {}
         
-        # Use high-low range for volume distribution
-        price_range = df['high'].max() - df['low'].min()
-        bin_size = price_range / bins
-        
-        # Create price bins
-        min_price = df['low'].min()
-        price_bins = [min_price + i * bin_size for i in range(bins + 1)]
+        lows = df['low'].to_numpy(dtype=np.float64)
+        highs = df['high'].to_numpy(dtype=np.float64)
+        volumes = df['volume'].to_numpy(dtype=np.float64)
         
-        # Distribute volume across price bins
+        # Use high-low range for volume distribution
+        min_price = np.nanmin(lows)
+        bin_size = (np.nanmax(highs) - min_price) / bins
+        
+        # Create price bins (edges as columns, one row per bar)
+        edges = min_price + np.arange(bins + 1) * bin_size
+        bin_low = edges[:-1][None, :]
+        bin_high = edges[1:][None, :]
+        bar_low = lows[:, None]
+        bar_high = highs[:, None]
+        
+        # Distribute each bar's volume proportionally across the bins it overlaps
+        touches = (bar_low <= bin_high) & (bar_high >= bin_low)
+        overlap = np.minimum(bar_high, bin_high) - np.maximum(bar_low, bin_low)
+        bar_range = highs - lows
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where((bar_range != 0)[:, None], overlap / bar_range[:, None], 1.0)
+        binned = np.where(touches, volumes[:, None] * ratio, 0.0).sum(axis=0)
+        
+        # Only bins touched by at least one bar appear (same keys as before)
         volume_distribution = {}
-        for _, row in df.iterrows():
-            # Find which bins this bar contributes to
-            bar_low = row['low']
-            bar_high = row['high']
-            bar_volume = row['volume']
-            
-            # Distribute volume proportionally across bins
-            for i in range(len(price_bins) - 1):
-                bin_low = price_bins[i]
-                bin_high = price_bins[i + 1]
-                
-                # Check if bar overlaps with bin
-                if bar_low <= bin_high and bar_high >= bin_low:
-                    overlap_low = max(bar_low, bin_low)
-                    overlap_high = min(bar_high, bin_high)
-                    overlap_ratio = (overlap_high - overlap_low) / (bar_high - bar_low) if bar_high != bar_low else 1
-                    
-                    bin_mid = (bin_low + bin_high) / 2
-                    if bin_mid not in volume_distribution:
-                        volume_distribution[bin_mid] = 0
-                    volume_distribution[bin_mid] += bar_volume * overlap_ratio
+        bin_mids = (edges[:-1] + edges[1:]) / 2
+        for bin_mid, touched, bin_volume in zip(bin_mids.tolist(), touches.any(axis=0), binned.tolist()):
+            if touched:
+                volume_distribution[bin_mid] = volume_distribution.get(bin_mid, 0) + bin_volume
         
         if not volume_distribution:
             return {}
@@ -608,3 +1068,52 @@ class IndicatorCalculator:
             'shelves': sorted(shelves),
             'volume_distribution': volume_distribution
         }
+
+
+# ==================== STANDALONE COLUMNS (ensure_columns) ====================
+
+def _sma_column(df: pd.DataFrame, tr, length: int) -> Dict[str, pd.Series]:
+    """SMA of close"""
+    return {f'sma_{length}': IndicatorCalculator._sma(df['close'], length=length)}
+
+
+def _ema_column(df: pd.DataFrame, tr, length: int) -> Dict[str, pd.Series]:
+    """EMA of close"""
+    return {f'ema_{length}': IndicatorCalculator._ema(df['close'], length=length)}
+
+
+def _atr_columns(df: pd.DataFrame, tr) -> Dict[str, pd.Series]:
+    """ATR (14) and NATR"""
+    atr = IndicatorCalculator._atr(df['high'], df['low'], df['close'], length=14, tr=tr)
+    return {'atr': atr, 'natr': (atr / df['close']) * 100}
+
+
+def _adx_columns(df: pd.DataFrame, tr) -> Dict[str, pd.Series]:
+    """ADX (14) with +DI / -DI"""
+    adx_data = IndicatorCalculator._adx(df['high'], df['low'], df['close'], length=14, tr=tr)
+    return {'adx': adx_data['adx'], 'plus_di': adx_data['plus_di'], 'minus_di': adx_data['minus_di']}
+
+
+def _volume_columns(df: pd.DataFrame, tr) -> Dict[str, pd.Series]:
+    """Volume SMA (20) and volume ratio"""
+    volume_sma = IndicatorCalculator._sma(df['volume'], length=20)
+    return {'volume_sma': volume_sma, 'volume_ratio': df['volume'] / volume_sma}
+
+
+# Column -> builder(df, tr) returning that column (and any computed alongside it)
+_COLUMN_BUILDERS = {
+    **{f'sma_{length}': partial(_sma_column, length=length) for length in (20, 50, 200)},
+    **{f'ema_{length}': partial(_ema_column, length=length) for length in (9, 21, 50)},
+    'atr': _atr_columns,
+    'natr': _atr_columns,
+    'adx': _adx_columns,
+    'plus_di': _adx_columns,
+    'minus_di': _adx_columns,
+    'rsi': lambda df, tr: {'rsi': IndicatorCalculator._rsi(df['close'], length=14)},
+    'volume_sma': _volume_columns,
+    'volume_ratio': _volume_columns,
+    'dollar_volume': lambda df, tr: {'dollar_volume': df['close'] * df['volume']},
+}
+
+# Builders that read the shared True Range
+_TR_COLUMNS = frozenset({'atr', 'natr', 'adx', 'plus_di', 'minus_di'})
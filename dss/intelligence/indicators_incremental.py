@@ -0,0 +1,370 @@
+"""Incremental (one bar at a time) frontend for the indicator suite
+
+IndicatorCalculator.calculate_all recomputes every column over the whole
+history, so in a live loop each new bar repeats all previous work. This
+calculator keeps the recursive state (EMAs, Wilder RSI/ADX, Parabolic SAR,
+SuperTrend, OBV, A/D Line) plus ring buffers of the last `max_window` bars,
+and update() only does the marginal work for the new bar.
+
+Values match the last row of calculate_all on the same history up to
+floating-point rounding, except ichimoku_chikou: it looks 26 bars ahead, so
+it is always NaN for the latest bar.
+
+calculate_all remains the backfill path; pass its input frame as `history`
+to warm-start the state.
+"""
+from collections import deque
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import INDICATOR_COLUMNS, _psar_step, _supertrend_step
+
+
+class IncrementalIndicatorCalculator:
+    """
+    Per-symbol indicator state advanced one bar per update()
+
+    The state is keyed on (last_timestamp, bars): bars with a timestamp not
+    after the last one are rejected, since replaying them would double-count
+    the recursive indicators.
+    """
+
+    EMA_SPANS = (9, 12, 20, 21, 26, 50)
+    SENKOU_SHIFT = 26
+    PSAR_AF_START = 0.02
+    PSAR_AF_MAX = 0.2
+
+    def __init__(self, history: Optional[pd.DataFrame] = None, max_window: int = 200):
+        """
+        Args:
+            history: Optional OHLCV frame (optionally with a 'timestamp' column)
+                replayed to warm-start the state
+            max_window: Bars kept in the ring buffers (>= 200, the SMA 200 window)
+        """
+        if max_window < 200:
+            raise ValueError(f"max_window must be >= 200 (SMA 200 window), got {max_window}")
+        self.max_window = max_window
+        self.bars = 0
+        self.last_timestamp = None
+
+        # Raw and per-bar derived series (ring buffers)
+        self._high = deque(maxlen=max_window)
+        self._low = deque(maxlen=max_window)
+        self._close = deque(maxlen=max_window)
+        self._volume = deque(maxlen=max_window)
+        self._tr = deque(maxlen=20)
+        self._tp = deque(maxlen=20)
+        self._positive_flow = deque(maxlen=14)
+        self._negative_flow = deque(maxlen=14)
+        self._mfv = deque(maxlen=20)
+
+        # Intermediate series that are smoothed again
+        self._stoch_raw = deque(maxlen=3)
+        self._stoch_k = deque(maxlen=3)
+        self._senkou_a = deque(maxlen=self.SENKOU_SHIFT + 1)
+        self._senkou_b = deque(maxlen=self.SENKOU_SHIFT + 1)
+
+        # Recursive state
+        self._ema = {span: np.nan for span in self.EMA_SPANS}
+        self._macd_signal = np.nan
+        self._avg_gain = np.nan
+        self._avg_loss = np.nan
+        self._smoothed_tr = np.nan
+        self._smoothed_plus_dm = np.nan
+        self._smoothed_minus_dm = np.nan
+        self._plus_di = np.nan
+        self._minus_di = np.nan
+        self._adx = np.nan
+        self._dx_count = 0
+        self._psar: Tuple[float, float, float, int] = (np.nan, np.nan, self.PSAR_AF_START, 1)
+        self._supertrend: Tuple[float, int] = (np.nan, -1)
+        self._obv = 0.0
+        self._ad = 0.0
+        self._last_obv = np.nan
+        self._last_ad = np.nan
+
+        if history is not None and not history.empty:
+            columns = [history[name].to_numpy(dtype=np.float64) for name in ('high', 'low', 'close', 'volume')]
+            for h, l, c, v in zip(*columns):
+                self._advance(h, l, c, v)
+            if 'timestamp' in history.columns:
+                self.last_timestamp = history['timestamp'].iloc[-1]
+
+    @property
+    def key(self) -> Tuple[Any, int]:
+        """(last_timestamp, bars seen): identifies the history the state reflects"""
+        return self.last_timestamp, self.bars
+
+    def update(self, bar: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Append one bar and return its indicator values
+
+        Args:
+            bar: Mapping (dict or DataFrame row) with high/low/close/volume and
+                optionally 'timestamp'
+
+        Returns:
+            {column: value} in calculate_all column order
+        """
+        timestamp = bar.get('timestamp')
+        if timestamp is not None and self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            raise ValueError(f"Bar at {timestamp} is not after the last bar ({self.last_timestamp})")
+
+        self._advance(*(np.float64(bar[name]) for name in ('high', 'low', 'close', 'volume')))
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+        return self._snapshot()
+
+    # ==================== STATE UPDATE ====================
+
+    def _advance(self, h: float, l: float, c: float, v: float):
+        """Fold one bar into the buffers and the recursive state"""
+        first = self.bars == 0
+        prev_h = self._high[-1] if not first else np.nan
+        prev_l = self._low[-1] if not first else np.nan
+        prev_c = self._close[-1] if not first else np.nan
+
+        # Parabolic SAR (needs the previous two bars before they are appended)
+        if first:
+            self._psar = (l, h, self.PSAR_AF_START, 1)
+        else:
+            prev2_h = self._high[-2] if self.bars > 1 else prev_h
+            prev2_l = self._low[-2] if self.bars > 1 else prev_l
+            sar, ep, af, trend = self._psar
+            self._psar = _psar_step(sar, ep, af, trend, h, l, prev_h, prev2_h, prev_l, prev2_l,
+                                    self.PSAR_AF_START, self.PSAR_AF_MAX)
+
+        self._high.append(h)
+        self._low.append(l)
+        self._close.append(c)
+        self._volume.append(v)
+        self.bars += 1
+
+        # True Range and directional movement (bar 0: high - low, no DM)
+        self._tr.append(np.fmax(h - l, np.fmax(abs(h - prev_c), abs(l - prev_c))))
+        up_move = h - prev_h
+        down_move = prev_l - l
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+
+        # Money flow (MFI) and CLV * volume (A/D Line, CMF)
+        tp = (h + l + c) / 3
+        prev_tp = self._tp[-1] if self._tp else np.nan
+        self._tp.append(tp)
+        self._positive_flow.append(tp * v if tp > prev_tp else 0.0)
+        self._negative_flow.append(tp * v if tp < prev_tp else 0.0)
+        clv = ((c - l) - (h - c)) / (h - l) if h != l else 0.0
+        self._mfv.append(clv * v)
+
+        # EMAs / MACD (ewm adjust=False: seeded with the first value)
+        for span in self.EMA_SPANS:
+            self._ema[span] = c if first else self._ema[span] + 2.0 / (span + 1) * (c - self._ema[span])
+        macd = self._ema[12] - self._ema[26]
+        self._macd_signal = macd if first else self._macd_signal + 0.2 * (macd - self._macd_signal)
+
+        # RSI (Wilder, alpha = 1/14; bar 0 has no change)
+        delta = c - prev_c
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if first:
+            self._avg_gain, self._avg_loss = gain, loss
+        else:
+            self._avg_gain += (gain - self._avg_gain) / 14
+            self._avg_loss += (loss - self._avg_loss) / 14
+
+        # OBV / A/D Line (a NaN step leaves the running sum unchanged, as cumsum)
+        sign = 1.0 if c > prev_c else (-1.0 if c < prev_c else 0.0)
+        self._last_obv, self._obv = self._accumulate(self._obv, v * sign)
+        self._last_ad, self._ad = self._accumulate(self._ad, self._mfv[-1])
+
+        # ADX (Wilder, alpha = 1/14): TR / DM seeded with bar 0, DX with its first valid value
+        if first:
+            self._smoothed_tr, self._smoothed_plus_dm, self._smoothed_minus_dm = self._tr[-1], plus_dm, minus_dm
+        else:
+            self._smoothed_tr += (self._tr[-1] - self._smoothed_tr) / 14
+            self._smoothed_plus_dm += (plus_dm - self._smoothed_plus_dm) / 14
+            self._smoothed_minus_dm += (minus_dm - self._smoothed_minus_dm) / 14
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self.bars >= 14:
+                self._plus_di = 100 * self._smoothed_plus_dm / self._smoothed_tr
+                self._minus_di = 100 * self._smoothed_minus_dm / self._smoothed_tr
+            dx = 100 * abs(self._plus_di - self._minus_di) / (self._plus_di + self._minus_di)
+            if not np.isnan(dx):
+                self._adx = dx if self._dx_count == 0 else self._adx + (dx - self._adx) / 14
+                self._dx_count += 1
+
+            # Windowed values that are smoothed again
+            hh_14, ll_14 = self._extrema(14)
+            self._stoch_raw.append(100 * (c - ll_14) / (hh_14 - ll_14))
+            self._stoch_k.append(self._mean(self._stoch_raw, 3))
+
+        tenkan = self._midpoint(9)
+        kijun = self._midpoint(26)
+        self._senkou_a.append((tenkan + kijun) / 2)
+        self._senkou_b.append(self._midpoint(52))
+
+        # SuperTrend (10, 3) on hl2 +/- 3 * ATR(10)
+        atr_10 = self._mean(self._tr, 10)
+        hl2 = (h + l) / 2
+        upper_band = hl2 + 3 * atr_10
+        lower_band = hl2 - 3 * atr_10
+        if first:
+            self._supertrend = (upper_band, -1)
+        else:
+            self._supertrend = _supertrend_step(c, *self._supertrend, upper_band, lower_band)
+
+    @staticmethod
+    def _accumulate(total: float, step: float) -> Tuple[float, float]:
+        """(value at this bar, new running total) for a NaN-skipping cumulative sum"""
+        if np.isnan(step):
+            return np.nan, total
+        total += step
+        return total, total
+
+    # ==================== WINDOW HELPERS ====================
+
+    def _tail(self, buffer: deque, length: int) -> Optional[np.ndarray]:
+        """Last `length` values of a buffer, None until the window is full"""
+        if self.bars < length or len(buffer) < length:
+            return None
+        if len(buffer) == length:
+            return np.array(buffer, dtype=np.float64)
+        return np.array(list(buffer)[-length:], dtype=np.float64)
+
+    def _mean(self, buffer: deque, length: int) -> float:
+        """Rolling mean of the last `length` values (NaN during warm-up)"""
+        window = self._tail(buffer, length)
+        return np.nan if window is None else window.mean()
+
+    def _sum(self, buffer: deque, length: int) -> float:
+        """Rolling sum of the last `length` values (NaN during warm-up)"""
+        window = self._tail(buffer, length)
+        return np.nan if window is None else window.sum()
+
+    def _extrema(self, length: int) -> Tuple[float, float]:
+        """(highest high, lowest low) over the last `length` bars"""
+        highs = self._tail(self._high, length)
+        if highs is None:
+            return np.nan, np.nan
+        return highs.max(), self._tail(self._low, length).min()
+
+    def _midpoint(self, length: int) -> float:
+        """Ichimoku line: midpoint of the `length`-bar range"""
+        highest, lowest = self._extrema(length)
+        return (highest + lowest) / 2
+
+    def _lagged(self, buffer: deque, lag: int) -> float:
+        """Value `lag` bars back (NaN if not seen yet)"""
+        return buffer[-1 - lag] if len(buffer) > lag else np.nan
+
+    # ==================== OUTPUT ====================
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Indicator values for the latest bar"""
+        if self.bars == 0:
+            return {}
+
+        out = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self._trend_values(out)
+            self._momentum_values(out)
+            self._volatility_volume_values(out)
+        return {name: out[name] for name in INDICATOR_COLUMNS}
+
+    def _trend_values(self, out: Dict[str, Any]):
+        """SMA/EMA, MACD, ADX, Ichimoku, Parabolic SAR, SuperTrend"""
+        out['sma_20'] = self._mean(self._close, 20)
+        out['sma_50'] = self._mean(self._close, 50)
+        out['sma_200'] = self._mean(self._close, 200)
+        out['ema_9'] = self._ema[9]
+        out['ema_21'] = self._ema[21]
+        out['ema_50'] = self._ema[50]
+
+        out['macd'] = self._ema[12] - self._ema[26]
+        out['macd_signal'] = self._macd_signal
+        out['macd_hist'] = out['macd'] - self._macd_signal
+
+        out['adx'] = self._adx if self._dx_count >= 14 else np.nan
+        out['plus_di'] = self._plus_di
+        out['minus_di'] = self._minus_di
+
+        out['ichimoku_tenkan'] = self._midpoint(9)
+        out['ichimoku_kijun'] = self._midpoint(26)
+        out['ichimoku_senkou_a'] = self._lagged(self._senkou_a, self.SENKOU_SHIFT)
+        out['ichimoku_senkou_b'] = self._lagged(self._senkou_b, self.SENKOU_SHIFT)
+        out['ichimoku_chikou'] = np.nan  # Needs the close 26 bars ahead
+
+        out['parabolic_sar'] = self._psar[0]
+        out['supertrend'] = self._supertrend[0]
+        out['supertrend_direction'] = int(self._supertrend[1])
+
+    def _momentum_values(self, out: Dict[str, Any]):
+        """RSI, Stochastic, Williams %R, CCI, ROC, MFI"""
+        close = self._close[-1]
+
+        out['rsi'] = 100 - 100 / (1 + self._avg_gain / self._avg_loss) if self.bars >= 14 else np.nan
+
+        out['stoch_k'] = self._stoch_k[-1]
+        out['stoch_d'] = self._mean(self._stoch_k, 3)
+
+        hh_14, ll_14 = self._extrema(14)
+        out['williams_r'] = -100 * (hh_14 - close) / (hh_14 - ll_14)
+
+        tp = self._tail(self._tp, 20)
+        if tp is None:
+            out['cci'] = np.nan
+        else:
+            sma_tp = tp.mean()
+            out['cci'] = (tp[-1] - sma_tp) / (0.015 * np.abs(tp - sma_tp).mean())
+
+        prev_close = self._lagged(self._close, 12)
+        out['roc'] = (close - prev_close) / prev_close * 100
+
+        positive_flow = self._sum(self._positive_flow, 14)
+        negative_flow = self._sum(self._negative_flow, 14)
+        out['mfi'] = 100 - 100 / (1 + positive_flow / negative_flow)
+
+    def _volatility_volume_values(self, out: Dict[str, Any]):
+        """ATR, Bollinger, Keltner, Donchian, squeeze, VWAP, volume, OBV, A/D, CMF"""
+        close = self._close[-1]
+        volume = self._volume[-1]
+
+        out['atr'] = self._mean(self._tr, 14)
+        out['natr'] = out['atr'] / close * 100
+
+        window = self._tail(self._close, 20)
+        middle = np.nan if window is None else window.mean()
+        std = np.nan if window is None else window.std(ddof=1)
+        out['bb_upper'] = middle + 2 * std
+        out['bb_middle'] = middle
+        out['bb_lower'] = middle - 2 * std
+        out['bb_width'] = (out['bb_upper'] - out['bb_lower']) / middle
+        out['bb_percent'] = (close - out['bb_lower']) / (out['bb_upper'] - out['bb_lower'])
+
+        keltner_atr = self._mean(self._tr, 20)
+        out['keltner_upper'] = self._ema[20] + 1.5 * keltner_atr
+        out['keltner_middle'] = self._ema[20]
+        out['keltner_lower'] = self._ema[20] - 1.5 * keltner_atr
+
+        out['donchian_upper'], out['donchian_lower'] = self._extrema(20)
+        out['donchian_middle'] = (out['donchian_upper'] + out['donchian_lower']) / 2
+
+        out['squeeze'] = bool(out['bb_lower'] > out['keltner_lower'] and out['bb_upper'] < out['keltner_upper'])
+
+        tp_volume = self._tail(self._tp, 20)
+        volumes = self._tail(self._volume, 20)
+        if volumes is None:
+            out['vwap'] = np.nan
+            out['volume_sma'] = np.nan
+        else:
+            out['vwap'] = (tp_volume * volumes).sum() / volumes.sum()
+            out['volume_sma'] = volumes.mean()
+        out['volume_ratio'] = volume / out['volume_sma']
+
+        out['obv'] = self._last_obv
+        out['ad_line'] = self._last_ad
+        out['cmf'] = self._sum(self._mfv, 20) / self._sum(self._volume, 20)
+        out['dollar_volume'] = close * volume
@@ -0,0 +1,199 @@
+"""Polars frontend for the indicator suite
+
+Same columns and formulas as IndicatorCalculator.calculate_all, expressed as
+Polars expressions so the rolling/ewm work runs in Polars' multithreaded
+kernels without pandas in the hot path. The sequential indicators (Parabolic
+SAR, SuperTrend, OBV) and CCI reuse the NumPy kernels from indicators.py.
+
+Warm-up values are null (Polars) instead of NaN (pandas).
+"""
+from typing import Dict, List
+
+import numpy as np
+import polars as pl
+
+from .indicators import INDICATOR_COLUMNS, _cci_values, _contiguous, _obv_kernel, _psar_numba, _supertrend_loop
+
+
+def _ema(expr: pl.Expr, length: int) -> pl.Expr:
+    """Exponential Moving Average (same recursion as ewm(span, adjust=False))"""
+    return expr.ewm_mean(span=length, adjust=False)
+
+
+def _wilder(expr: pl.Expr, length: int) -> pl.Expr:
+    """Wilder's smoothing (ewm alpha=1/length, adjust=False, min_periods=length)"""
+    return expr.ewm_mean(alpha=1 / length, adjust=False, min_samples=length)
+
+
+def _where_or_zero(expr: pl.Expr, cond: pl.Expr) -> pl.Expr:
+    """expr where cond holds, else 0 (a null cond counts as False, like np.where on NaN)"""
+    return pl.when(cond).then(expr).otherwise(0.0)
+
+
+def _trend_momentum_exprs() -> List[pl.Expr]:
+    """SMA/EMA, MACD, ADX, Ichimoku, RSI, Stochastic, Williams %R, ROC, MFI"""
+    high, low, close, volume = pl.col('high'), pl.col('low'), pl.col('close'), pl.col('volume')
+    tr = pl.col('_tr')
+
+    # MACD (12, 26, 9)
+    macd = _ema(close, 12) - _ema(close, 26)
+    signal = _ema(macd, 9)
+
+    # ADX (14)
+    up_move = high.diff()
+    down_move = -low.diff()
+    plus_dm = _where_or_zero(up_move, (up_move > down_move) & (up_move > 0))
+    minus_dm = _where_or_zero(down_move, (down_move > up_move) & (down_move > 0))
+    atr_14 = _wilder(tr, 14)
+    plus_di = 100 * _wilder(plus_dm, 14) / atr_14
+    minus_di = 100 * _wilder(minus_dm, 14) / atr_14
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+
+    # Ichimoku (9, 26, 52)
+    tenkan = (high.rolling_max(9) + low.rolling_min(9)) / 2
+    kijun = (high.rolling_max(26) + low.rolling_min(26)) / 2
+    senkou_b = (high.rolling_max(52) + low.rolling_min(52)) / 2
+
+    # RSI (14, Wilder)
+    delta = close.diff()
+    gain = _where_or_zero(delta, delta > 0)
+    loss = _where_or_zero(-delta, delta < 0)
+    rs = _wilder(gain, 14) / _wilder(loss, 14)
+
+    # Stochastic (14, 3, 3) / Williams %R (14)
+    hh_14, ll_14 = high.rolling_max(14), low.rolling_min(14)
+    stoch_k = (100 * (close - ll_14) / (hh_14 - ll_14)).rolling_mean(3)
+
+    # MFI (14)
+    tp = (high + low + close) / 3
+    raw_money_flow = tp * volume
+    tp_delta = tp.diff()
+    positive_flow = _where_or_zero(raw_money_flow, tp_delta > 0).rolling_sum(14)
+    negative_flow = _where_or_zero(raw_money_flow, tp_delta < 0).rolling_sum(14)
+
+    return [
+        close.rolling_mean(20).alias('sma_20'),
+        close.rolling_mean(50).alias('sma_50'),
+        close.rolling_mean(200).alias('sma_200'),
+        _ema(close, 9).alias('ema_9'),
+        _ema(close, 21).alias('ema_21'),
+        _ema(close, 50).alias('ema_50'),
+        macd.alias('macd'),
+        signal.alias('macd_signal'),
+        (macd - signal).alias('macd_hist'),
+        _wilder(dx, 14).alias('adx'),
+        plus_di.alias('plus_di'),
+        minus_di.alias('minus_di'),
+        tenkan.alias('ichimoku_tenkan'),
+        kijun.alias('ichimoku_kijun'),
+        ((tenkan + kijun) / 2).shift(26).alias('ichimoku_senkou_a'),
+        senkou_b.shift(26).alias('ichimoku_senkou_b'),
+        close.shift(-26).alias('ichimoku_chikou'),
+        (100 - 100 / (1 + rs)).alias('rsi'),
+        stoch_k.alias('stoch_k'),
+        stoch_k.rolling_mean(3).alias('stoch_d'),
+        (-100 * (hh_14 - close) / (hh_14 - ll_14)).alias('williams_r'),
+        ((close - close.shift(12)) / close.shift(12) * 100).alias('roc'),
+        (100 - 100 / (1 + positive_flow / negative_flow)).alias('mfi'),
+    ]
+
+
+def _volatility_volume_exprs() -> List[pl.Expr]:
+    """ATR, Bollinger, Keltner, Donchian, squeeze, VWAP, volume, A/D, CMF"""
+    high, low, close, volume = pl.col('high'), pl.col('low'), pl.col('close'), pl.col('volume')
+    tr = pl.col('_tr')
+
+    atr = tr.rolling_mean(14)
+
+    # Bollinger Bands (20, 2)
+    bb_middle = close.rolling_mean(20)
+    bb_std = close.rolling_std(20)
+    bb_upper = bb_middle + 2 * bb_std
+    bb_lower = bb_middle - 2 * bb_std
+
+    # Keltner Channels (20, 1.5)
+    keltner_middle = _ema(close, 20)
+    keltner_atr = tr.rolling_mean(20)
+    keltner_upper = keltner_middle + 1.5 * keltner_atr
+    keltner_lower = keltner_middle - 1.5 * keltner_atr
+
+    # Donchian Channels (20)
+    donchian_upper = high.rolling_max(20)
+    donchian_lower = low.rolling_min(20)
+
+    # VWAP (20) / volume
+    tp = (high + low + close) / 3
+    volume_sma = volume.rolling_mean(20)
+
+    # CLV (0 where high == low)
+    clv = (((close - low) - (high - close)) / (high - low)).fill_nan(0.0).fill_null(0.0)
+
+    return [
+        atr.alias('atr'),
+        (atr / close * 100).alias('natr'),
+        bb_upper.alias('bb_upper'),
+        bb_middle.alias('bb_middle'),
+        bb_lower.alias('bb_lower'),
+        ((bb_upper - bb_lower) / bb_middle).alias('bb_width'),
+        ((close - bb_lower) / (bb_upper - bb_lower)).alias('bb_percent'),
+        keltner_upper.alias('keltner_upper'),
+        keltner_middle.alias('keltner_middle'),
+        keltner_lower.alias('keltner_lower'),
+        donchian_upper.alias('donchian_upper'),
+        donchian_lower.alias('donchian_lower'),
+        ((donchian_upper + donchian_lower) / 2).alias('donchian_middle'),
+        ((bb_lower > keltner_lower) & (bb_upper < keltner_upper)).fill_null(False).alias('squeeze'),
+        ((tp * volume).rolling_sum(20) / volume.rolling_sum(20)).alias('vwap'),
+        volume_sma.alias('volume_sma'),
+        (volume / volume_sma).alias('volume_ratio'),
+        (clv * volume).cum_sum().alias('ad_line'),
+        ((clv * volume).rolling_sum(20) / volume.rolling_sum(20)).alias('cmf'),
+        (close * volume).alias('dollar_volume'),
+    ]
+
+
+def _kernel_columns(df: pl.DataFrame) -> Dict[str, np.ndarray]:
+    """Sequential indicators from the shared NumPy kernels"""
+    high = _contiguous(df['high'])
+    low = _contiguous(df['low'])
+    close = _contiguous(df['close'])
+
+    # SuperTrend (10, 3) bands
+    atr_10 = df['_tr'].rolling_mean(10).fill_null(np.nan).to_numpy()
+    hl2 = (high + low) / 2
+    supertrend, direction = _supertrend_loop(close, hl2 + 3 * atr_10, hl2 - 3 * atr_10)
+
+    return {
+        'parabolic_sar': _psar_numba(high, low, 0.02, 0.2),
+        'supertrend': supertrend,
+        'supertrend_direction': direction,
+        'cci': _cci_values((high + low + close) / 3, 20),
+        'obv': _obv_kernel(close, _contiguous(df['volume'])),
+    }
+
+
+def calculate_all(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Calculate the full indicator suite on a Polars frame with high/low/close/volume
+
+    Returns the input columns followed by the indicator columns (existing
+    indicator columns are replaced).
+    """
+    if df.is_empty():
+        return df
+
+    base = df.drop([name for name in INDICATOR_COLUMNS if name in df.columns])
+    work = base.with_columns(
+        pl.col('high', 'low', 'close', 'volume').cast(pl.Float64)
+    ).with_columns(
+        # True Range (bar 0 = high - low: max_horizontal skips the null previous close)
+        pl.max_horizontal(
+            pl.col('high') - pl.col('low'),
+            (pl.col('high') - pl.col('close').shift()).abs(),
+            (pl.col('low') - pl.col('close').shift()).abs()
+        ).alias('_tr')
+    )
+
+    indicators = work.select(_trend_momentum_exprs() + _volatility_volume_exprs())
+    kernels = pl.DataFrame(_kernel_columns(work))
+    return pl.concat([base, indicators, kernels], how='horizontal').select(base.columns + INDICATOR_COLUMNS)
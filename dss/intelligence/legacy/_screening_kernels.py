@@ -0,0 +1,102 @@
+"""Numeric core of StockScreener: 20-bar averages and threshold checks on raw arrays
+
+The kernels carry explicit signatures, so Numba compiles them when this module
+is imported (cached on disk by cache=True) rather than on the first screened
+symbol.
+"""
+import numpy as np
+
+from ..indicators import _F64_IN
+from ...utils._njit import njit
+
+# Flag bits returned by _screen_kernel
+PRICE_LOW = 1
+PRICE_HIGH = 2
+VOLUME_LOW = 4
+LIQUIDITY_LOW = 8
+NATR_LOW = 16
+NATR_HIGH = 32
+NATR_MISSING = 64
+SPREAD_WIDE = 128
+
+# Flags that reject the symbol (SPREAD_WIDE / NATR_MISSING only warn)
+FAIL_MASK = PRICE_LOW | PRICE_HIGH | VOLUME_LOW | LIQUIDITY_LOW | NATR_LOW | NATR_HIGH
+
+# Bars averaged for volume, dollar volume and range
+SCREEN_WINDOW = 20
+
+# Filter keys packed (in this order) into the kernel's thresholds array
+THRESHOLD_KEYS = ('min_price', 'max_price', 'min_avg_volume', 'min_dollar_volume',
+                  'min_natr', 'max_natr', 'max_spread_percent')
+MIN_PRICE, MAX_PRICE, MIN_VOLUME, MIN_DOLLAR_VOLUME, MIN_NATR, MAX_NATR, MAX_SPREAD = range(len(THRESHOLD_KEYS))
+
+
+@njit(f"int64(float64, float64, float64, float64, float64, {_F64_IN})",
+      cache=True, nogil=True, error_model='numpy')
+def _screen_flags(price, avg_volume, avg_dollar_volume, natr, estimated_spread, thresholds):
+    """Flag bits for one symbol's metrics (thresholds in THRESHOLD_KEYS order)"""
+    flags = 0
+    if price < thresholds[MIN_PRICE]:
+        flags |= PRICE_LOW
+    elif price > thresholds[MAX_PRICE]:
+        flags |= PRICE_HIGH
+    if avg_volume < thresholds[MIN_VOLUME]:
+        flags |= VOLUME_LOW
+    if avg_dollar_volume < thresholds[MIN_DOLLAR_VOLUME]:
+        flags |= LIQUIDITY_LOW
+    if np.isnan(natr):
+        flags |= NATR_MISSING
+    elif natr < thresholds[MIN_NATR]:
+        flags |= NATR_LOW
+    elif natr > thresholds[MAX_NATR]:
+        flags |= NATR_HIGH
+    if estimated_spread > thresholds[MAX_SPREAD]:
+        flags |= SPREAD_WIDE
+    return flags
+
+
+@njit("Tuple((int64, float64, float64, float64, float64, float64))"
+      f"({_F64_IN}, {_F64_IN}, {_F64_IN}, {_F64_IN}, {_F64_IN}, {_F64_IN}, {_F64_IN})",
+      cache=True, nogil=True, error_model='numpy')
+def _screen_kernel(close, high, low, volume, dollar_volume, natr, thresholds):
+    """
+    Screen one symbol from its float64 price/volume/NATR arrays.
+
+    thresholds holds the filter values in THRESHOLD_KEYS order.
+
+    The averages cover the last SCREEN_WINDOW bars and skip NaN (like pandas
+    mean); the spread estimate is 15% of the average (high - low) / close
+    range, in %. NaN metrics never trip a threshold.
+
+    Returns (flags, price, avg_volume, avg_dollar_volume, natr, estimated_spread).
+    """
+    n = close.shape[0]
+    start = max(n - SCREEN_WINDOW, 0)
+
+    volume_sum = 0.0
+    volume_count = 0
+    dollar_sum = 0.0
+    dollar_count = 0
+    range_sum = 0.0
+    range_count = 0
+    for i in range(start, n):
+        if not np.isnan(volume[i]):
+            volume_sum += volume[i]
+            volume_count += 1
+        if not np.isnan(dollar_volume[i]):
+            dollar_sum += dollar_volume[i]
+            dollar_count += 1
+        bar_range = (high[i] - low[i]) / close[i]
+        if not np.isnan(bar_range):
+            range_sum += bar_range
+            range_count += 1
+
+    avg_volume = volume_sum / volume_count if volume_count else np.nan
+    avg_dollar_volume = dollar_sum / dollar_count if dollar_count else np.nan
+    avg_range = range_sum / range_count if range_count else np.nan
+    estimated_spread = avg_range * 100 * 0.15
+    price = close[n - 1]
+    latest_natr = natr[n - 1]
+
+    flags = _screen_flags(price, avg_volume, avg_dollar_volume, latest_natr, estimated_spread, thresholds)
+    return flags, price, avg_volume, avg_dollar_volume, latest_natr, estimated_spread
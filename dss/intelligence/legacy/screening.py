@@ -12,54 +12,285 @@ Filter Criteria:
 - Exchange: NYSE, NASDAQ, AMEX only
 - Sector Exclusion: No OTC, ADR, SPAC shells
 """
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from enum import IntEnum
+from types import MappingProxyType
+from typing import Callable, List, Dict, Optional
+
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
 from loguru import logger
 
-from ..indicators import IndicatorCalculator
+from ..indicators import IndicatorCalculator, _contiguous
 from ...utils.config import config
+from . import _screening_kernels as kernels
+from ._screening_kernels import SCREEN_WINDOW, _screen_flags, _screen_kernel
+
+
+class ReasonCode(IntEnum):
+    """Outcome of a single filter (rendered to text by StockScreener.format_reasons)"""
+    INSUFFICIENT_DATA = 0
+    PRICE_OK = 1
+    PRICE_LOW = 2
+    PRICE_HIGH = 3
+    VOLUME_OK = 4
+    VOLUME_LOW = 5
+    LIQUIDITY_OK = 6
+    LIQUIDITY_LOW = 7
+    NATR_OK = 8
+    NATR_LOW = 9
+    NATR_HIGH = 10
+    NATR_MISSING = 11
+    SPREAD_OK = 12
+    SPREAD_WIDE = 13
+    MARKET_CAP_OK = 14
+    MARKET_CAP_LOW = 15
+    MARKET_CAP_MISSING = 16
+    EXCHANGE_OK = 17
+    EXCHANGE_INVALID = 18
+    EXCHANGE_MISSING = 19
+    TYPE_OK = 20
+    TYPE_EXCLUDED = 21
+    TYPE_UNKNOWN = 22
+    DETAILS_MISSING = 23
+
+
+# Reason text builders: (metrics, filters) -> str
+_REASON_FORMATTERS: Dict[ReasonCode, Callable[[Dict, Dict], str]] = {
+    ReasonCode.INSUFFICIENT_DATA: lambda m, f: "Insufficient data (need 20+ bars)",
+    ReasonCode.PRICE_OK: lambda m, f: f"OK Price: ${m['price']:.2f}",
+    ReasonCode.PRICE_LOW: lambda m, f: f"FAIL Price: ${m['price']:.2f} < ${f['min_price']:.2f} min (penny stock)",
+    ReasonCode.PRICE_HIGH: lambda m, f: f"FAIL Price: ${m['price']:.2f} > ${f['max_price']:.2f} max (too expensive)",
+    ReasonCode.VOLUME_OK: lambda m, f: f"OK Volume: {m['avg_volume']:,.0f} shares/day",
+    ReasonCode.VOLUME_LOW: lambda m, f: f"FAIL Volume: {m['avg_volume']:,.0f} < {f['min_avg_volume']:,.0f} min shares",
+    ReasonCode.LIQUIDITY_OK: lambda m, f: f"OK Liquidity: ${m['avg_dollar_volume']:,.0f}/day",
+    ReasonCode.LIQUIDITY_LOW: lambda m, f: f"FAIL Liquidity: ${m['avg_dollar_volume']:,.0f} < ${f['min_dollar_volume']:,.0f}/day",
+    ReasonCode.NATR_OK: lambda m, f: f"OK Volatility: NATR {m['natr']:.2f}%",
+    ReasonCode.NATR_LOW: lambda m, f: f"FAIL Volatility: NATR {m['natr']:.2f}% < {f['min_natr']:.2f}% min (dead stock)",
+    ReasonCode.NATR_HIGH: lambda m, f: f"FAIL Volatility: NATR {m['natr']:.2f}% > {f['max_natr']:.2f}% max (too risky)",
+    ReasonCode.NATR_MISSING: lambda m, f: "WARN Volatility: NATR not available",
+    ReasonCode.SPREAD_OK: lambda m, f: f"OK Spread: ~{m['estimated_spread']:.2f}%",
+    ReasonCode.SPREAD_WIDE: lambda m, f: f"WARN Spread: ~{m['estimated_spread']:.2f}% > {f['max_spread_percent']:.2f}% (may be wide)",
+    ReasonCode.MARKET_CAP_OK: lambda m, f: f"OK Market Cap: ${m['market_cap']/1e9:.2f}B",
+    ReasonCode.MARKET_CAP_LOW: lambda m, f: f"FAIL Market Cap: ${m['market_cap']/1e9:.2f}B < ${f['min_market_cap']/1e9:.2f}B min",
+    ReasonCode.MARKET_CAP_MISSING: lambda m, f: "WARN Market Cap: not available",
+    ReasonCode.EXCHANGE_OK: lambda m, f: f"OK Exchange: {m['exchange']}",
+    ReasonCode.EXCHANGE_INVALID: lambda m, f: f"FAIL Exchange: {m['exchange']} (not NYSE/NASDAQ/AMEX)",
+    ReasonCode.EXCHANGE_MISSING: lambda m, f: "WARN Exchange: not available",
+    ReasonCode.TYPE_OK: lambda m, f: f"OK Type: {m['type']}",
+    ReasonCode.TYPE_EXCLUDED: lambda m, f: f"FAIL Type: {m['type']} (excluded: ADR/SPAC/etc)",
+    ReasonCode.TYPE_UNKNOWN: lambda m, f: f"WARN Type: {m['type']} (unknown)",
+    ReasonCode.DETAILS_MISSING: lambda m, f: "INFO Ticker details not available (market cap, exchange filters skipped)",
+}
+
+
+# Codes that reject a symbol (fast_reject reports only the first one)
+_FAIL_CODES = frozenset({
+    ReasonCode.PRICE_LOW, ReasonCode.PRICE_HIGH, ReasonCode.VOLUME_LOW, ReasonCode.LIQUIDITY_LOW,
+    ReasonCode.NATR_LOW, ReasonCode.NATR_HIGH, ReasonCode.MARKET_CAP_LOW,
+    ReasonCode.EXCHANGE_INVALID, ReasonCode.TYPE_EXCLUDED,
+})
+
+# fast_reject's cheap filters: (name, code failing the ticker details check; None = price check)
+_PRESCREEN_FILTERS = (
+    ('price', None),
+    ('market_cap', ReasonCode.MARKET_CAP_LOW),
+    ('exchange', ReasonCode.EXCHANGE_INVALID),
+    ('type', ReasonCode.TYPE_EXCLUDED),
+)
+
+# Columns read by the screening kernel, in argument order
+_SCREEN_COLUMNS = ('close', 'high', 'low', 'volume', 'dollar_volume', 'natr')
+
+# Indicator columns read by the screening filters / the market regime check
+_SCREEN_INDICATORS = frozenset({'dollar_volume', 'natr'})
+_REGIME_INDICATORS = frozenset({'sma_200', 'adx'})
+
+# Frames kept by StockScreener._with_indicators (least recently used evicted first)
+INDICATOR_CACHE_SIZE = 256
+
+
+# Stored ticker details columns and dtypes (StockScreener.update_ticker_details)
+_DETAILS_COLUMNS = {'market_cap': 'float64', 'primary_exchange': 'category', 'type': 'category'}
+
+
+def _classify_categories(column: pd.Series, classify) -> tuple:
+    """
+    (values, codes) for a categorical column: classify runs once per
+    category and is broadcast through the integer category codes. Missing
+    values read as ''.
+    """
+    categories = [str(category) for category in column.cat.categories] + ['']
+    codes = column.cat.codes.to_numpy()  # -1 (missing) picks the trailing ''
+    values = np.array(categories, dtype=object)[codes]
+    return values, np.array([classify(category) for category in categories], dtype=np.int64)[codes]
+
+
+@lru_cache(maxsize=8)
+def _regime_from_values(close: float, sma_200: Optional[float], adx: Optional[float]) -> Dict:
+    """
+    Market regime dict from the benchmark's last close, SMA 200 and ADX
+    (None when not available yet).
+    
+    Cached: the same benchmark bar is checked on every screen until a new
+    bar arrives.
+    """
+    # Determine regime
+    if sma_200 is not None:
+        if close > sma_200:
+            regime = 'bull'
+            stricter = False
+        else:
+            regime = 'bear'
+            stricter = True  # Apply stricter criteria in bear market
+    else:
+        regime = 'unknown'
+        stricter = False
+    
+    # ADX-based trend strength
+    trend_strength = 'unknown'
+    if adx is not None:
+        if adx > 25:
+            trend_strength = 'strong'
+        elif adx > 20:
+            trend_strength = 'moderate'
+        else:
+            trend_strength = 'weak'
+    
+    return {
+        'regime': regime,
+        'stricter_criteria': stricter,
+        'benchmark_price': close,
+        'sma_200': sma_200,
+        'adx': adx,
+        'trend_strength': trend_strength
+    }
+
+
+class _RollingState:
+    """
+    Running 20-bar sums of volume, dollar volume and (high - low) / close for
+    StockScreener.update_bar: each bar adds its values and subtracts the ones
+    leaving the window. NaN values are kept out of the sums (like pandas mean).
+    """
+    __slots__ = ('sums', 'counts', 'window', 'head', 'bars', 'price', 'natr')
+    
+    def __init__(self):
+        self.sums = [0.0, 0.0, 0.0]
+        self.counts = [0, 0, 0]
+        self.window = [(np.nan, np.nan, np.nan)] * SCREEN_WINDOW
+        self.head = 0
+        self.bars = 0
+        self.price = np.nan
+        self.natr = np.nan
+    
+    def push(self, close: float, high: float, low: float, volume: float,
+             dollar_volume: float, natr: float):
+        """Add one bar (O(1): the oldest bar's contribution is subtracted)"""
+        values = (volume, dollar_volume, (high - low) / close)
+        evicted = self.window[self.head]
+        for i in range(3):
+            if evicted[i] == evicted[i]:
+                self.sums[i] -= evicted[i]
+                self.counts[i] -= 1
+            if values[i] == values[i]:
+                self.sums[i] += values[i]
+                self.counts[i] += 1
+        self.window[self.head] = values
+        self.head = (self.head + 1) % SCREEN_WINDOW
+        self.bars += 1
+        self.price = close
+        self.natr = natr
+    
+    def metrics(self) -> tuple:
+        """(price, avg_volume, avg_dollar_volume, natr, estimated_spread), as the kernel computes them"""
+        volume, dollar_volume, bar_range = (
+            total / count if count else np.nan for total, count in zip(self.sums, self.counts)
+        )
+        return self.price, volume, dollar_volume, self.natr, bar_range * 100 * 0.15
 
 
 class StockScreener:
     """Apply quality filters to screen stocks per specification"""
     
-    # Valid exchanges per spec
-    VALID_EXCHANGES = {'XNYS', 'XNAS', 'XASE', 'NYSE', 'NASDAQ', 'AMEX', 'NYS', 'NAS', 'ASE'}
+    # Valid exchanges per spec (exact codes, uppercase)
+    VALID_EXCHANGES = frozenset({'XNYS', 'XNAS', 'XASE', 'NYSE', 'NASDAQ', 'AMEX', 'NYS', 'NAS', 'ASE'})
+    # Long exchange names ("NASDAQ GLOBAL SELECT", "NYSE AMERICAN", ...)
+    VALID_EXCHANGE_PREFIXES = ('NYSE ', 'NASDAQ ', 'AMEX ')
     
     # Valid security types (exclude OTC, ADR, SPAC, etc.)
     VALID_TYPES = {'CS', 'ETF'}  # Common Stock, ETF
     EXCLUDED_TYPES = {'ADRC', 'ADR', 'WARRANT', 'RIGHT', 'UNIT', 'SPAC', 'SP'}
+    # Type -> reason code in one lookup (upper and lower case; other casings are uppercased)
+    _TYPE_STATUS = {
+        **dict.fromkeys(VALID_TYPES, ReasonCode.TYPE_OK),
+        **dict.fromkeys(map(str.lower, VALID_TYPES), ReasonCode.TYPE_OK),
+        **dict.fromkeys(EXCLUDED_TYPES, ReasonCode.TYPE_EXCLUDED),
+        **dict.fromkeys(map(str.lower, EXCLUDED_TYPES), ReasonCode.TYPE_EXCLUDED),
+    }
+    
+    # fast_reject calls between reorderings of the cheap filters by reject count
+    FILTER_REORDER_INTERVAL = 1000
+    
+    # Filter defaults, overridden by the config 'filters' block
+    _DEFAULT_FILTERS = MappingProxyType({
+        # Price filters
+        'min_price': 5.0,
+        'max_price': 500.0,
+        
+        # Volume filter
+        'min_avg_volume': 500000,
+        
+        # Market cap filter
+        'min_market_cap': 500000000,  # $500M
+        
+        # Volatility filters (NATR = ATR as % of price)
+        'min_natr': 1.5,  # Min 1.5%
+        'max_natr': 8.0,  # Max 8% (avoid crazy volatile)
+        
+        # Liquidity filters
+        'min_dollar_volume': 5000000,  # $5M/day
+        'max_spread_percent': 0.3,  # 0.3%
+        
+        # Benchmark for market regime
+        'benchmark_symbol': "SPY"
+    })
     
     def __init__(self):
         """Initialize with configurable filter parameters"""
-        self.filters = {
-            # Price filters
-            'min_price': config.get("filters.min_price", 5.0),
-            'max_price': config.get("filters.max_price", 500.0),
-            
-            # Volume filter
-            'min_avg_volume': config.get("filters.min_avg_volume", 500000),
-            
-            # Market cap filter
-            'min_market_cap': config.get("filters.min_market_cap", 500000000),  # $500M
-            
-            # Volatility filters (NATR = ATR as % of price)
-            'min_natr': config.get("filters.min_natr", 1.5),  # Min 1.5%
-            'max_natr': config.get("filters.max_natr", 8.0),  # Max 8% (avoid crazy volatile)
-            
-            # Liquidity filters
-            'min_dollar_volume': config.get("filters.min_dollar_volume", 5000000),  # $5M/day
-            'max_spread_percent': config.get("filters.max_spread_percent", 0.3),  # 0.3%
-            
-            # Benchmark for market regime
-            'benchmark_symbol': config.get("filters.benchmark_symbol", "SPY")
-        }
+        # One config lookup; unset (None) entries keep the default
+        overrides = config.get("filters") or {}
+        self.filters = dict(self._DEFAULT_FILTERS)
+        self.filters.update((key, value) for key, value in overrides.items() if value is not None)
+        
+        # Kernel thresholds, packed once (rebuild with _pack_thresholds after editing filters)
+        self._pack_thresholds()
         
-        # Cache for ticker details (market cap, exchange, type)
-        self._ticker_details_cache: Dict[str, Optional[Dict]] = {}
+        # Ticker details for batch screening (market cap, exchange, type), see update_ticker_details
+        self._ticker_details_df = pd.DataFrame(
+            {name: pd.Series(dtype=dtype) for name, dtype in _DETAILS_COLUMNS.items()}
+        )
+        
+        # ensure_columns results by (symbol, bars, first/last index, first/last close, columns)
+        self._indicator_cache: OrderedDict = OrderedDict()
+        
+        # Streaming 20-bar state per symbol (update_bar)
+        self._rolling_states: Dict[str, _RollingState] = {}
+        
+        # fast_reject filters (_PRESCREEN_FILTERS), most rejecting first
+        self._prescreen_filters = tuple(
+            (name, self._check_price if code is None else partial(self._check_details, code))
+            for name, code in _PRESCREEN_FILTERS
+        )
+        self._reject_counts = np.zeros(len(_PRESCREEN_FILTERS), dtype=np.int64)
+        self._filter_order = np.arange(len(_PRESCREEN_FILTERS))
+        self._ordered_filters = tuple(enumerate(check for _, check in self._prescreen_filters))
+        self._prescreen_calls = 0
     
     def apply_filters(self, df: pd.DataFrame, symbol: str, 
-                      ticker_details: Optional[Dict] = None) -> Dict:
+                      ticker_details: Optional[Dict] = None, fast_reject: bool = False) -> Dict:
         """
         Apply all quality filters to a stock.
         
@@ -67,175 +298,505 @@ class StockScreener:
             df: OHLCV DataFrame with indicators
             symbol: Stock symbol
             ticker_details: Optional dict from Polygon Reference API with market_cap, exchange, type
+            fast_reject: Stop at the first failing filter, cheapest first (price
+                and ticker details before any indicator work); a rejected
+                symbol then carries only that reason code and the metrics
+                computed so far
         
         Returns:
             Dict with:
             - 'passed': bool - whether stock passes all filters
-            - 'reasons': list of filter results
+            - 'reason_codes': list of ReasonCode (one per filter, see format_reasons)
             - 'metrics': dict of computed values
         """
         if df.empty or len(df) < 20:
-            return {
-                'passed': False,
-                'reasons': ['Insufficient data (need 20+ bars)'],
-                'metrics': {}
-            }
+            return self._insufficient_data()
         
-        # Calculate indicators if not present
-        if 'dollar_volume' not in df.columns or 'natr' not in df.columns:
-            df = IndicatorCalculator.calculate_all(df)
+        details = self._details_result(ticker_details)
+        if fast_reject:
+            rejected = self._prescreen(float(df['close'].to_numpy()[-1]), details)
+            if rejected is not None:
+                return rejected
+        
+        df = self._with_indicators(df, symbol, _SCREEN_INDICATORS)
+        result = self._evaluate(self._screen(df), details)
+        return self._first_rejection(result) if fast_reject else result
+    
+    def _prescreen(self, price: float, details: Optional[tuple]) -> Optional[Dict]:
+        """
+        fast_reject's cheap stage: price (last close, no indicators needed) and
+        the ticker details outcome. Returns the rejection, or None to go on.
+        
+        The checks run most rejecting first: each rejection is counted per
+        filter and every FILTER_REORDER_INTERVAL calls the order follows the
+        counts (ties keep the _PRESCREEN_FILTERS order). A symbol failing
+        several of them reports the first in the current order.
+        """
+        self._prescreen_calls += 1
+        if self._prescreen_calls % self.FILTER_REORDER_INTERVAL == 0:
+            self._reorder_filters()
+        
+        for index, check in self._ordered_filters:
+            code = check(price, details)
+            if code is not None:
+                self._reject_counts[index] += 1
+                metrics = {'price': price}
+                if code not in (ReasonCode.PRICE_LOW, ReasonCode.PRICE_HIGH):
+                    metrics.update(details[2])
+                return self._rejected(code, metrics)
+        return None
+    
+    def _reorder_filters(self):
+        """Sort the fast_reject filters by reject count, highest first"""
+        self._filter_order = np.argsort(-self._reject_counts, kind='stable')
+        self._ordered_filters = tuple(
+            (int(index), self._prescreen_filters[index][1]) for index in self._filter_order
+        )
+    
+    def _check_price(self, price: float, details: Optional[tuple]) -> Optional[ReasonCode]:
+        """Price filter code if it fails, else None"""
+        if price < self.filters['min_price']:
+            return ReasonCode.PRICE_LOW
+        if price > self.filters['max_price']:
+            return ReasonCode.PRICE_HIGH
+        return None
+    
+    @staticmethod
+    def _check_details(code: ReasonCode, price: float, details: Optional[tuple]) -> Optional[ReasonCode]:
+        """code if the ticker details outcome holds it, else None"""
+        if details is not None and code in details[1]:
+            return code
+        return None
+    
+    @staticmethod
+    def _rejected(code: ReasonCode, metrics: Dict) -> Dict:
+        """fast_reject result: the failing filter's code only"""
+        return {
+            'passed': False,
+            'reason_codes': [code],
+            'metrics': metrics
+        }
+    
+    @classmethod
+    def _first_rejection(cls, result: Dict) -> Dict:
+        """Cut a failed full result down to its first failing code (fast_reject)"""
+        if result['passed']:
+            return result
+        code = next(code for code in result['reason_codes'] if code in _FAIL_CODES)
+        return cls._rejected(code, result['metrics'])
+    
+    def _with_indicators(self, df: pd.DataFrame, symbol: str, required: frozenset) -> pd.DataFrame:
+        """
+        df with the required indicator columns, computing only the missing
+        ones (IndicatorCalculator.ensure_columns) unless the same bars were
+        seen before.
+        """
+        if required.issubset(df.columns):
+            return df
+        
+        key = self._indicator_key(df, symbol, required)
+        cached = self._cached_indicators(key)
+        if cached is None:
+            cached = IndicatorCalculator.ensure_columns(df, required)
+            self._store_indicators(key, cached)
+        return cached
+    
+    @staticmethod
+    def _indicator_key(df: pd.DataFrame, symbol: str, required: frozenset) -> tuple:
+        """Indicator cache key: symbol, bar count, first/last index label and close, columns"""
+        close = df['close'].to_numpy()
+        first, last = float(close[0]), float(close[-1])
+        # NaN never compares equal, so it would miss on every lookup: key it as None
+        return (symbol, len(df), df.index[0], df.index[-1],
+                first if first == first else None, last if last == last else None, required)
+    
+    def _cached_indicators(self, key: tuple) -> Optional[pd.DataFrame]:
+        """Cached indicator frame for key (marked most recently used), or None"""
+        cached = self._indicator_cache.get(key)
+        if cached is not None:
+            self._indicator_cache.move_to_end(key)
+        return cached
+    
+    def _store_indicators(self, key: tuple, df: pd.DataFrame):
+        """Add an indicator frame to the cache, evicting the least recently used"""
+        self._indicator_cache[key] = df
+        if len(self._indicator_cache) > INDICATOR_CACHE_SIZE:
+            self._indicator_cache.popitem(last=False)
+    
+    def _screen(self, df: pd.DataFrame) -> tuple:
+        """
+        Run the numeric filters on the last 20 bars of df (indicators present).
+        
+        Returns the _screen_kernel tuple: (flags, price, avg_volume,
+        avg_dollar_volume, natr, estimated_spread).
+        """
+        return _screen_kernel(*self._tail_arrays(df), self._thresholds)
+    
+    @staticmethod
+    def _tail_arrays(df: pd.DataFrame) -> List[np.ndarray]:
+        """
+        Last 20 values of each _SCREEN_COLUMNS column as float64 arrays.
+        
+        The column arrays are sliced before any conversion or arithmetic, so
+        only 20 values per column are touched whatever the history length.
+        """
+        return [_contiguous(df[name].to_numpy()[-SCREEN_WINDOW:]) for name in _SCREEN_COLUMNS]
+    
+    @staticmethod
+    def _map(func, items, max_workers: Optional[int]) -> list:
+        """list(map(func, items)), on a thread pool unless max_workers=1 or there is one item"""
+        items = list(items)
+        if max_workers == 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(func, items))
+    
+    def _pack_thresholds(self):
+        """Pack the kernel's filter values into one float64 array (THRESHOLD_KEYS order)"""
+        self._thresholds = np.array([self.filters[key] for key in kernels.THRESHOLD_KEYS], dtype=np.float64)
+    
+    def update_bar(self, symbol: str, bar: Dict, ticker_details: Optional[Dict] = None,
+                   history: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Screen a symbol incrementally as new bars arrive.
+        
+        Keeps running 20-bar sums per symbol, so each call is O(1) instead of
+        re-reading the DataFrame; the result matches apply_filters on the full
+        history up to and including bar.
+        
+        Args:
+            symbol: Stock symbol
+            bar: New bar with close/high/low/volume and natr (e.g. the raw bar
+                merged with IncrementalIndicatorCalculator.update); dollar_volume
+                defaults to close * volume, a missing natr counts as not available
+            ticker_details: Optional ticker details (as in apply_filters)
+            history: Bars before this one (with or without indicators); starts
+                (or restarts) the symbol's state. Needed on the first call unless
+                the symbol starts streaming from scratch.
+        
+        Returns:
+            Filter results, as apply_filters
+        """
+        state = self._rolling_states.get(symbol)
+        if history is not None or state is None:
+            state = self._rolling_states[symbol] = _RollingState()
+            if history is not None and not history.empty:
+                history = self._with_indicators(history, symbol, _SCREEN_INDICATORS)
+                for row in zip(*self._tail_arrays(history)):
+                    state.push(*row)
+                state.bars = len(history)
+        
+        close = float(bar['close'])
+        volume = float(bar['volume'])
+        dollar_volume = bar.get('dollar_volume')
+        natr = bar.get('natr')
+        state.push(
+            close, float(bar['high']), float(bar['low']), volume,
+            close * volume if dollar_volume is None else float(dollar_volume),
+            np.nan if natr is None else float(natr)
+        )
+        
+        if state.bars < SCREEN_WINDOW:
+            return self._insufficient_data()
+        metrics = state.metrics()
+        return self._evaluate((_screen_flags(*metrics, self._thresholds), *metrics), self._details_result(ticker_details))
+    
+    @staticmethod
+    def _insufficient_data() -> Dict:
+        """Result for a symbol with fewer than 20 bars"""
+        return {
+            'passed': False,
+            'reason_codes': [ReasonCode.INSUFFICIENT_DATA],
+            'metrics': {}
+        }
+    
+    def _evaluate(self, screened: tuple, details: Optional[tuple]) -> Dict:
+        """
+        Filter result from the kernel output (flags and metrics, see _screen)
+        and the ticker details outcome (see _details_result; None if no details).
+        """
+        passed, codes, metrics = self._screen_codes(screened)
+        if details is None:
+            codes.append(ReasonCode.DETAILS_MISSING)
+        else:
+            details_passed, details_codes, details_metrics = details
+            passed = passed and details_passed
+            codes.extend(details_codes)
+            metrics.update(details_metrics)
+        
+        return {
+            'passed': passed,
+            'reason_codes': codes,
+            'metrics': metrics
+        }
+    
+    def _details_result(self, ticker_details: Optional[Dict]) -> Optional[tuple]:
+        """
+        Check one symbol's ticker details against the filter thresholds.
+        
+        Returns (passed, codes, metrics), or None without details.
+        """
+        if not ticker_details:
+            return None
         
-        latest = df.iloc[-1]
-        reasons = []
         passed = True
+        codes = []
         metrics = {}
         
-        # ==================== PRICE FILTERS ====================
+        # ==================== TICKER DETAILS FILTERS ====================
         
-        # Filter 1: Minimum Price > $5
-        current_price = latest['close']
-        metrics['price'] = current_price
+        # Filter 6: Market Cap > $500M
+        market_cap = ticker_details.get('market_cap')
+        if market_cap is not None and market_cap == market_cap:
+            metrics['market_cap'] = market_cap
+            
+            if market_cap < self.filters['min_market_cap']:
+                passed = False
+                codes.append(ReasonCode.MARKET_CAP_LOW)
+            else:
+                codes.append(ReasonCode.MARKET_CAP_OK)
+        else:
+            codes.append(ReasonCode.MARKET_CAP_MISSING)
+        
+        # Filter 7: Exchange (NYSE, NASDAQ, AMEX only)
+        exchange = ticker_details.get('primary_exchange') or ''
+        metrics['exchange'] = exchange
         
-        if current_price < self.filters['min_price']:
+        exchange_code = self._exchange_code(exchange)
+        if exchange_code == ReasonCode.EXCHANGE_INVALID:
             passed = False
-            reasons.append(f"FAIL Price: ${current_price:.2f} < ${self.filters['min_price']:.2f} min (penny stock)")
-        elif current_price > self.filters['max_price']:
+        codes.append(exchange_code)
+        
+        # Filter 8: Security Type (exclude OTC, ADR, SPAC, etc.)
+        sec_type = ticker_details.get('type') or ''
+        metrics['type'] = sec_type
+        
+        type_code = self._type_code(sec_type)
+        if type_code == ReasonCode.TYPE_EXCLUDED:
             passed = False
-            reasons.append(f"FAIL Price: ${current_price:.2f} > ${self.filters['max_price']:.2f} max (too expensive)")
+        if type_code >= 0:
+            codes.append(type_code)
+        
+        return passed, codes, metrics
+    
+    def _exchange_code(self, exchange: str) -> ReasonCode:
+        """Exchange filter outcome (only fail if we have exchange info)"""
+        # Normalize exchange names
+        exchange_upper = exchange.upper()
+        if not exchange_upper:
+            return ReasonCode.EXCHANGE_MISSING
+        if exchange_upper in self.VALID_EXCHANGES or exchange_upper.startswith(self.VALID_EXCHANGE_PREFIXES):
+            return ReasonCode.EXCHANGE_OK
+        return ReasonCode.EXCHANGE_INVALID
+    
+    def _type_code(self, sec_type: str) -> int:
+        """Security type filter outcome, -1 without a type (no reason code)"""
+        if not sec_type:
+            return -1
+        # Unknown type - allow but warn
+        return self._TYPE_STATUS.get(sec_type) or self._TYPE_STATUS.get(sec_type.upper(), ReasonCode.TYPE_UNKNOWN)
+    
+    @staticmethod
+    def _screen_codes(screened: tuple) -> tuple:
+        """Reason codes for the kernel flags: (passed, codes, metrics)"""
+        flags, price, avg_volume, avg_dollar_volume, natr, estimated_spread = screened
+        passed = not flags & kernels.FAIL_MASK
+        codes = []
+        metrics = {
+            'price': price,
+            'avg_volume': avg_volume,
+            'avg_dollar_volume': avg_dollar_volume,
+            'natr': None if flags & kernels.NATR_MISSING else natr,
+            'estimated_spread': estimated_spread
+        }
+        
+        # ==================== PRICE FILTERS ====================
+        
+        # Filter 1: Price between $5 and $500
+        if flags & kernels.PRICE_LOW:
+            codes.append(ReasonCode.PRICE_LOW)
+        elif flags & kernels.PRICE_HIGH:
+            codes.append(ReasonCode.PRICE_HIGH)
         else:
-            reasons.append(f"OK Price: ${current_price:.2f}")
+            codes.append(ReasonCode.PRICE_OK)
         
         # ==================== VOLUME FILTERS ====================
         
         # Filter 2: Average Daily Volume > 500K shares
-        avg_volume = df['volume'].tail(20).mean()
-        metrics['avg_volume'] = avg_volume
-        
-        if avg_volume < self.filters['min_avg_volume']:
-            passed = False
-            reasons.append(f"FAIL Volume: {avg_volume:,.0f} < {self.filters['min_avg_volume']:,.0f} min shares")
-        else:
-            reasons.append(f"OK Volume: {avg_volume:,.0f} shares/day")
+        codes.append(ReasonCode.VOLUME_LOW if flags & kernels.VOLUME_LOW else ReasonCode.VOLUME_OK)
         
         # Filter 3: Dollar Volume > $5M/day
-        avg_dollar_volume = df['dollar_volume'].tail(20).mean()
-        metrics['avg_dollar_volume'] = avg_dollar_volume
-        
-        if avg_dollar_volume < self.filters['min_dollar_volume']:
-            passed = False
-            reasons.append(f"FAIL Liquidity: ${avg_dollar_volume:,.0f} < ${self.filters['min_dollar_volume']:,.0f}/day")
-        else:
-            reasons.append(f"OK Liquidity: ${avg_dollar_volume:,.0f}/day")
+        codes.append(ReasonCode.LIQUIDITY_LOW if flags & kernels.LIQUIDITY_LOW else ReasonCode.LIQUIDITY_OK)
         
         # ==================== VOLATILITY FILTERS ====================
         
         # Filter 4: ATR (NATR) between 1.5% and 8%
-        if pd.notna(latest.get('natr')):
-            natr = latest['natr']
-            metrics['natr'] = natr
-            
-            if natr < self.filters['min_natr']:
-                passed = False
-                reasons.append(f"FAIL Volatility: NATR {natr:.2f}% < {self.filters['min_natr']:.2f}% min (dead stock)")
-            elif natr > self.filters['max_natr']:
-                passed = False
-                reasons.append(f"FAIL Volatility: NATR {natr:.2f}% > {self.filters['max_natr']:.2f}% max (too risky)")
-            else:
-                reasons.append(f"OK Volatility: NATR {natr:.2f}%")
+        if flags & kernels.NATR_MISSING:
+            codes.append(ReasonCode.NATR_MISSING)
+        elif flags & kernels.NATR_LOW:
+            codes.append(ReasonCode.NATR_LOW)
+        elif flags & kernels.NATR_HIGH:
+            codes.append(ReasonCode.NATR_HIGH)
         else:
-            reasons.append("WARN Volatility: NATR not available")
-            metrics['natr'] = None
+            codes.append(ReasonCode.NATR_OK)
         
         # ==================== SPREAD ESTIMATE ====================
         
-        # Filter 5: Spread estimate < 0.3% (using high-low range as proxy)
-        # Estimated spread = (High - Low) / Close as a rough proxy
-        avg_range_pct = ((df['high'] - df['low']) / df['close']).tail(20).mean() * 100
-        # Spread is typically ~10-20% of the daily range for liquid stocks
-        estimated_spread = avg_range_pct * 0.15  # Conservative estimate
-        metrics['estimated_spread'] = estimated_spread
+        # Filter 5: Spread estimate < 0.3% (15% of the average high-low range)
+        # Don't fail on spread alone, just warn
+        codes.append(ReasonCode.SPREAD_WIDE if flags & kernels.SPREAD_WIDE else ReasonCode.SPREAD_OK)
         
-        if estimated_spread > self.filters['max_spread_percent']:
-            # Don't fail on spread alone, just warn
-            reasons.append(f"WARN Spread: ~{estimated_spread:.2f}% > {self.filters['max_spread_percent']:.2f}% (may be wide)")
-        else:
-            reasons.append(f"OK Spread: ~{estimated_spread:.2f}%")
-        
-        # ==================== TICKER DETAILS FILTERS (if available) ====================
-        
-        if ticker_details:
-            # Filter 6: Market Cap > $500M
-            market_cap = ticker_details.get('market_cap')
-            if market_cap is not None:
-                metrics['market_cap'] = market_cap
-                
-                if market_cap < self.filters['min_market_cap']:
-                    passed = False
-                    reasons.append(f"FAIL Market Cap: ${market_cap/1e9:.2f}B < ${self.filters['min_market_cap']/1e9:.2f}B min")
-                else:
-                    reasons.append(f"OK Market Cap: ${market_cap/1e9:.2f}B")
-            else:
-                reasons.append("WARN Market Cap: not available")
-            
-            # Filter 7: Exchange (NYSE, NASDAQ, AMEX only)
-            exchange = ticker_details.get('primary_exchange', '')
-            metrics['exchange'] = exchange
-            
-            # Normalize exchange names
-            exchange_upper = exchange.upper() if exchange else ''
-            if not any(valid in exchange_upper for valid in self.VALID_EXCHANGES):
-                if exchange:  # Only fail if we have exchange info
-                    passed = False
-                    reasons.append(f"FAIL Exchange: {exchange} (not NYSE/NASDAQ/AMEX)")
-                else:
-                    reasons.append("WARN Exchange: not available")
-            else:
-                reasons.append(f"OK Exchange: {exchange}")
-            
-            # Filter 8: Security Type (exclude OTC, ADR, SPAC, etc.)
-            sec_type = ticker_details.get('type', '')
-            metrics['type'] = sec_type
-            
-            if sec_type:
-                if sec_type.upper() in self.EXCLUDED_TYPES:
-                    passed = False
-                    reasons.append(f"FAIL Type: {sec_type} (excluded: ADR/SPAC/etc)")
-                elif sec_type.upper() in self.VALID_TYPES:
-                    reasons.append(f"OK Type: {sec_type}")
-                else:
-                    # Unknown type - allow but warn
-                    reasons.append(f"WARN Type: {sec_type} (unknown)")
-        else:
-            reasons.append("INFO Ticker details not available (market cap, exchange filters skipped)")
+        return passed, codes, metrics
+    
+    def _details_codes(self, ticker_details_dict: Optional[Dict[str, Dict]], symbols: List[str]) -> List:
+        """
+        Ticker details filters for many symbols at once.
+        
+        ticker_details_dict is merged into the stored details
+        (update_ticker_details), which are then read for all symbols as
+        columns: the market cap test is one float64 comparison, and exchange
+        and type are classified once per category and broadcast through the
+        integer category codes. The result holds (passed, codes, metrics) per
+        symbol, or None without details.
+        """
+        if ticker_details_dict:
+            self.update_ticker_details(ticker_details_dict)
+        stored = self._ticker_details_df
+        frame = stored.reindex(symbols)
+        known = pd.Index(symbols).isin(stored.index)
+        
+        # Filter 6: Market Cap > $500M
+        market_cap = frame['market_cap'].to_numpy(dtype=np.float64)
+        cap_missing = np.isnan(market_cap)
+        cap_codes = np.select(
+            [cap_missing, market_cap < self.filters['min_market_cap']],
+            [ReasonCode.MARKET_CAP_MISSING, ReasonCode.MARKET_CAP_LOW],
+            ReasonCode.MARKET_CAP_OK
+        )
         
-        return {
-            'passed': passed,
-            'reasons': reasons,
-            'metrics': metrics
-        }
+        # Filter 7: Exchange / Filter 8: Security Type
+        exchanges, exchange_codes = _classify_categories(frame['primary_exchange'], self._exchange_code)
+        types, type_codes = _classify_categories(frame['type'], self._type_code)
+        
+        failed = (
+            (cap_codes == ReasonCode.MARKET_CAP_LOW)
+            | (exchange_codes == ReasonCode.EXCHANGE_INVALID)
+            | (type_codes == ReasonCode.TYPE_EXCLUDED)
+        )
+        
+        details = []
+        for i in range(len(symbols)):
+            if not known[i]:
+                details.append(None)
+                continue
+            codes = [ReasonCode(cap_codes[i]), ReasonCode(exchange_codes[i])]
+            metrics = {} if cap_missing[i] else {'market_cap': market_cap[i]}
+            metrics['exchange'] = exchanges[i]
+            metrics['type'] = types[i]
+            if type_codes[i] >= 0:
+                codes.append(ReasonCode(type_codes[i]))
+            details.append((not failed[i], codes, metrics))
+        return details
+    
+    def update_ticker_details(self, ticker_details_dict: Dict[str, Dict]):
+        """
+        Store ticker details (market_cap, primary_exchange, type) for later
+        batch screening, replacing any previous entry of the same symbols.
+        
+        Kept as one frame indexed by symbol: market_cap float64, exchange and
+        type categorical.
+        """
+        rows = {symbol: details for symbol, details in ticker_details_dict.items() if details}
+        if not rows:
+            return
+        
+        new = pd.DataFrame.from_dict(rows, orient='index').reindex(columns=list(_DETAILS_COLUMNS))
+        new['market_cap'] = pd.to_numeric(new['market_cap'], errors='coerce')
+        stored = self._ticker_details_df
+        if len(stored):
+            new = pd.concat([stored[~stored.index.isin(new.index)], new])
+        self._ticker_details_df = new.astype(_DETAILS_COLUMNS)
+    
+    def format_reasons(self, result: Dict) -> List[str]:
+        """
+        Render the reason codes of a filter result as human-readable text.
+        
+        Text is only built here, on demand, so screening itself never
+        formats strings.
+        """
+        metrics = result.get('metrics', {})
+        return [_REASON_FORMATTERS[code](metrics, self.filters) for code in result.get('reason_codes', ())]
     
     def apply_filters_batch(self, data_dict: Dict[str, pd.DataFrame],
-                            ticker_details_dict: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+                            ticker_details_dict: Optional[Dict[str, Dict]] = None,
+                            max_workers: Optional[int] = None,
+                            fast_reject: bool = True) -> Dict[str, Dict]:
         """
         Apply filters to multiple symbols at once.
         
+        Missing indicator columns are computed with IndicatorCalculator.ensure_columns
+        and each symbol's last 20 bars go straight to the screening kernel as
+        raw arrays; both run on a thread pool (the kernels release the GIL),
+        max_workers=1 runs serially. The ticker details are checked in one
+        vectorized pass. Frames that needed indicators are replaced in
+        data_dict by the extended ones, so screening the same dict again
+        skips the indicator work.
+        
         Args:
             data_dict: Dict mapping symbol -> OHLCV DataFrame
-            ticker_details_dict: Optional dict mapping symbol -> ticker details
+            ticker_details_dict: Optional dict mapping symbol -> ticker details,
+                stored with update_ticker_details (symbols not in it use the
+                details stored by earlier calls)
+            max_workers: Thread pool size (None = ThreadPoolExecutor default)
+            fast_reject: As in apply_filters, on by default here: symbols that
+                fail on price or ticker details skip the indicator work, and
+                rejected symbols carry only their first failing reason code.
+                Pass False for every filter's reason.
         
         Returns:
             Dict mapping symbol -> filter results
         """
+        symbols = list(data_dict)
+        details = dict(zip(symbols, self._details_codes(ticker_details_dict, symbols)))
+        
         results = {}
+        ready = []
+        for symbol in symbols:
+            df = data_dict[symbol]
+            if len(df) < 20:
+                results[symbol] = self._insufficient_data()
+                continue
+            if fast_reject:
+                rejected = self._prescreen(float(df['close'].to_numpy()[-1]), details[symbol])
+                if rejected is not None:
+                    results[symbol] = rejected
+                    continue
+            ready.append(symbol)
+        
+        # Indicators: cache hits first, the missing columns for the rest on the pool
+        missing = {}
+        for symbol in ready:
+            df = data_dict[symbol]
+            if _SCREEN_INDICATORS.issubset(df.columns):
+                continue
+            key = self._indicator_key(df, symbol, _SCREEN_INDICATORS)
+            cached = self._cached_indicators(key)
+            if cached is None:
+                missing[key] = df
+            else:
+                data_dict[symbol] = cached
+        add_columns = partial(IndicatorCalculator.ensure_columns, columns=_SCREEN_INDICATORS)
+        for key, df in zip(missing, self._map(add_columns, missing.values(), max_workers)):
+            self._store_indicators(key, df)
+            data_dict[key[0]] = df
         
-        for symbol, df in data_dict.items():
-            ticker_details = None
-            if ticker_details_dict:
-                ticker_details = ticker_details_dict.get(symbol)
-            
-            results[symbol] = self.apply_filters(df, symbol, ticker_details)
+        screened = dict(zip(ready, self._map(self._screen, [data_dict[symbol] for symbol in ready], max_workers)))
+        
+        for symbol in ready:
+            result = self._evaluate(screened[symbol], details[symbol])
+            results[symbol] = self._first_rejection(result) if fast_reject else result
         
-        return results
+        return {symbol: results[symbol] for symbol in symbols}
     
     def validate_trade_economics(self, entry_price: float, quantity: int, 
                                  commission_cost: float, min_trade_value: float = None) -> Dict:
@@ -292,42 +853,39 @@ class StockScreener:
             }
         
         # Calculate indicators if not present
-        if 'sma_200' not in benchmark_df.columns:
-            benchmark_df = IndicatorCalculator.calculate_all(benchmark_df)
-        
-        latest = benchmark_df.iloc[-1]
-        sma_200 = latest.get('sma_200')
-        adx = latest.get('adx')
-        
-        # Determine regime
-        if pd.notna(sma_200):
-            if latest['close'] > sma_200:
-                regime = 'bull'
-                stricter = False
-            else:
-                regime = 'bear'
-                stricter = True  # Apply stricter criteria in bear market
-        else:
-            regime = 'unknown'
-            stricter = False
+        benchmark_df = self._with_indicators(benchmark_df, self.filters['benchmark_symbol'], _REGIME_INDICATORS)
+        
+        # Last-bar scalars straight from the column arrays (no row Series), NaN -> None
+        close = float(benchmark_df['close'].to_numpy()[-1])
+        sma_200 = float(benchmark_df['sma_200'].to_numpy()[-1])
+        adx = float(benchmark_df['adx'].to_numpy()[-1])
+        
+        # Copy: the cached dict is shared between calls
+        return dict(_regime_from_values(
+            close,
+            sma_200 if sma_200 == sma_200 else None,
+            adx if adx == adx else None
+        ))
+    
+    def get_filter_counts(self, filter_results: Dict[str, Dict]) -> Dict:
+        """
+        Pass/fail counts from filter results, in one pass without building
+        symbol lists (use get_filter_summary for those).
         
-        # ADX-based trend strength
-        trend_strength = 'unknown'
-        if pd.notna(adx):
-            if adx > 25:
-                trend_strength = 'strong'
-            elif adx > 20:
-                trend_strength = 'moderate'
-            else:
-                trend_strength = 'weak'
+        Returns:
+            Dict with total_screened, passed_count, failed_count, pass_rate
+        """
+        total = 0
+        passed = 0
+        for result in filter_results.values():
+            total += 1
+            passed += bool(result.get('passed', False))
         
         return {
-            'regime': regime,
-            'stricter_criteria': stricter,
-            'benchmark_price': float(latest['close']),
-            'sma_200': float(sma_200) if pd.notna(sma_200) else None,
-            'adx': float(adx) if pd.notna(adx) else None,
-            'trend_strength': trend_strength
+            'total_screened': total,
+            'passed_count': passed,
+            'failed_count': total - passed,
+            'pass_rate': passed / total * 100 if total else 0
         }
     
     def get_filter_summary(self, filter_results: Dict[str, Dict]) -> Dict:
@@ -335,22 +893,23 @@ class StockScreener:
         Generate summary statistics from filter results.
         
         Returns:
-            Dict with counts and lists of passed/failed symbols
+            Dict with the get_filter_counts counts, lists of passed/failed
+            symbols, plus how many symbols got each reason code
         """
         passed_symbols = []
         failed_symbols = []
+        reason_counts = Counter()
         
         for symbol, result in filter_results.items():
             if result.get('passed', False):
                 passed_symbols.append(symbol)
             else:
                 failed_symbols.append(symbol)
+            reason_counts.update(result.get('reason_codes', ()))
         
         return {
-            'total_screened': len(filter_results),
-            'passed_count': len(passed_symbols),
-            'failed_count': len(failed_symbols),
-            'pass_rate': len(passed_symbols) / len(filter_results) * 100 if filter_results else 0,
+            **self.get_filter_counts(filter_results),
             'passed_symbols': passed_symbols,
-            'failed_symbols': failed_symbols
+            'failed_symbols': failed_symbols,
+            'reason_counts': dict(reason_counts)
         }
@@ -90,7 +90,7 @@ class SignalGenerator:
                 # Step 1: Quality Filters
                 filter_result = self.screener.apply_filters(symbol_data, symbol)
                 if not filter_result['passed']:
-                    logger.info(f"{symbol}: Filtered out - {filter_result['reasons']}")
+                    logger.info(f"{symbol}: Filtered out - {self.screener.format_reasons(filter_result)}")
                     continue
                 
                 # Step 2: Calculate Indicators
@@ -26,6 +26,7 @@ from typing import List, Dict, Optional
 from loguru import logger
 
 from ..database.market_db import MarketDatabase
+from ..intelligence.indicators import IndicatorCalculator
 from ..utils.config import config
 
 
@@ -236,16 +237,9 @@ class MeanReversionRSI:
 
         Usa EMA (alpha=1/period) come nella definizione originale di Wilder,
         piu' reattiva della SMA-RSI. Cruciale per segnali mean reversion.
+        Stesso calcolo di IndicatorCalculator._rsi (lfilter se SciPy c'e').
         """
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0.0)
-        loss = -delta.where(delta < 0, 0.0)
-        avg_gain = gain.ewm(alpha=1.0 / period, min_periods=period, adjust=False).mean()
-        avg_loss = loss.ewm(alpha=1.0 / period, min_periods=period, adjust=False).mean()
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return IndicatorCalculator._rsi(prices, period)
 
     def close(self):
         """Cleanup - only close db if we own it"""
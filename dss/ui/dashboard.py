@@ -1306,26 +1306,24 @@ def render_trade_history_page():
     # Trade list
     st.subheader("📋 Closed Trades")
     
-    closed_trades = st.session_state.user_db.get_closed_trades(limit=50)
-    
-    if closed_trades:
-        trades_data = []
-        for trade in closed_trades:
-            pnl = (trade.get('exit_price', 0) - trade.get('entry_price', 0)) * trade.get('quantity', 0)
-            pnl_pct = ((trade.get('exit_price', 0) - trade.get('entry_price', 0)) / trade.get('entry_price', 1)) * 100
-            
-            trades_data.append({
-                'Symbol': trade.get('symbol'),
-                'Entry': _fmt_usd(trade.get('entry_price')),
-                'Exit': _fmt_usd(trade.get('exit_price')),
-                'Quantity': trade.get('quantity'),
-                'P&L': _fmt_usd(pnl),
-                'P&L %': f"{pnl_pct:.2f}%",
-                'Entry Date': trade.get('entry_date', 'N/A')[:10],
-                'Exit Date': trade.get('exit_date', 'N/A')[:10]
-            })
-        
-        df = pd.DataFrame(trades_data)
+    closed_trades = st.session_state.user_db.get_closed_trades_df(limit=50)
+    
+    if not closed_trades.empty:
+        exit_price = closed_trades['exit_price'].fillna(0)
+        entry_price = closed_trades['entry_price']
+        pnl = (exit_price - entry_price) * closed_trades['quantity']
+        pnl_pct = (exit_price - entry_price) / entry_price * 100
+        
+        df = pd.DataFrame({
+            'Symbol': closed_trades['symbol'],
+            'Entry': entry_price.map(_fmt_usd),
+            'Exit': exit_price.map(_fmt_usd),
+            'Quantity': closed_trades['quantity'],
+            'P&L': pnl.map(_fmt_usd),
+            'P&L %': pnl_pct.map(lambda v: f"{v:.2f}%"),
+            'Entry Date': closed_trades['entry_date'].dt.strftime('%Y-%m-%d').fillna('N/A'),
+            'Exit Date': closed_trades['exit_date'].dt.strftime('%Y-%m-%d').fillna('N/A')
+        })
         st.dataframe(df, width="stretch", hide_index=True)
     else:
         st.info("No closed trades yet.")
@@ -0,0 +1,27 @@
+"""Optional Numba JIT support
+
+Numba is an optional dependency: when it is not installed, ``njit`` becomes a
+no-op decorator and ``prange`` falls back to ``range``, so decorated kernels
+still run (slowly) as plain Python. Callers that have a vectorized pandas/numpy
+path should check ``NUMBA_AVAILABLE`` and only use the kernels when it is True.
+"""
+
+NUMBA_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op replacement for numba.njit (supports @njit and @njit(...))"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+__all__ = ['njit', 'prange', 'NUMBA_AVAILABLE']
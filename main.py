@@ -86,17 +86,11 @@ def main():
         from dss.ui.desktop_app import main as desktop_main
         desktop_main()
     elif args.mode == "update":
-        from dss.ingestion.update_data import DataUpdater
-        updater = DataUpdater()
-        try:
-            if args.force_full:
-                print("🔄 FORCING FULL DOWNLOAD - This will download 5 years of data for all symbols")
-                print("⏱️ Estimated time: ~30 seconds (Starter plan)")
-                asyncio.run(updater.update_all(force_full=True))
-            else:
-                asyncio.run(updater.update_all())
-        finally:
-            asyncio.run(updater.close())
+        from dss.ingestion.update_data import main as update_main, run_event_loop
+        if args.force_full:
+            print("🔄 FORCING FULL DOWNLOAD - This will download 5 years of data for all symbols")
+            print("⏱️ Estimated time: ~30 seconds (Starter plan)")
+        run_event_loop(update_main(force_full=args.force_full))
     elif args.mode == "signals":
         # Use PortfolioManager (unified system) instead of deprecated SignalGenerator
         # Per Code Review Issue #2: Unify signal systems
@@ -8,6 +8,7 @@ Tests:
 """
 import pytest
 import asyncio
+import pandas as pd
 import sys
 from pathlib import Path
 
@@ -30,6 +31,104 @@ class TestRetryConstants:
         assert MAX_RETRIES == 4
         assert BACKOFF_BASE == 2
 
+    @pytest.mark.skipif(not aiohttp_available, reason="aiohttp not installed")
+    @pytest.mark.asyncio
+    async def test_fetch_with_retry_takes_one_token_per_attempt(self, monkeypatch):
+        """Retries should not take a rate-limit token on top of the provider's own"""
+        from dss.ingestion import update_data
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        monkeypatch.setattr(update_data, "BACKOFF_BASE", 0)
+        provider = PolygonProvider(api_key="test")
+        bucket = provider._rate_limiter
+        calls = {"tokens": 0, "attempts": 0}
+        original_wait = bucket.wait_for_token
+
+        async def counting_wait(tokens=1):
+            calls["tokens"] += tokens
+            await original_wait(tokens)
+
+        async def fake_historical(symbol, start_date, end_date, timeframe="1D"):
+            await bucket.wait_for_token()
+            calls["attempts"] += 1
+            if calls["attempts"] == 1:
+                raise RuntimeError("transient")
+            return pd.DataFrame({"symbol": [symbol]})
+
+        bucket.wait_for_token = counting_wait
+        provider.get_historical_data = fake_historical
+        updater = update_data.DataUpdater.__new__(update_data.DataUpdater)
+        updater.provider = provider
+        updater.use_arrow = False
+
+        df = await updater._fetch_with_retry("AAPL", None, None)
+        assert not df.empty
+        assert calls["attempts"] == 2
+        assert calls["tokens"] == 2
+
+    @pytest.mark.skipif(not aiohttp_available, reason="aiohttp not installed")
+    @pytest.mark.asyncio
+    async def test_run_updates_inserts_per_batch(self):
+        """Fetched symbols should be written in one insert per batch, not per symbol"""
+        from dss.ingestion import update_data
+
+        inserted = []
+        fetched = []
+
+        class FakeDB:
+            def insert_data(self, df):
+                inserted.append(df)
+
+            def get_last_timestamps(self, symbols):
+                # FRESH already has the last session: it must never be fetched
+                return {"FRESH": update_data.DataUpdater._update_end_date()}
+
+        async def fake_fetch(symbol, force_full=False, end_date=None, last_timestamps=None):
+            fetched.append(symbol)
+            if symbol == "BAD":
+                return None
+            if symbol == "CUR":
+                return pd.DataFrame()
+            return pd.DataFrame({"symbol": [symbol], "close": [1.0]})
+
+        updater = update_data.DataUpdater.__new__(update_data.DataUpdater)
+        updater.db = FakeDB()
+        updater.use_arrow = False
+        updater._fetch_and_validate = fake_fetch
+
+        symbols = [f"S{i}" for i in range(12)] + ["BAD", "CUR", "FRESH"]
+        success = await updater._run_updates(symbols, False, concurrency=4)
+
+        assert success == 14
+        assert "FRESH" not in fetched
+        assert [len(df) for df in inserted] == [10, 2]
+        assert set(pd.concat(inserted)["symbol"]) == {f"S{i}" for i in range(12)}
+
+    @pytest.mark.skipif(not aiohttp_available, reason="aiohttp not installed")
+    @pytest.mark.asyncio
+    async def test_fetch_with_retry_skips_non_retriable(self):
+        """Only retriable errors should be retried; Retry-After replaces the backoff"""
+        from dss.ingestion import update_data
+        from dss.ingestion.polygon_provider import PolygonAPIError
+
+        class FatalError(Exception):
+            retriable = False
+
+        errors = [PolygonAPIError(503, "unavailable", retry_after=0), FatalError("bad request")]
+        attempts = []
+
+        class FakeProvider:
+            async def get_historical_data(self, symbol, start_date, end_date, timeframe="1D"):
+                attempts.append(symbol)
+                raise errors[len(attempts) - 1]
+
+        updater = update_data.DataUpdater.__new__(update_data.DataUpdater)
+        updater.provider = FakeProvider()
+        updater.use_arrow = False
+
+        assert await updater._fetch_with_retry("AAPL", None, None) is None
+        assert len(attempts) == 2
+
     def test_backoff_exponential(self):
         """Backoff should be exponential: 2, 4, 8, 16"""
         base = 2
@@ -84,66 +183,277 @@ class TestRateLimiter:
         # Should complete without error even after exhaustion
         await bucket.wait_for_token()
 
+    @pytest.mark.asyncio
+    async def test_concurrent_waiters_respect_rate(self):
+        """Concurrent waiters should be spaced by the refill rate, never overdrawing"""
+        import time
+        from dss.ingestion.rate_limiter import TokenBucket
+
+        bucket = TokenBucket(capacity=1, refill_rate=100.0)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.wait_for_token() for _ in range(5)))
+        # First token is free, the other four need ~10ms each
+        assert time.monotonic() - start >= 0.035
+        assert bucket.tokens >= -1e-9
+
+    @pytest.mark.asyncio
+    async def test_batch_acquire(self):
+        """A whole batch is paid in one call; more than capacity can never be granted"""
+        from dss.ingestion.rate_limiter import TokenBucket
+
+        bucket = TokenBucket(capacity=5, refill_rate=0.01)
+        await bucket.wait_for_token(5)
+        assert bucket.tokens < 1
+        with pytest.raises(ValueError):
+            await bucket.wait_for_token(6)
+
 
 class TestWatchlistLoading:
     """Test watchlist file loading"""
 
+    @staticmethod
+    def _updater(watchlist_path):
+        """DataUpdater without provider/db setup, reading watchlist_path"""
+        from dss.ingestion.update_data import DataUpdater
+        updater = DataUpdater.__new__(DataUpdater)
+        updater.watchlist_path = watchlist_path
+        return updater
+
     def test_load_watchlist_from_file(self, tmp_path):
         """Should load symbols from watchlist file, ignoring comments"""
         watchlist_file = tmp_path / "watchlist.txt"
         watchlist_file.write_text("# Header comment\nAAPL\nMSFT\nGOOGL\n\n# Section\nAMZN\n")
 
-        # Create a minimal DataUpdater mock
-        class MockUpdater:
-            def __init__(self):
-                self.watchlist_path = watchlist_file
-
-            def load_watchlist(self):
-                if not self.watchlist_path.exists():
-                    return []
-                symbols = []
-                with open(self.watchlist_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            symbols.append(line.upper())
-                return symbols
-
-        updater = MockUpdater()
-        symbols = updater.load_watchlist()
+        symbols = self._updater(watchlist_file).load_watchlist()
         assert symbols == ['AAPL', 'MSFT', 'GOOGL', 'AMZN']
 
     def test_load_missing_watchlist(self, tmp_path):
         """Missing watchlist file should return empty list"""
-        class MockUpdater:
-            def __init__(self):
-                self.watchlist_path = tmp_path / "nonexistent.txt"
-
-            def load_watchlist(self):
-                if not self.watchlist_path.exists():
-                    return []
-                return []
-
-        updater = MockUpdater()
-        assert updater.load_watchlist() == []
+        assert self._updater(tmp_path / "nonexistent.txt").load_watchlist() == []
 
     def test_load_watchlist_with_lowercase(self, tmp_path):
         """Symbols should be uppercased"""
         watchlist_file = tmp_path / "watchlist.txt"
         watchlist_file.write_text("aapl\nmsft\n")
 
-        class MockUpdater:
+        assert self._updater(watchlist_file).load_watchlist() == ['AAPL', 'MSFT']
+
+    def test_load_watchlist_crlf_and_padding(self, tmp_path):
+        """CRLF line endings and padded symbols should be stripped"""
+        watchlist_file = tmp_path / "watchlist.txt"
+        watchlist_file.write_bytes(b"aapl\r\n  msft  \r\n\r\n# note\r\n")
+
+        assert self._updater(watchlist_file).load_watchlist() == ['AAPL', 'MSFT']
+
+
+class TestDataProviderDefaults:
+    """Test default DataProvider behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_get_multiple_symbols_bounded_concurrency(self):
+        """Default get_multiple_symbols should cap in-flight requests"""
+        import pandas as pd
+        from dss.ingestion.base import DataProvider
+
+        class FakeProvider(DataProvider):
             def __init__(self):
-                self.watchlist_path = watchlist_file
-
-            def load_watchlist(self):
-                symbols = []
-                with open(self.watchlist_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            symbols.append(line.upper())
-                return symbols
-
-        updater = MockUpdater()
-        assert updater.load_watchlist() == ['AAPL', 'MSFT']
+                super().__init__()
+                self.max_concurrency = 2
+                self.in_flight = 0
+                self.peak = 0
+
+            async def get_historical_data(self, symbol, start_date, end_date, timeframe="1D"):
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+                await asyncio.sleep(0.01)
+                self.in_flight -= 1
+                if symbol == "BAD":
+                    raise RuntimeError("boom")
+                return pd.DataFrame({'symbol': [symbol]})
+
+            async def get_latest_bar(self, symbol):
+                return pd.DataFrame()
+
+        provider = FakeProvider()
+        results = await provider.get_multiple_symbols(["A", "B", "C", "BAD", "E"], None, None)
+        assert provider.peak == 2
+        assert list(results) == ["A", "B", "C", "BAD", "E"]
+        assert results["BAD"].empty
+        assert results["C"]['symbol'].iloc[0] == "C"
+
+
+@pytest.mark.skipif(not aiohttp_available, reason="aiohttp not installed")
+class TestPolygonParsing:
+    """Test Polygon aggregate payload parsing"""
+
+    def test_rows_to_columns(self):
+        """Aggregate rows should become a typed OHLCV frame in timestamp order"""
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        rows = [
+            {"t": 1704240000000, "o": 11.0, "h": 12.0, "l": 10.5, "c": 11.5, "v": 2000, "vw": 11.2, "n": 7},
+            {"t": 1704153600000, "o": 10.0, "h": 11.0, "l": 9.5, "c": 10.5, "v": 1000.5, "vw": 10.2, "n": 5},
+        ]
+        df = PolygonProvider._build_frame("AAPL", PolygonProvider._rows_to_columns(rows))
+
+        assert list(df.columns) == ["timestamp", "symbol", "open", "high", "low", "close", "volume"]
+        assert df["timestamp"].is_monotonic_increasing
+        assert df["timestamp"].iloc[0] == pd.Timestamp("2024-01-02")
+        assert (df["symbol"] == "AAPL").all()
+        assert df["close"].tolist() == [10.5, 11.5]
+        assert df["volume"].dtype == "float64"
+        assert df.attrs["validated"]
+        assert PolygonProvider._build_frame("AAPL", PolygonProvider._rows_to_columns([])).empty
+
+    def test_rows_to_columns_missing_fields(self):
+        """A missing or null price/volume field reads as NaN instead of dropping the response"""
+        import numpy as np
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        rows = [
+            {"t": 1704153600000, "o": 10.0, "h": 11.0, "l": 9.5, "c": 10.5},
+            {"t": 1704240000000, "o": None, "h": 12.0, "l": 10.5, "c": 11.5, "v": 2000},
+        ]
+        df = PolygonProvider._build_frame("AAPL", PolygonProvider._rows_to_columns(rows))
+
+        assert len(df) == 2
+        assert np.isnan(df["volume"].iloc[0]) and df["volume"].iloc[1] == 2000
+        assert np.isnan(df["open"].iloc[1]) and df["open"].iloc[0] == 10.0
+
+    def test_build_table(self):
+        """Typed columns should become an Arrow table with the bars schema"""
+        from dss.ingestion import polygon_provider
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        if not polygon_provider.PYARROW_AVAILABLE:
+            pytest.skip("pyarrow not installed")
+
+        rows = [{"t": 1704153600000, "o": 10.0, "h": 11.0, "l": 9.5, "c": 10.5, "v": 1000}]
+        table = PolygonProvider._build_table("AAPL", PolygonProvider._rows_to_columns(rows))
+        assert table.column_names == ["timestamp", "symbol", "open", "high", "low", "close", "volume"]
+        assert table.column("symbol").to_pylist() == ["AAPL"]
+        assert table.column("timestamp").to_pylist()[0] == pd.Timestamp("2024-01-02")
+
+    def test_parse_aggs(self):
+        """Raw aggregate bodies should decode to (payload, columns)"""
+        import json
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        body = json.dumps({
+            "status": "OK", "resultsCount": 1,
+            "results": [{"t": 1704153600000, "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 10}]
+        }).encode()
+        data, columns = PolygonProvider._parse_aggs(body)
+        assert data["status"] == "OK" and "results" not in data
+        assert columns["timestamp"].tolist() == [1704153600000]
+        assert columns["close"].dtype == "float64"
+
+        data, columns = PolygonProvider._parse_aggs(b'{"status": "OK", "resultsCount": 0}')
+        assert columns is None and data["resultsCount"] == 0
+
+    @pytest.mark.asyncio
+    async def test_snapshot_uses_shared_get(self):
+        """Endpoints should go through _get and fall back along the price paths"""
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        provider = PolygonProvider(api_key="test")
+        requested = []
+
+        async def fake_get(url, params):
+            requested.append(url)
+            return 200, b'{"status": "OK", "ticker": {"lastTrade": {}, "day": {"c": 101.5}}}', {}
+
+        provider._get = fake_get
+        snapshot = await provider.get_latest_snapshot("aapl")
+        assert snapshot == {"last_price": 101.5, "updated_utc": 0}
+        assert requested[0].endswith("/tickers/AAPL")
+
+    @pytest.mark.asyncio
+    async def test_historical_data_error_classification(self):
+        """5xx should raise a retriable error, other 4xx should return an empty frame"""
+        from datetime import datetime
+        from dss.ingestion.polygon_provider import PolygonProvider, PolygonAPIError
+
+        provider = PolygonProvider(api_key="test")
+        responses = {"500": (500, b"oops", {"Retry-After": "7"}), "404": (404, b"nope", {})}
+
+        async def fake_get(url, params):
+            return responses[url.rsplit("/ticker/", 1)[1].split("/")[0]]
+
+        provider._get = fake_get
+        start, end = datetime(2024, 1, 2), datetime(2024, 1, 31)
+        with pytest.raises(PolygonAPIError) as exc:
+            await provider.get_historical_data("500", start, end)
+        assert exc.value.retriable and exc.value.retry_after == 7.0
+        assert (await provider.get_historical_data("404", start, end)).empty
+
+    @pytest.mark.asyncio
+    async def test_historical_data_retries_429_once(self):
+        """A 429 should be retried once after Retry-After, through the same decode path"""
+        from datetime import datetime
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        provider = PolygonProvider(api_key="test")
+        body = b'{"status": "OK", "resultsCount": 1, "results": [{"t": 1704153600000, "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 10}]}'
+        responses = [(429, b"slow down", {"Retry-After": "0"}), (200, body, {})]
+
+        async def fake_get(url, params):
+            return responses.pop(0)
+
+        provider._get = fake_get
+        df = await provider.get_historical_data("AAPL", datetime(2024, 1, 2), datetime(2024, 1, 31))
+        assert not responses
+        assert df["close"].tolist() == [1.5]
+
+    @pytest.mark.asyncio
+    async def test_ticker_details_cached_and_persisted(self, tmp_path, monkeypatch):
+        """Ticker details should be fetched once, then served from cache across runs"""
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        monkeypatch.setenv("TICKER_DETAILS_CACHE", str(tmp_path / "details.json"))
+        calls = []
+
+        async def fake_get(url, params):
+            calls.append(url)
+            symbol = url.rsplit("/", 1)[1]
+            if symbol == "GONE":
+                return 404, b"", {}
+            return 200, ('{"status": "OK", "results": {"ticker": "%s", "market_cap": 1e9}}' % symbol).encode(), {}
+
+        provider = PolygonProvider(api_key="test")
+        provider._get = fake_get
+        details = await provider.get_multiple_ticker_details(["AAPL", "msft", "GONE"])
+        assert details["AAPL"]["market_cap"] == 1e9
+        assert details["GONE"] is None
+        assert len(calls) == 3
+
+        await provider.get_ticker_details("aapl")
+        assert len(calls) == 3
+        await provider.close()
+
+        reloaded = PolygonProvider(api_key="test")
+        reloaded._get = fake_get
+        details = await reloaded.get_multiple_ticker_details(["AAPL", "MSFT"])
+        assert details["MSFT"]["symbol"] == "MSFT"
+        assert len(calls) == 3
+
+    def test_stream_aggs_matches_row_build(self):
+        """Streaming decode should produce the same columns as the row-based build"""
+        import json
+        from dss.ingestion import polygon_provider
+        from dss.ingestion.polygon_provider import PolygonProvider
+
+        if not polygon_provider.IJSON_AVAILABLE:
+            pytest.skip("ijson not installed")
+
+        rows = [
+            {"t": 1704153600000 + i * 86_400_000, "o": 1.0 + i, "h": 2.0 + i, "l": 0.5, "c": 1.5, "v": 10 + i}
+            for i in range(5)
+        ]
+        body = json.dumps({"status": "OK", "resultsCount": 5, "results": rows}).encode()
+        data, streamed = PolygonProvider._stream_aggs(body)
+        assert data["status"] == "OK"
+        pd.testing.assert_frame_equal(
+            PolygonProvider._build_frame("MSFT", streamed),
+            PolygonProvider._build_frame("MSFT", PolygonProvider._rows_to_columns(rows))
+        )
@@ -94,6 +94,19 @@ class TestMarketDatabase:
 
         assert len(result) == 10  # Same count, not 20
 
+    def test_insert_arrow_upserts(self, temp_market_db, sample_market_data):
+        """Arrow tables should upsert exactly like DataFrames"""
+        pa = pytest.importorskip("pyarrow")
+        temp_market_db.insert_data(sample_market_data)
+
+        updated = sample_market_data.copy()
+        updated['close'] = updated['close'] + 10
+        temp_market_db.insert_arrow(pa.Table.from_pandas(updated, preserve_index=False))
+        result = temp_market_db.get_data('AAPL')
+
+        assert len(result) == 10
+        assert result['close'].tolist() == pytest.approx(updated['close'].tolist())
+
     def test_get_last_timestamp(self, temp_market_db, sample_market_data):
         """Test retrieving last timestamp for a symbol"""
         temp_market_db.insert_data(sample_market_data)
@@ -107,6 +120,13 @@ class TestMarketDatabase:
         result = temp_market_db.get_last_timestamp('NONEXISTENT')
         assert result is None
 
+    def test_get_last_timestamps_batched(self, temp_market_db, sample_market_data):
+        """One query should match get_last_timestamp per symbol, omitting missing ones"""
+        temp_market_db.insert_data(sample_market_data)
+        result = temp_market_db.get_last_timestamps(['AAPL', 'NONEXISTENT'])
+
+        assert result == {'AAPL': temp_market_db.get_last_timestamp('AAPL')}
+
     def test_get_all_symbols(self, temp_market_db, sample_market_data):
         """Test listing all symbols in DB"""
         temp_market_db.insert_data(sample_market_data)
@@ -153,6 +173,21 @@ class TestMarketDatabase:
         except OSError:
             pass
 
+    def test_optimize_storage_preserves_data(self, temp_market_db, sample_market_data):
+        """Reorganizing storage should keep rows and upsert semantics intact"""
+        msft_data = sample_market_data.copy()
+        msft_data['symbol'] = 'MSFT'
+        temp_market_db.insert_data(msft_data)
+        temp_market_db.insert_data(sample_market_data)
+
+        temp_market_db.optimize_storage()
+
+        assert len(temp_market_db.get_data('AAPL')) == 10
+        assert len(temp_market_db.get_data('MSFT')) == 10
+        # Primary key still enforced: re-inserting must not duplicate
+        temp_market_db.insert_data(sample_market_data)
+        assert len(temp_market_db.get_data('AAPL')) == 10
+
     def test_invalid_columns_raises(self, temp_market_db):
         """Missing required columns should raise ValueError"""
         bad_data = pd.DataFrame({
@@ -283,3 +318,176 @@ class TestUserDatabase:
         deleted = temp_user_db.reset_all_trades()
         assert deleted == 3
         assert len(temp_user_db.get_open_trades()) == 0
+
+    def test_wal_journal_mode(self, temp_user_db):
+        """Connections should use WAL journaling"""
+        conn = temp_user_db._get_read_connection()
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+        assert mode == 'wal'
+
+    def test_connection_pool_reused(self, temp_user_db):
+        """Writes share one pooled connection; close() disposes and reopens lazily"""
+        temp_user_db.set_setting("k", "1")
+        rw_conn = temp_user_db._rw_conn
+        temp_user_db.set_setting("k", "2")
+        assert temp_user_db._rw_conn is rw_conn
+
+        temp_user_db.close()
+        assert temp_user_db._rw_conn is None
+        assert temp_user_db.get_setting("k") == "2"
+
+    def test_bulk_inserts(self, temp_user_db):
+        """Bulk trade/signal inserts should write every row"""
+        inserted = temp_user_db.add_trades_bulk([
+            {'symbol': 'aapl', 'entry_price': 150.0, 'quantity': 3, 'stop_loss': 140.0},
+            {'symbol': 'msft', 'entry_price': 300.0, 'quantity': 1},
+        ])
+        assert inserted == 2
+        trades = temp_user_db.get_open_trades()
+        assert {t['symbol'] for t in trades} == {'AAPL', 'MSFT'}
+        aapl = next(t for t in trades if t['symbol'] == 'AAPL')
+        assert aapl['current_stop_loss'] == 140.0
+
+        saved = temp_user_db.save_signals_bulk([
+            {'symbol': 'NVDA', 'score': 7.5},
+            {'symbol': 'AMD', 'score': 6.0, 'entry_price': 120.0},
+        ])
+        assert saved == 2
+        assert len(temp_user_db.get_recent_signals(days=1)) == 2
+
+    def test_trade_statistics_aggregates(self, temp_user_db):
+        """P&L aggregates and best/worst trades computed in SQL"""
+        for symbol, exit_price in [("A", 110.0), ("B", 120.0), ("C", 90.0)]:
+            temp_user_db.add_trade(symbol, 100.0, 10)
+            trade_id = temp_user_db.get_open_trades()[0]['id']
+            temp_user_db.update_trade(trade_id, exit_price=exit_price, status='closed')
+
+        stats = temp_user_db.get_trade_statistics()
+        assert stats['total_pnl'] == pytest.approx(200.0)
+        assert stats['avg_win'] == pytest.approx(150.0)
+        assert stats['avg_loss'] == pytest.approx(-100.0)
+        assert stats['best_trade']['symbol'] == 'B'
+        assert stats['best_trade']['pnl'] == pytest.approx(200.0)
+        assert stats['worst_trade']['symbol'] == 'C'
+
+    def test_indexes_created(self, temp_user_db):
+        """Schema init should create the journal/signal indexes"""
+        conn = temp_user_db._get_read_connection()
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert {'idx_tj_status', 'idx_tj_symbol_status', 'idx_tj_exit_date', 'idx_sig_date'} <= names
+
+    def test_update_stop_and_close_position(self, temp_user_db):
+        """Stop updates and closes append to notes and set updated_at"""
+        temp_user_db.add_trade("AMD", 100.0, 5, stop_loss=95.0)
+        temp_user_db.set_price_alert_sent("AMD", "stop_loss")
+
+        temp_user_db.update_position_stop("AMD", 98.0, reason="trailing")
+        trade = temp_user_db.get_open_trades()[0]
+        assert trade['current_stop_loss'] == 98.0
+        assert temp_user_db.get_position_stop("AMD") == 98.0
+        assert trade['updated_at'] is not None
+
+        temp_user_db.close_position("AMD", 97.0, reason="stop hit")
+        closed = temp_user_db.get_closed_trades()[0]
+        assert closed['status'] == 'stopped'
+        assert closed['notes'].endswith("Closed: stop hit")
+        assert "Stop updated: trailing" in closed['notes']
+        assert not temp_user_db.was_price_alert_sent("AMD", "stop_loss")
+
+    def test_schema_version_gate(self, temp_user_db):
+        """Schema init stamps user_version so later opens skip migrations"""
+        from dss.database.user_db import UserDatabase
+        conn = temp_user_db._get_read_connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.close()
+        assert version == UserDatabase.SCHEMA_VERSION
+
+        reopened = UserDatabase(db_path=str(temp_user_db.db_path))
+        reopened.add_trade("XOM", 100.0, 1, stop_loss=90.0)
+        reopened.update_position_stop("XOM", 95.0)
+        assert reopened.get_position_stop("XOM") == 95.0
+        reopened.close()
+
+    def test_analyze_trade_performance(self, temp_user_db):
+        """Closed trade analysis computes P&L and days held"""
+        temp_user_db.add_trade("KO", 50.0, 10, stop_loss=48.0, target_price=55.0)
+        trade_id = temp_user_db.get_open_trades()[0]['id']
+        temp_user_db.update_trade(trade_id, exit_price=55.0, status='closed')
+
+        analysis = temp_user_db.analyze_trade_performance(trade_id)
+        assert analysis['pnl'] == pytest.approx(50.0)
+        assert analysis['target_reached']
+        assert analysis['days_held'] == 0
+
+    def test_watchlist_upsert_updates_notes(self, temp_user_db):
+        """Re-adding a symbol updates notes in place"""
+        temp_user_db.add_to_watchlist("AAPL", notes="old")
+        temp_user_db.add_to_watchlist("AAPL", notes="new")
+        watchlist = temp_user_db.get_watchlist()
+        assert len(watchlist) == 1
+        assert watchlist[0]['notes'] == "new"
+
+    def test_alert_state_shared_between_instances(self, temp_user_db):
+        """Alert cache should see changes committed by another instance"""
+        from dss.database.user_db import UserDatabase
+        other = UserDatabase(db_path=str(temp_user_db.db_path))
+        assert not temp_user_db.was_price_alert_sent("MSFT", "target")
+
+        other.set_price_alert_sent("MSFT", "target")
+        assert temp_user_db.was_price_alert_sent("MSFT", "target")
+
+        other.clear_alerts_for_symbol("MSFT")
+        assert not temp_user_db.was_price_alert_sent("MSFT", "target")
+        other.close()
+
+    def test_closed_trades_df(self, temp_user_db):
+        """Closed trades DataFrame honours limit and parses dates"""
+        for symbol in ("A", "B", "C"):
+            temp_user_db.add_trade(symbol, 10.0, 1)
+            trade_id = temp_user_db.get_open_trades()[0]['id']
+            temp_user_db.update_trade(trade_id, exit_price=11.0, status='closed')
+
+        df = temp_user_db.get_closed_trades_df()
+        assert len(df) == 3
+        assert pd.api.types.is_datetime64_any_dtype(df['exit_date'])
+        assert len(temp_user_db.get_closed_trades_df(limit=2)) == 2
+
+    def test_delete_closed_trades_keeps_open(self, temp_user_db):
+        """Deleting closed trades returns the count and clears their alerts"""
+        temp_user_db.add_trade("OPEN", 10.0, 1)
+        temp_user_db.add_trade("DONE", 10.0, 1)
+        done_id = next(t['id'] for t in temp_user_db.get_open_trades() if t['symbol'] == 'DONE')
+        temp_user_db.update_trade(done_id, exit_price=12.0, status='closed')
+        temp_user_db.set_price_alert_sent("DONE", "target")
+
+        assert temp_user_db.delete_all_closed_trades() == 1
+        assert [t['symbol'] for t in temp_user_db.get_open_trades()] == ['OPEN']
+        assert not temp_user_db.was_price_alert_sent("DONE", "target")
+        assert not temp_user_db.delete_trade(done_id)
+
+    def test_schema_init_memoized(self, temp_user_db, monkeypatch):
+        """A second instance on the same file should not re-run schema creation"""
+        from dss.database.user_db import UserDatabase
+        calls = []
+        monkeypatch.setattr(UserDatabase, '_create_schema', lambda self: calls.append(self))
+
+        second = UserDatabase(db_path=str(temp_user_db.db_path))
+        assert calls == []
+        second.close()
+
+    def test_schema_init_memoized_after_writes(self, temp_user_db, monkeypatch):
+        """Writes (and WAL checkpoints) to the file must not invalidate the memo"""
+        from dss.database.user_db import UserDatabase
+        temp_user_db.add_trade("AAPL", 150.0, 10)
+        temp_user_db.add_to_watchlist("MSFT")
+        temp_user_db.close()  # Checkpoints the WAL into the db file
+        known = set(UserDatabase._initialized_paths)
+
+        calls = []
+        monkeypatch.setattr(UserDatabase, '_create_schema', lambda self: calls.append(self))
+        second = UserDatabase(db_path=str(temp_user_db.db_path))
+        assert calls == []
+        assert UserDatabase._initialized_paths == known
+        second.close()
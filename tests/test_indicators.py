@@ -3,9 +3,19 @@ Test suite per i calcoli finanziari critici del DSS.
 
 Testa:
 - RSI (Wilder's EMA)
-- ADX (index alignment)
+- ADX (index alignment, Wilder smoothing)
 - SMA (min_periods correctness)
-- VWAP (rolling window)
+- EMA (lfilter recursion)
+- VWAP (rolling window, session-anchored kernel)
+- OBV (single-pass kernel)
+- MFI / CMF (cumulative-sum rolling flows)
+- CCI (vectorized mean deviation)
+- Volume profile (vectorized binning)
+- Rolling highs/lows (fused extrema pass)
+- Parabolic SAR / SuperTrend (array kernels)
+- calculate_all (single concat of indicator columns, float32 output, Polars frontend, threaded batch)
+- ensure_columns (only the missing columns)
+- Incremental calculator (one-bar updates match calculate_all)
 - Trailing stop logic
 - Position sizing
 """
@@ -155,6 +165,42 @@ class TestADX:
         assert result['plus_di'].index.equals(sample_ohlcv['close'].index), \
             "+DI index doesn't match input index"
 
+    def test_adx_uses_wilder_smoothing(self, sample_ohlcv):
+        """TR, +DM, -DM and DX are smoothed with ewm(alpha=1/14), not rolling means"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        high, low, close = sample_ohlcv['high'], sample_ohlcv['low'], sample_ohlcv['close']
+        result = IndicatorCalculator._adx(high, low, close, length=14)
+
+        def wilder(s):
+            return s.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+
+        tr = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+        up_move, down_move = high.diff(), -low.diff()
+        plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)
+        minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)
+        plus_di = 100 * wilder(plus_dm) / wilder(tr)
+        minus_di = 100 * wilder(minus_dm) / wilder(tr)
+        adx = wilder(100 * (plus_di - minus_di).abs() / (plus_di + minus_di))
+
+        pd.testing.assert_series_equal(result['plus_di'], plus_di, check_names=False)
+        pd.testing.assert_series_equal(result['adx'], adx, check_names=False)
+
+
+class TestTrueRange:
+    """Test the shared True Range"""
+
+    def test_true_range_matches_concat_max(self, sample_ohlcv):
+        """fmax-based TR must equal the three-column max, with bar 0 = high - low"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        high, low, close = sample_ohlcv['high'], sample_ohlcv['low'], sample_ohlcv['close']
+        tr = IndicatorCalculator._true_range(high, low, close)
+
+        expected = pd.concat(
+            [high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1
+        ).max(axis=1)
+        assert tr.iloc[0] == high.iloc[0] - low.iloc[0]
+        np.testing.assert_allclose(tr, expected)
+
 
 # ==================== SMA TESTS ====================
 
@@ -183,6 +229,33 @@ class TestSMA:
         # SMA at index 9 should be mean(6,7,8,9,10) = 8.0
         assert sma.iloc[9] == pytest.approx(8.0), f"SMA(5) at index 9 should be 8.0, got {sma.iloc[9]}"
 
+    def test_sma_nan_handling_matches_pandas(self):
+        """Cumulative-sum SMA must match rolling().mean() with leading NaN and NaN gaps"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        series = pd.Series(np.random.randn(100).cumsum() + 100)
+        series.iloc[:7] = np.nan
+        expected = series.rolling(10).mean()
+        np.testing.assert_allclose(IndicatorCalculator._sma(series, 10), expected, rtol=1e-10)
+
+        series.iloc[50] = np.nan
+        expected = series.rolling(10).mean()
+        np.testing.assert_allclose(IndicatorCalculator._sma(series, 10), expected, rtol=1e-10)
+
+
+# ==================== EMA TESTS ====================
+
+class TestEMA:
+    """Test EMA recursion"""
+
+    def test_ema_matches_pandas_ewm(self, sample_ohlcv):
+        """EMA must equal ewm(span, adjust=False), including series with NaN"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        close = sample_ohlcv['close'].copy()
+        for series in (close, close.where(close.index != 50)):
+            ema = IndicatorCalculator._ema(series, length=12)
+            expected = series.ewm(span=12, adjust=False).mean()
+            np.testing.assert_allclose(ema, expected, rtol=1e-12)
+
 
 # ==================== VWAP TESTS ====================
 
@@ -207,6 +280,295 @@ class TestVWAP:
         assert ratio.min() > 0.9, "VWAP too far below price"
         assert ratio.max() < 1.1, "VWAP too far above price"
 
+    def test_session_vwap_resets_each_session(self, sample_ohlcv):
+        """With session_ids VWAP is cumulative within each session and restarts at the next"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        sessions = np.repeat(np.arange(30), 10)  # 30 "days" of 10 bars
+        vwap = IndicatorCalculator._calculate_vwap(sample_ohlcv, session_ids=sessions)
+
+        tp_vol = (sample_ohlcv['high'] + sample_ohlcv['low'] + sample_ohlcv['close']) / 3 * sample_ohlcv['volume']
+        expected = tp_vol.groupby(sessions).cumsum() / sample_ohlcv['volume'].groupby(sessions).cumsum()
+        np.testing.assert_allclose(vwap.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+        # First bar of every session is that bar's typical price
+        tp = (sample_ohlcv['high'] + sample_ohlcv['low'] + sample_ohlcv['close']) / 3
+        np.testing.assert_allclose(vwap.to_numpy()[::10], tp.to_numpy()[::10], rtol=1e-12)
+
+
+# ==================== OBV TESTS ====================
+
+class TestOBV:
+    """Test On-Balance Volume"""
+
+    def test_obv_matches_signed_cumsum(self, sample_ohlcv):
+        """OBV must equal the cumulative sum of volume signed by the close direction"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        close, volume = sample_ohlcv['close'], sample_ohlcv['volume']
+        obv = IndicatorCalculator._obv(close, volume)
+
+        expected = (volume * np.sign(close.diff().fillna(0))).cumsum()
+        assert obv.iloc[0] == 0
+        np.testing.assert_allclose(obv, expected)
+
+
+# ==================== MFI / CMF TESTS ====================
+
+class TestMFI:
+    """Test volume flow indicators (MFI, CMF)"""
+
+    def test_mfi_matches_rolling_definition(self, sample_ohlcv):
+        """Cumulative-sum flows must equal masked rolling sums"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        high, low, close, volume = (sample_ohlcv[c] for c in ('high', 'low', 'close', 'volume'))
+        mfi = IndicatorCalculator._mfi(high, low, close, volume, length=14)
+
+        tp = (high + low + close) / 3
+        flow = tp * volume
+        positive = flow.where(tp.diff() > 0, 0).rolling(14).sum()
+        negative = flow.where(tp.diff() < 0, 0).rolling(14).sum()
+        expected = 100 - 100 / (1 + positive / negative)
+
+        assert mfi.iloc[:13].isna().all()
+        np.testing.assert_allclose(mfi.iloc[13:], expected.iloc[13:], rtol=1e-9)
+
+    def test_cmf_matches_rolling_definition(self, sample_ohlcv):
+        """CMF from the shared CLV * volume must equal the rolling-sum formula"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        high, low, close, volume = (sample_ohlcv[c] for c in ('high', 'low', 'close', 'volume'))
+        cmf = IndicatorCalculator._cmf(high, low, close, volume, length=20)
+
+        clv = (((close - low) - (high - close)) / (high - low)).fillna(0)
+        expected = (clv * volume).rolling(20).sum() / volume.rolling(20).sum()
+
+        assert cmf.iloc[:19].isna().all()
+        np.testing.assert_allclose(cmf.iloc[19:], expected.iloc[19:], rtol=1e-9)
+
+
+# ==================== CCI TESTS ====================
+
+class TestCCI:
+    """Test vectorized CCI"""
+
+    def test_cci_matches_rolling_definition(self, sample_ohlcv):
+        """Sliding-window CCI must equal the rolling mean-absolute-deviation formula"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        high, low, close = sample_ohlcv['high'], sample_ohlcv['low'], sample_ohlcv['close']
+        cci = IndicatorCalculator._cci(high, low, close, length=20)
+
+        tp = (high + low + close) / 3
+        mad = tp.rolling(20).apply(lambda x: np.abs(x - x.mean()).mean(), raw=True)
+        expected = (tp - tp.rolling(20).mean()) / (0.015 * mad)
+
+        assert cci.index.equals(close.index)
+        assert cci.iloc[:19].isna().all()
+        np.testing.assert_allclose(cci.iloc[19:], expected.iloc[19:])
+
+
+# ==================== VOLUME PROFILE TESTS ====================
+
+class TestVolumeProfile:
+    """Test vectorized volume profile"""
+
+    def test_volume_profile_conserves_volume(self, sample_ohlcv):
+        """Every bar's volume is spread across bins; POC and value area lie in the price range"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        profile = IndicatorCalculator.calculate_volume_profile(sample_ohlcv, bins=20)
+
+        total = sum(profile['volume_distribution'].values())
+        assert total == pytest.approx(sample_ohlcv['volume'].sum())
+        assert sample_ohlcv['low'].min() <= profile['poc_price'] <= sample_ohlcv['high'].max()
+        assert profile['value_area_low'] <= profile['poc_price'] <= profile['value_area_high']
+
+
+# ==================== ROLLING EXTREMA TESTS ====================
+
+class TestRollingExtrema:
+    """Test the fused rolling high/low pass"""
+
+    def test_extrema_match_pandas_rolling(self, sample_ohlcv):
+        """Every window must equal rolling max/min, including NaN gaps"""
+        from dss.intelligence.indicators import IndicatorCalculator, EXTREMA_WINDOWS
+        high = sample_ohlcv['high'].copy()
+        low = sample_ohlcv['low'].copy()
+        high.iloc[100] = np.nan
+        low.iloc[150] = np.nan
+
+        extrema = IndicatorCalculator._rolling_extrema(high, low)
+
+        assert set(extrema) == set(EXTREMA_WINDOWS)
+        for window, (highest, lowest) in extrema.items():
+            pd.testing.assert_series_equal(highest, high.rolling(window).max())
+            pd.testing.assert_series_equal(lowest, low.rolling(window).min())
+
+
+# ==================== PARABOLIC SAR / SUPERTREND TESTS ====================
+
+class TestParabolicSAR:
+    """Test Parabolic SAR kernel"""
+
+    def test_psar_index_and_start(self, sample_ohlcv):
+        """SAR must be aligned to the input index and start at the first low"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        sar = IndicatorCalculator._parabolic_sar(
+            sample_ohlcv['high'], sample_ohlcv['low'], sample_ohlcv['close']
+        )
+        assert sar.index.equals(sample_ohlcv['close'].index)
+        assert sar.iloc[0] == sample_ohlcv['low'].iloc[0]
+        assert sar.notna().all()
+
+    def test_psar_below_price_in_uptrend(self):
+        """In a steady uptrend the SAR never reverses and stays under the lows"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        close = pd.Series(np.linspace(100, 150, 60))
+        sar = IndicatorCalculator._parabolic_sar(close * 1.005, close * 0.995, close)
+        assert (sar <= close * 0.995).all()
+        assert sar.is_monotonic_increasing
+
+
+class TestSuperTrend:
+    """Test SuperTrend kernel"""
+
+    def test_supertrend_alignment_and_direction(self, sample_ohlcv):
+        """Outputs must be aligned to the input index with direction in {-1, 1}"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        result = IndicatorCalculator._supertrend(
+            sample_ohlcv['high'], sample_ohlcv['low'], sample_ohlcv['close']
+        )
+        assert result['supertrend'].index.equals(sample_ohlcv['close'].index)
+        assert result['direction'].index.equals(sample_ohlcv['close'].index)
+        assert set(result['direction'].unique()) <= {-1, 1}
+
+
+# ==================== CALCULATE ALL TESTS ====================
+
+class TestCalculateAll:
+    """Test the full indicator pipeline"""
+
+    def test_calculate_all_keeps_input_and_recomputes_in_place(self, sample_ohlcv):
+        """Input columns come first; running it again must not duplicate columns"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        result = IndicatorCalculator.calculate_all(sample_ohlcv)
+
+        assert list(result.columns[:len(sample_ohlcv.columns)]) == list(sample_ohlcv.columns)
+        assert result.index.equals(sample_ohlcv.index)
+        assert {'sma_20', 'macd', 'parabolic_sar', 'cmf', 'dollar_volume'} <= set(result.columns)
+
+        again = IndicatorCalculator.calculate_all(result)
+        assert not again.columns.duplicated().any()
+        pd.testing.assert_series_equal(again['rsi'], result['rsi'])
+
+    def test_calculate_all_short_frames(self, sample_ohlcv):
+        """Frames shorter than the longest lags still get every column (ROC as shift(12))"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        full = IndicatorCalculator.calculate_all(sample_ohlcv)
+
+        for n in range(1, 31):
+            df = sample_ohlcv.iloc[:n]
+            result = IndicatorCalculator.calculate_all(df)
+
+            assert result.shape == (n, full.shape[1]), n
+            close = df['close']
+            expected_roc = (close - close.shift(12)) / close.shift(12) * 100
+            pd.testing.assert_series_equal(result['roc'], expected_roc, check_names=False)
+
+    def test_polars_frontend_matches_pandas(self, sample_ohlcv):
+        """The Polars suite must produce the same columns and values (nulls for NaN)"""
+        pl = pytest.importorskip("polars")
+        from dss.intelligence.indicators import IndicatorCalculator
+        from dss.intelligence import indicators_polars
+
+        expected = IndicatorCalculator.calculate_all(sample_ohlcv)
+        result = indicators_polars.calculate_all(pl.from_pandas(sample_ohlcv))
+
+        assert result.columns == list(expected.columns)
+        for name in expected.columns[len(sample_ohlcv.columns):]:
+            values = result[name].cast(pl.Float64).fill_null(np.nan).to_numpy()
+            np.testing.assert_allclose(values, expected[name].to_numpy(dtype=float),
+                                       rtol=1e-9, atol=1e-9, err_msg=name)
+
+    def test_polars_wilder_matches_pandas(self, sample_ohlcv):
+        """Polars Wilder smoothing (min_samples, Polars >= 1.21) matches pandas ewm"""
+        pl = pytest.importorskip("polars")
+        from dss.intelligence.indicators_polars import _wilder
+
+        close = sample_ohlcv['close']
+        expected = close.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        result = pl.from_pandas(sample_ohlcv[['close']]).select(_wilder(pl.col('close'), 14))['close']
+
+        assert result.null_count() == 13
+        np.testing.assert_allclose(result.fill_null(np.nan).to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+    def test_float32_output_matches_float64(self, sample_ohlcv):
+        """float32 storage keeps cumulative columns in float64 and stays within rtol=1e-4"""
+        from dss.intelligence.indicators import IndicatorCalculator, FLOAT64_COLUMNS
+        expected = IndicatorCalculator.calculate_all(sample_ohlcv)
+        result = IndicatorCalculator.calculate_all(sample_ohlcv, dtype=np.float32)
+
+        for name in expected.columns[len(sample_ohlcv.columns):]:
+            if expected[name].dtype == np.float64:
+                assert result[name].dtype == (np.float64 if name in FLOAT64_COLUMNS else np.float32), name
+                np.testing.assert_allclose(result[name].to_numpy(dtype=float), expected[name].to_numpy(),
+                                           rtol=1e-4, atol=1e-4, err_msg=name)
+            else:
+                assert result[name].dtype == expected[name].dtype, name
+
+    def test_batch_matches_per_symbol(self, sample_ohlcv):
+        """The threaded batch API returns the same frames, keyed by symbol"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        frames = {'AAA': sample_ohlcv, 'BBB': sample_ohlcv.iloc[:150], 'CCC': sample_ohlcv.iloc[100:]}
+
+        results = IndicatorCalculator.calculate_all_batch(frames, max_workers=3)
+
+        assert list(results) == list(frames)
+        for symbol, df in frames.items():
+            pd.testing.assert_frame_equal(results[symbol], IndicatorCalculator.calculate_all(df))
+
+    def test_ensure_columns_adds_only_missing(self, sample_ohlcv):
+        """ensure_columns computes just the missing columns, with calculate_all's values"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        expected = IndicatorCalculator.calculate_all(sample_ohlcv)
+        partial_df = sample_ohlcv.assign(sma_200=1.0)
+
+        result = IndicatorCalculator.ensure_columns(partial_df, ['sma_200', 'adx', 'natr', 'dollar_volume'])
+
+        assert list(result.columns) == list(partial_df.columns) + ['adx', 'natr', 'dollar_volume']
+        assert (result['sma_200'] == 1.0).all()
+        for name in ('adx', 'natr', 'dollar_volume'):
+            np.testing.assert_array_equal(result[name].to_numpy(), expected[name].to_numpy())
+        assert IndicatorCalculator.ensure_columns(result, ['adx', 'natr']) is result
+
+        # No standalone builder: full calculate_all
+        fallback = IndicatorCalculator.ensure_columns(sample_ohlcv, ['squeeze'])
+        assert list(fallback.columns) == list(expected.columns)
+
+    def test_incremental_updates_match_calculate_all(self, sample_ohlcv):
+        """Warm-started one-bar updates must reproduce the last rows of calculate_all"""
+        from dss.intelligence.indicators import IndicatorCalculator
+        from dss.intelligence.indicators_incremental import IncrementalIndicatorCalculator
+
+        expected = IndicatorCalculator.calculate_all(sample_ohlcv)
+        calculator = IncrementalIndicatorCalculator(sample_ohlcv.iloc[:270])
+
+        for i in range(270, len(sample_ohlcv)):
+            values = calculator.update(sample_ohlcv.iloc[i])
+            for name, value in values.items():
+                if name == 'ichimoku_chikou':  # Looks ahead, always NaN on the latest bar
+                    assert np.isnan(value)
+                    continue
+                assert value == pytest.approx(expected[name].iloc[i], rel=1e-7, nan_ok=True), name
+
+        assert calculator.bars == len(sample_ohlcv)
+
+    def test_incremental_rejects_stale_bar(self, sample_ohlcv):
+        """Replaying a bar would double-count the recursive state"""
+        from dss.intelligence.indicators_incremental import IncrementalIndicatorCalculator
+
+        calculator = IncrementalIndicatorCalculator(sample_ohlcv)
+        with pytest.raises(ValueError):
+            calculator.update(sample_ohlcv.iloc[-1])
+        with pytest.raises(ValueError):
+            IncrementalIndicatorCalculator(max_window=50)
+
 
 # ==================== TRAILING STOP TESTS ====================
 
@@ -0,0 +1,141 @@
+"""
+Unit tests for the Portfolio Manager.
+
+Tests:
+- Signal expiration (scalar and vectorized checks)
+- Sector diversity filter (symbol cap, concentration cap)
+- Shared MarketDatabase ownership on close()
+"""
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class _StubUserDB:
+    """UserDatabase stand-in: no settings, fixed open positions"""
+
+    def __init__(self, positions=()):
+        self.positions = list(positions)
+
+    def get_setting(self, key):
+        return None
+
+    def get_active_positions(self):
+        return self.positions
+
+
+class _CountingDB:
+    """MarketDatabase stand-in counting close() calls"""
+
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+class TestSignalExpiration:
+    """Test signal validity checks"""
+
+    def test_vectorized_matches_scalar(self):
+        """is_signals_valid agrees with is_signal_valid row by row"""
+        from dss.core.portfolio_manager import PortfolioManager
+        check_time = pd.Timestamp('2024-06-03 12:00')
+        signals = [
+            {'symbol': 'NONE', 'expires_at': None},
+            {'symbol': 'NAT', 'expires_at': pd.NaT},
+            {'symbol': 'PAST', 'expires_at': pd.Timestamp('2024-06-03 08:00')},
+            {'symbol': 'FUTURE', 'expires_at': pd.Timestamp('2024-06-03 16:00')},
+            {'symbol': 'EDGE', 'expires_at': check_time},
+            {'symbol': 'STR_PAST', 'expires_at': '2024-06-02 16:00:00'},
+            {'symbol': 'STR_FUTURE', 'expires_at': '2024-06-04 16:00:00'},
+            {'symbol': 'STR_EDGE', 'expires_at': '2024-06-03 12:00:00'},
+        ]
+
+        valid = PortfolioManager.is_signals_valid(pd.DataFrame(signals), check_time)
+        expected = [PortfolioManager.is_signal_valid(sig, check_time)['is_valid'] for sig in signals]
+
+        assert valid.tolist() == expected
+        # Expiring exactly at check_time still counts as valid
+        assert valid.tolist() == [True, True, False, True, True, False, True, True]
+
+    def test_vectorized_keeps_index(self):
+        """The result is aligned to the input index"""
+        from dss.core.portfolio_manager import PortfolioManager
+        df = pd.DataFrame({'expires_at': [pd.Timestamp('2024-01-01'), pd.NaT]}, index=['A', 'B'])
+
+        valid = PortfolioManager.is_signals_valid(df, pd.Timestamp('2024-06-01'))
+        assert valid.to_dict() == {'A': False, 'B': True}
+
+
+class TestSectorDiversityFilter:
+    """Test apply_sector_diversity_filter"""
+
+    @staticmethod
+    def _manager(positions, max_per_sector):
+        from dss.core.portfolio_manager import PortfolioManager
+        manager = PortfolioManager.__new__(PortfolioManager)
+        manager.user_db = _StubUserDB(positions)
+        manager.MAX_SYMBOLS_PER_SECTOR = max_per_sector
+        return manager
+
+    def test_saturated_sectors(self):
+        """Sectors full from open positions or from new signals reject further symbols"""
+        def position(symbol):
+            return {'symbol': symbol, 'entry_price': 100.0, 'position_size': 1}
+
+        # Semiconductors full from open positions; Unknown symbols are never capped
+        positions = [position(s) for s in ('NVDA', 'AMD', 'ZZOPEN1', 'ZZOPEN2', 'ZZOPEN3', 'ZZOPEN4')]
+        signals = [position(s) for s in (
+            'MU', 'AAPL', 'ZZNEW1', 'MSFT', 'GOOGL', 'ZZNEW2', 'ZZNEW3', 'JPM', 'LRCX', 'BAC', 'GS'
+        )]
+        # Over the 40% concentration cap: rejected by Rule 2, so it does not fill Energy
+        signals.insert(3, {'symbol': 'XOM', 'entry_price': 100.0, 'position_size': 50})
+        signals.append(position('CVX'))
+        manager = self._manager(positions, max_per_sector=2)
+
+        accepted = [sig['symbol'] for sig in manager.apply_sector_diversity_filter(signals)]
+
+        # Same outcome as the per-signal count check this filter replaced
+        assert accepted == ['AAPL', 'ZZNEW1', 'MSFT', 'ZZNEW2', 'ZZNEW3', 'JPM', 'BAC', 'CVX']
+
+    def test_unknown_never_saturated(self):
+        """Symbols without a sector pass Rule 1 whatever their count"""
+        positions = [{'symbol': f'ZZOPEN{i}', 'entry_price': 100.0, 'position_size': 1} for i in range(3)]
+        signals = [{'symbol': f'ZZNEW{i}', 'entry_price': 100.0, 'position_size': 1} for i in range(3)]
+        manager = self._manager(positions, max_per_sector=1)
+
+        assert manager.apply_sector_diversity_filter(signals) == signals
+
+
+class TestDatabaseOwnership:
+    """Test that close() only closes a MarketDatabase the manager created"""
+
+    def test_injected_db_stays_open(self):
+        """A db passed in is shared with the caller and left open"""
+        from dss.core.portfolio_manager import PortfolioManager
+        db = _CountingDB()
+        manager = PortfolioManager(user_db=_StubUserDB(), db=db)
+
+        assert manager.regime_detector.db is db and manager.momentum.db is db
+        manager.close()
+        assert db.closed == 0
+
+    def test_own_db_closed_once(self, monkeypatch):
+        """A db created by the manager is closed once, not once per component"""
+        from dss.core import portfolio_manager
+        created = []
+
+        def make_db():
+            created.append(_CountingDB())
+            return created[-1]
+
+        monkeypatch.setattr(portfolio_manager, 'MarketDatabase', make_db)
+        manager = portfolio_manager.PortfolioManager(user_db=_StubUserDB())
+        manager.close()
+
+        assert len(created) == 1
+        assert created[0].closed == 1
@@ -5,6 +5,7 @@ Tests:
 - ADX-based regime classification
 - Regime transitions
 - Edge cases (insufficient data, NaN handling)
+- Numba ADX kernel parity with the pandas path
 """
 import pytest
 import pandas as pd
@@ -120,6 +121,24 @@ class TestRegimeDetector:
         assert adx.min() >= 0, f"ADX below 0: {adx.min()}"
         assert adx.max() <= 100, f"ADX above 100: {adx.max()}"
 
+    @pytest.mark.parametrize('data', ['sample_ohlcv', 'strong_trend_data'])
+    def test_adx_kernel_matches_pandas(self, data, request, monkeypatch):
+        """The Numba kernel and the pandas fallback agree, NaN warm-up rows included"""
+        from dss.core import regime_detector
+        if not regime_detector.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        df = request.getfixturevalue(data)
+        detector = regime_detector.MarketRegimeDetector.__new__(regime_detector.MarketRegimeDetector)
+
+        kernel = detector._calculate_adx(df)
+        monkeypatch.setattr(regime_detector, 'NUMBA_AVAILABLE', False)
+        fallback = detector._calculate_adx(df)
+
+        for name in ('adx', 'plus_di', 'minus_di'):
+            assert kernel[name].index.equals(fallback[name].index)
+            np.testing.assert_allclose(kernel[name].to_numpy(), fallback[name].to_numpy(dtype=float),
+                                       rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+
     def test_regime_returns_valid_type(self, sample_ohlcv):
         """Regime detection should return a valid regime type"""
         from dss.core.regime_detector import MarketRegimeDetector
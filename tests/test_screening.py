@@ -0,0 +1,385 @@
+"""
+Test suite per lo screener legacy (quality filters).
+
+Testa:
+- apply_filters (price / volume / volatility / ticker details)
+- apply_filters_batch (vectorized path == per-symbol path)
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dss.intelligence.legacy.screening import ReasonCode, StockScreener
+
+
+# ==================== FIXTURES ====================
+
+def _make_ohlcv(n: int, price: float, daily_volume: float, seed: int) -> pd.DataFrame:
+    """Random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = price * np.cumprod(1 + rng.normal(0, 0.02, n))
+    return pd.DataFrame({
+        'open': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'close': close,
+        'volume': rng.uniform(0.5, 1.5, n) * daily_volume
+    })
+
+
+@pytest.fixture
+def universe():
+    """Symbols that pass and fail different filters, plus ticker details"""
+    data = {
+        'GOOD': _make_ohlcv(60, 50.0, 2_000_000, 1),
+        'PENNY': _make_ohlcv(60, 2.0, 2_000_000, 2),
+        'THIN': _make_ohlcv(60, 50.0, 50_000, 3),
+        'SHORT': _make_ohlcv(10, 50.0, 2_000_000, 4),
+        'ADR': _make_ohlcv(60, 80.0, 3_000_000, 5),
+        'OTC': _make_ohlcv(60, 30.0, 1_000_000, 6),
+    }
+    details = {
+        'GOOD': {'market_cap': 5e9, 'primary_exchange': 'XNAS', 'type': 'CS'},
+        'ADR': {'market_cap': 5e9, 'primary_exchange': 'XNYS', 'type': 'ADRC'},
+        'OTC': {'market_cap': 1e8, 'primary_exchange': 'OTCM', 'type': 'CS'},
+        'PENNY': {'market_cap': 1e9, 'primary_exchange': 'NASDAQ GLOBAL SELECT', 'type': 'WEIRD'},
+        'THIN': {'market_cap': None, 'primary_exchange': None},
+    }
+    return data, details
+
+
+@pytest.fixture
+def screener():
+    return StockScreener()
+
+
+# ==================== APPLY FILTERS TESTS ====================
+
+class TestApplyFilters:
+    """Test per-symbol filter results"""
+
+    def test_config_overrides_defaults(self, monkeypatch):
+        """The config filters block overrides the defaults; unset entries keep them"""
+        from dss.utils.config import config
+
+        monkeypatch.setitem(config.config, 'filters', {'min_price': 10.0, 'max_natr': None})
+        screener = StockScreener()
+
+        assert screener.filters['min_price'] == 10.0
+        assert screener.filters['max_natr'] == StockScreener._DEFAULT_FILTERS['max_natr']
+        assert screener.filters['benchmark_symbol'] == 'SPY'
+
+    def test_insufficient_data(self, screener, universe):
+        """Fewer than 20 bars always fails"""
+        data, _ = universe
+        result = screener.apply_filters(data['SHORT'], 'SHORT')
+        assert not result['passed']
+        assert result['metrics'] == {}
+
+    def test_failures_by_filter(self, screener, universe):
+        """Each bad symbol is rejected by the expected filter"""
+        data, details = universe
+        results = {symbol: screener.apply_filters(df, symbol, details.get(symbol)) for symbol, df in data.items()}
+
+        assert not results['PENNY']['passed']
+        assert ReasonCode.PRICE_LOW in results['PENNY']['reason_codes']
+        assert ReasonCode.VOLUME_LOW in results['THIN']['reason_codes']
+        assert ReasonCode.TYPE_EXCLUDED in results['ADR']['reason_codes']
+        assert ReasonCode.MARKET_CAP_LOW in results['OTC']['reason_codes']
+        assert ReasonCode.EXCHANGE_INVALID in results['OTC']['reason_codes']
+
+    def test_exchange_exact_match(self, screener, universe):
+        """Exchange codes match exactly (or by long-name prefix), not as substrings"""
+        data, _ = universe
+        df = data['GOOD']
+
+        def exchange_code(exchange):
+            details = {'market_cap': 5e9, 'primary_exchange': exchange, 'type': 'CS'}
+            codes = screener.apply_filters(df, 'GOOD', details)['reason_codes']
+            return next(c for c in codes if c.name.startswith('EXCHANGE'))
+
+        assert exchange_code('XNAS') == ReasonCode.EXCHANGE_OK
+        assert exchange_code('xnys') == ReasonCode.EXCHANGE_OK
+        assert exchange_code('NASDAQ GLOBAL SELECT') == ReasonCode.EXCHANGE_OK
+        assert exchange_code('XNYSE_FOO') == ReasonCode.EXCHANGE_INVALID
+        assert exchange_code('ARCX') == ReasonCode.EXCHANGE_INVALID
+        assert exchange_code('') == ReasonCode.EXCHANGE_MISSING
+
+    def test_security_type_status(self, screener, universe):
+        """Type codes are case-insensitive in both the single and the batch path"""
+        data, _ = universe
+        types = {'A': 'CS', 'B': 'etf', 'C': 'Adrc', 'D': 'FUND', 'E': ''}
+        details = {symbol: {'market_cap': 5e9, 'primary_exchange': 'XNAS', 'type': t} for symbol, t in types.items()}
+        frames = {symbol: data['GOOD'] for symbol in types}
+
+        expected = {
+            'A': ReasonCode.TYPE_OK, 'B': ReasonCode.TYPE_OK, 'C': ReasonCode.TYPE_EXCLUDED,
+            'D': ReasonCode.TYPE_UNKNOWN, 'E': None
+        }
+        batch = screener.apply_filters_batch(frames, details)
+        for symbol, code in expected.items():
+            single = screener.apply_filters(frames[symbol], symbol, details[symbol])
+            for result in (single, batch[symbol]):
+                type_codes = [c for c in result['reason_codes'] if c.name.startswith('TYPE')]
+                assert type_codes == ([code] if code else []), symbol
+        assert not batch['C']['passed']
+
+    def test_format_reasons(self, screener, universe):
+        """Reason text is rendered on demand from codes and metrics"""
+        data, details = universe
+        result = screener.apply_filters(data['PENNY'], 'PENNY')
+        reasons = screener.format_reasons(result)
+
+        assert len(reasons) == len(result['reason_codes'])
+        assert reasons[0] == (
+            f"FAIL Price: ${result['metrics']['price']:.2f} < "
+            f"${screener.filters['min_price']:.2f} min (penny stock)"
+        )
+        assert reasons[-1].startswith('INFO Ticker details not available')
+
+        short = screener.apply_filters(data['SHORT'], 'SHORT')
+        assert screener.format_reasons(short) == ['Insufficient data (need 20+ bars)']
+
+    def test_summary_counts_reason_codes(self, screener, universe):
+        """get_filter_summary counts symbols per reason code"""
+        data, details = universe
+        results = screener.apply_filters_batch(data, details)
+        summary = screener.get_filter_summary(results)
+
+        assert summary['passed_count'] + summary['failed_count'] == len(data)
+        assert screener.get_filter_counts(results) == {
+            key: summary[key] for key in ('total_screened', 'passed_count', 'failed_count', 'pass_rate')
+        }
+        assert summary['passed_count'] == len(summary['passed_symbols'])
+        assert summary['reason_counts'][ReasonCode.INSUFFICIENT_DATA] == 1
+        assert summary['reason_counts'][ReasonCode.TYPE_EXCLUDED] == 1
+
+
+# ==================== BATCH TESTS ====================
+
+class TestApplyFiltersBatch:
+    """Test the vectorized batch path"""
+
+    def test_batch_matches_per_symbol(self, screener, universe):
+        """Batch results (order, pass flag, reason codes, metrics) match apply_filters"""
+        data, details = universe
+        expected = {symbol: screener.apply_filters(df, symbol, details.get(symbol)) for symbol, df in data.items()}
+        results = screener.apply_filters_batch(data, details, fast_reject=False)
+
+        assert list(results) == list(data)
+        for symbol, result in results.items():
+            assert result['passed'] == expected[symbol]['passed'], symbol
+            assert result['reason_codes'] == expected[symbol]['reason_codes'], symbol
+            assert result['metrics'].keys() == expected[symbol]['metrics'].keys(), symbol
+            for key, value in expected[symbol]['metrics'].items():
+                if isinstance(value, float):
+                    assert result['metrics'][key] == pytest.approx(value, rel=1e-12), (symbol, key)
+                else:
+                    assert result['metrics'][key] == value, (symbol, key)
+
+    def test_fast_reject(self, screener, universe, monkeypatch):
+        """fast_reject keeps only the first failing code and skips indicators for cheap rejects"""
+        from dss.intelligence.indicators import IndicatorCalculator
+
+        data, details = universe
+        full = screener.apply_filters_batch(dict(data), details, fast_reject=False)
+
+        computed = []
+        original = IndicatorCalculator.ensure_columns
+
+        def counting(df, *args, **kwargs):
+            computed.append(len(df))
+            return original(df, *args, **kwargs)
+
+        monkeypatch.setattr(IndicatorCalculator, 'ensure_columns', staticmethod(counting))
+        fast = StockScreener().apply_filters_batch(dict(data), details)
+        # PENNY (price), ADR (type) and OTC (market cap) never reach the indicators
+        assert len(computed) == 2
+
+        assert list(fast) == list(data)
+        for symbol, result in fast.items():
+            single = screener.apply_filters(data[symbol], symbol, details.get(symbol), fast_reject=True)
+            assert result['reason_codes'] == single['reason_codes'], symbol
+            assert result['passed'] == full[symbol]['passed'], symbol
+            if result['passed']:
+                assert result == full[symbol]
+            else:
+                assert len(result['reason_codes']) == 1
+                assert result['reason_codes'][0] in full[symbol]['reason_codes']
+
+        assert fast['PENNY']['reason_codes'] == [ReasonCode.PRICE_LOW]
+        assert fast['ADR']['reason_codes'] == [ReasonCode.TYPE_EXCLUDED]
+
+    def test_fast_reject_reorders_filters(self, screener, universe):
+        """The most rejecting cheap filter moves first after FILTER_REORDER_INTERVAL calls"""
+        data, details = universe
+        screener.FILTER_REORDER_INTERVAL = 4
+
+        def reject(symbol, ticker_details):
+            return screener.apply_filters(data[symbol], symbol, ticker_details, fast_reject=True)['reason_codes']
+
+        assert reject('PENNY', details['ADR']) == [ReasonCode.PRICE_LOW]
+        for _ in range(2):
+            assert reject('ADR', details['ADR']) == [ReasonCode.TYPE_EXCLUDED]
+        # 4th call reorders: type (2 rejects) before price (1)
+        assert reject('PENNY', details['ADR']) == [ReasonCode.TYPE_EXCLUDED]
+        assert screener._reject_counts.tolist() == [1, 0, 0, 3]
+        assert screener._filter_order.tolist() == [3, 0, 1, 2]
+
+    def test_stored_ticker_details(self, screener, universe):
+        """update_ticker_details feeds later batches; new entries replace old ones"""
+        data, details = universe
+        expected = screener.apply_filters_batch(dict(data), details, fast_reject=False)
+
+        stored = StockScreener()
+        stored.update_ticker_details(details)
+        assert str(stored._ticker_details_df['primary_exchange'].dtype) == 'category'
+        assert str(stored._ticker_details_df['type'].dtype) == 'category'
+        assert stored.apply_filters_batch(dict(data), fast_reject=False) == expected
+
+        stored.update_ticker_details({'ADR': {**details['ADR'], 'type': 'CS'}})
+        assert len(stored._ticker_details_df) == len(details)
+        assert stored.apply_filters_batch({'ADR': data['ADR']})['ADR']['passed']
+
+    def test_threaded_matches_serial(self, screener, universe):
+        """The thread pool gives the same results as max_workers=1"""
+        data, details = universe
+        serial = screener.apply_filters_batch(dict(data), details, max_workers=1)
+        threaded = StockScreener().apply_filters_batch(dict(data), details, max_workers=4)
+        assert threaded == serial
+
+    def test_indicators_computed_once(self, screener, universe, monkeypatch):
+        """Raw frames get indicators once: cached per bars, written back by the batch path"""
+        from dss.intelligence.indicators import IndicatorCalculator
+
+        data, details = universe
+        calls = []
+        original = IndicatorCalculator.ensure_columns
+
+        def counting(df, *args, **kwargs):
+            calls.append(len(df))
+            return original(df, *args, **kwargs)
+
+        monkeypatch.setattr(IndicatorCalculator, 'ensure_columns', staticmethod(counting))
+
+        first = screener.apply_filters(data['GOOD'], 'GOOD')
+        second = screener.apply_filters(data['GOOD'].copy(), 'GOOD')
+        assert len(calls) == 1
+        assert second['metrics'] == first['metrics']
+
+        screener.apply_filters_batch(data, details)
+        assert 'natr' in data['THIN'].columns
+        assert 'natr' not in data['SHORT'].columns
+        calls.clear()
+        screener.apply_filters_batch(data, details)
+        assert calls == []
+
+    def test_indicator_cache_nan_close(self, screener, universe):
+        """A NaN first/last close still hits the indicator cache"""
+        data, _ = universe
+        df = data['GOOD'].copy()
+        df.loc[df.index[-1], 'close'] = np.nan
+
+        screener.apply_filters(df, 'GOOD')
+        screener.apply_filters(df.copy(), 'GOOD')
+        assert len(screener._indicator_cache) == 1
+
+
+# ==================== STREAMING TESTS ====================
+
+class TestUpdateBar:
+    """Test the O(1) per-bar screening path"""
+
+    def test_stream_matches_apply_filters(self, screener, universe):
+        """Every streamed bar gives the same result as apply_filters on the history so far"""
+        from dss.intelligence.indicators import IndicatorCalculator
+
+        data, details = universe
+        df = IndicatorCalculator.calculate_all(data['GOOD'])
+        df.loc[df.index[40], 'volume'] = np.nan
+
+        screener.update_bar('GOOD', df.iloc[25].to_dict(), history=df.iloc[:25])
+        for i in range(26, len(df)):
+            streamed = screener.update_bar('GOOD', df.iloc[i].to_dict(), details['GOOD'])
+            expected = screener.apply_filters(df.iloc[:i + 1], 'GOOD', details['GOOD'])
+
+            assert streamed['passed'] == expected['passed'], i
+            assert streamed['reason_codes'] == expected['reason_codes'], i
+            for key, value in expected['metrics'].items():
+                assert streamed['metrics'][key] == pytest.approx(value, rel=1e-9), (i, key)
+
+    def test_warmup(self, screener, universe):
+        """Streaming from scratch needs 20 bars before screening"""
+        data, _ = universe
+        bars = data['GOOD'].to_dict('records')
+        results = [screener.update_bar('NEW', bar) for bar in bars[:20]]
+
+        assert all(r['reason_codes'] == [ReasonCode.INSUFFICIENT_DATA] for r in results[:19])
+        assert results[19]['reason_codes'][0] != ReasonCode.INSUFFICIENT_DATA
+        assert ReasonCode.NATR_MISSING in results[19]['reason_codes']
+
+# ==================== MARKET REGIME TESTS ====================
+
+class TestMarketRegime:
+    """Test benchmark regime detection"""
+
+    def test_bull_and_bear(self, screener):
+        """Close above / below SMA 200 maps to bull / bear"""
+        up = _make_ohlcv(260, 100.0, 5_000_000, 7)
+        up['close'] = np.linspace(100, 200, 260)
+        up['timestamp'] = pd.date_range('2024-01-01', periods=260, freq='B')
+        down = up.copy()
+        down['close'] = np.linspace(200, 100, 260)
+
+        bull = screener.check_market_regime(up)
+        bear = screener.check_market_regime(down)
+
+        assert bull['regime'] == 'bull' and not bull['stricter_criteria']
+        assert bear['regime'] == 'bear' and bear['stricter_criteria']
+        assert bull['benchmark_price'] == 200.0
+        assert bull['sma_200'] == pytest.approx(up['close'].tail(200).mean())
+        assert isinstance(bull['adx'], float)
+
+        # Repeated checks of the same bar come from the cache, as independent dicts
+        bull['regime'] = 'changed'
+        assert screener.check_market_regime(up)['regime'] == 'bull'
+
+    def test_short_history(self, screener, universe):
+        """Fewer than 200 bars gives an unknown regime"""
+        data, _ = universe
+        assert screener.check_market_regime(data['GOOD'])['regime'] == 'unknown'
+
+
+# ==================== KERNEL TESTS ====================
+
+class TestScreenKernel:
+    """Test the numeric screening kernel on raw arrays"""
+
+    def test_flags_and_nan_skipping(self):
+        """Averages skip NaN like pandas; a NaN NATR is flagged missing, not failed"""
+        from dss.intelligence.legacy import _screening_kernels as kernels
+
+        n = 30
+        close = np.full(n, 4.0)
+        high = close * 1.005
+        low = close * 0.995
+        volume = np.full(n, 1_000_000.0)
+        volume[-1] = np.nan
+        dollar_volume = close * volume
+        natr = np.full(n, np.nan)
+
+        flags, price, avg_volume, avg_dollar_volume, latest_natr, spread = kernels._screen_kernel(
+            close, high, low, volume, dollar_volume, natr,
+            np.array([5.0, 500.0, 500_000.0, 5_000_000.0, 1.5, 8.0, 0.3])
+        )
+
+        assert flags == kernels.PRICE_LOW | kernels.LIQUIDITY_LOW | kernels.NATR_MISSING
+        assert price == 4.0
+        assert avg_volume == pytest.approx(1_000_000.0)
+        assert avg_dollar_volume == pytest.approx(4_000_000.0)
+        assert np.isnan(latest_natr)
+        assert spread == pytest.approx(0.15)